@@ -0,0 +1,332 @@
+# backend_app/analytics.py
+
+import re
+from collections import Counter
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+# Sentiment counts are kept in small summary tables that every insert path updates inside its
+# own transaction, so dashboards read a few hundred rollup rows instead of grouping the whole
+# hcp_interactions table. rebuild_rollups() recomputes everything from scratch for backfills,
+# into shadow tables that replace the live ones in one RENAME TABLE.
+SENTIMENTS = ("Positive", "Neutral", "Negative")
+UNKNOWN_SENTIMENT = "Unknown"  # Bucket for interactions logged without a sentiment
+
+ANALYTICS_DDL = [
+    """
+    CREATE TABLE IF NOT EXISTS interaction_products (
+        interaction_id INT NOT NULL,
+        product_key VARCHAR(191) NOT NULL,
+        product_name VARCHAR(255) NOT NULL,
+        PRIMARY KEY (interaction_id, product_key),
+        KEY idx_interaction_products_key (product_key, interaction_id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS analytics_hcp_sentiment (
+        hcp_name VARCHAR(255) NOT NULL,
+        sentiment VARCHAR(16) NOT NULL,
+        interaction_count INT NOT NULL,
+        PRIMARY KEY (hcp_name, sentiment)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS analytics_product_sentiment (
+        product_key VARCHAR(191) NOT NULL,
+        sentiment VARCHAR(16) NOT NULL,
+        product_name VARCHAR(255) NOT NULL,
+        interaction_count INT NOT NULL,
+        PRIMARY KEY (product_key, sentiment)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS analytics_weekly_sentiment (
+        week_start DATE NOT NULL,
+        sentiment VARCHAR(16) NOT NULL,
+        interaction_count INT NOT NULL,
+        PRIMARY KEY (week_start, sentiment)
+    )
+    """,
+]
+
+ROLLUP_TABLES = ("interaction_products", "analytics_hcp_sentiment", "analytics_product_sentiment", "analytics_weekly_sentiment")
+REBUILD_SUFFIX = "_rebuild"  # Shadow tables rebuild_rollups() fills
+RETIRED_SUFFIX = "_retired"  # Live tables swapped out by rebuild_rollups(), dropped once caught up
+
+_PRODUCT_SEPARATORS = re.compile(r"\s*(?:[,;\n]|\band\b)\s*", re.IGNORECASE)
+_PRODUCT_TRIM = re.compile(r"^(?:the\s+)|[\s.:\-]+$", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+
+
+def _clean_product_name(name: str) -> str:
+    return _WHITESPACE.sub(" ", _PRODUCT_TRIM.sub("", name.strip()))[:255]
+
+
+def product_key(name: str) -> str:
+    """Case- and whitespace-insensitive identity of a product name."""
+    return _clean_product_name(name).lower()[:191]
+
+
+def parse_products(products_discussed: Optional[str]) -> List[Tuple[str, str]]:
+    """
+    Splits the free-text products field into (product_key, product_name) pairs, de-duplicated
+    in order. "ProductA and productA, Product B" gives [("producta", "ProductA"), ("product b", "Product B")].
+    """
+    if not products_discussed:
+        return []
+    products = []
+    seen = set()
+    for part in _PRODUCT_SEPARATORS.split(products_discussed):
+        name = _clean_product_name(part)
+        key = product_key(name)
+        if key and key not in seen:
+            seen.add(key)
+            products.append((key, name))
+    return products
+
+
+def week_start(interaction_date: Any) -> Optional[date]:
+    """Monday of the interaction's week; None when the date cannot be parsed."""
+    if isinstance(interaction_date, datetime):
+        interaction_date = interaction_date.date()
+    elif not isinstance(interaction_date, date):
+        try:
+            interaction_date = date.fromisoformat(str(interaction_date))
+        except ValueError:
+            return None
+    return interaction_date - timedelta(days=interaction_date.weekday())
+
+
+class RollupDelta:
+    """Accumulates rollup increments for a set of new interactions, then writes them in one pass."""
+
+    def __init__(self):
+        self.product_rows: List[tuple] = []
+        self.hcp_counts: Counter = Counter()
+        self.product_counts: Counter = Counter()
+        self.product_names: Dict[str, str] = {}
+        self.week_counts: Counter = Counter()
+
+    def add(self, interaction_id: int, hcp_name: str, interaction_date: Any, products_discussed: Optional[str], sentiment: Optional[str]):
+        sentiment = sentiment or UNKNOWN_SENTIMENT
+        self.hcp_counts[(hcp_name, sentiment)] += 1
+        for key, name in parse_products(products_discussed):
+            self.product_rows.append((interaction_id, key, name))
+            self.product_counts[(key, sentiment)] += 1
+            self.product_names.setdefault(key, name)
+        week = week_start(interaction_date)
+        if week is not None:
+            self.week_counts[(week, sentiment)] += 1
+
+    def minus(self, earlier: "RollupDelta") -> "RollupDelta":
+        """Counts gained since `earlier` (counts only ever grow). Product rows are not carried over."""
+        delta = RollupDelta()
+        delta.hcp_counts = self.hcp_counts - earlier.hcp_counts
+        delta.product_counts = self.product_counts - earlier.product_counts
+        delta.product_names = dict(self.product_names)
+        delta.week_counts = self.week_counts - earlier.week_counts
+        return delta
+
+    def apply(self, cursor, table_suffix: str = ""):
+        """
+        Writes the increments inside the caller's transaction, so rollups commit with the rows they
+        count. Each upsert goes in primary key order, so concurrent transactions lock shared rollup
+        rows in the same order instead of deadlocking on input order ("A, B" against "B, A").
+        `table_suffix` targets the rebuild's shadow tables instead of the live ones. Tables are
+        written in name order, the order rebuild_rollups()' RENAME TABLE takes its locks in, so an
+        insert cannot hold one table while waiting for another the swap already holds.
+        """
+        if self.hcp_counts:
+            cursor.executemany(
+                f"""
+                INSERT INTO analytics_hcp_sentiment{table_suffix} (hcp_name, sentiment, interaction_count) VALUES (%s, %s, %s)
+                ON DUPLICATE KEY UPDATE interaction_count = interaction_count + VALUES(interaction_count)
+                """,
+                # hcp_name compares case-insensitively in MySQL, so order by the case-folded name
+                [(hcp, sentiment, n) for (hcp, sentiment), n in sorted(self.hcp_counts.items(), key=lambda item: (item[0][0].casefold(), item[0][1]))],
+            )
+        if self.product_counts:
+            cursor.executemany(
+                f"""
+                INSERT INTO analytics_product_sentiment{table_suffix} (product_key, sentiment, product_name, interaction_count) VALUES (%s, %s, %s, %s)
+                ON DUPLICATE KEY UPDATE interaction_count = interaction_count + VALUES(interaction_count)
+                """,
+                [(key, sentiment, self.product_names[key], n) for (key, sentiment), n in sorted(self.product_counts.items())],
+            )
+        if self.week_counts:
+            cursor.executemany(
+                f"""
+                INSERT INTO analytics_weekly_sentiment{table_suffix} (week_start, sentiment, interaction_count) VALUES (%s, %s, %s)
+                ON DUPLICATE KEY UPDATE interaction_count = interaction_count + VALUES(interaction_count)
+                """,
+                [(week, sentiment, n) for (week, sentiment), n in sorted(self.week_counts.items())],
+            )
+        if self.product_rows:
+            cursor.executemany(
+                f"INSERT IGNORE INTO interaction_products{table_suffix} (interaction_id, product_key, product_name) VALUES (%s, %s, %s)",
+                self.product_rows,
+            )
+
+
+def rebuild_rollups(conn, batch_size: int = 5000):
+    """
+    Recomputes product rows and every rollup from hcp_interactions without pausing inserts or
+    showing dashboards partial counts. Used by migration 4 and `python analytics.py rebuild`.
+
+    1. Shadow tables are filled from one consistent snapshot, which also records the live
+       rollup counts as of that snapshot.
+    2. One RENAME TABLE swaps the shadows in; it waits for insert transactions already writing
+       rollups, so after it the retired tables stop changing.
+    3. Whatever the retired tables gained after the snapshot (interactions committed during the
+       rebuild) is added to the new tables, then the retired tables are dropped.
+    An interrupted rebuild leaves only shadow or retired tables behind, which the next run drops.
+    """
+    cursor = conn.cursor()
+    try:
+        for table in ROLLUP_TABLES:
+            cursor.execute(f"DROP TABLE IF EXISTS {table}{REBUILD_SUFFIX}")
+            cursor.execute(f"DROP TABLE IF EXISTS {table}{RETIRED_SUFFIX}")
+            cursor.execute(f"CREATE TABLE {table}{REBUILD_SUFFIX} LIKE {table}")
+
+        cursor.execute("START TRANSACTION WITH CONSISTENT SNAPSHOT")
+        counts_at_snapshot = _read_rollup_counts(cursor, "")
+        last_id = 0
+        while True:
+            cursor.execute(
+                "SELECT id, hcp_name, interaction_date, products_discussed, sentiment FROM hcp_interactions WHERE id > %s ORDER BY id LIMIT %s",
+                (last_id, batch_size),
+            )
+            rows = cursor.fetchall()
+            if not rows:
+                break
+            delta = RollupDelta()
+            for row in rows:
+                delta.add(*row)
+            # Shadow writes stay in the snapshot's transaction: committing would end the snapshot
+            delta.apply(cursor, REBUILD_SUFFIX)
+            last_id = rows[-1][0]
+        conn.commit()
+
+        cursor.execute("RENAME TABLE " + ", ".join(
+            f"{table} TO {table}{RETIRED_SUFFIX}, {table}{REBUILD_SUFFIX} TO {table}" for table in ROLLUP_TABLES
+        ))
+
+        catch_up = _read_rollup_counts(cursor, RETIRED_SUFFIX).minus(counts_at_snapshot)
+        catch_up.apply(cursor)
+        # Interactions committed after the snapshot have no product rows in the new table yet
+        cursor.execute(f"""
+            INSERT IGNORE INTO interaction_products (interaction_id, product_key, product_name)
+            SELECT r.interaction_id, r.product_key, r.product_name FROM interaction_products{RETIRED_SUFFIX} r
+            WHERE NOT EXISTS (SELECT 1 FROM interaction_products p WHERE p.interaction_id = r.interaction_id)
+        """)
+        conn.commit()
+        for table in ROLLUP_TABLES:
+            cursor.execute(f"DROP TABLE {table}{RETIRED_SUFFIX}")
+    finally:
+        cursor.close()
+
+
+def _read_rollup_counts(cursor, table_suffix: str) -> RollupDelta:
+    """The three count tables (not product rows) as a RollupDelta."""
+    counts = RollupDelta()
+    cursor.execute(f"SELECT hcp_name, sentiment, interaction_count FROM analytics_hcp_sentiment{table_suffix}")
+    counts.hcp_counts.update({(hcp, sentiment): n for hcp, sentiment, n in cursor.fetchall()})
+    cursor.execute(f"SELECT product_key, sentiment, product_name, interaction_count FROM analytics_product_sentiment{table_suffix}")
+    for key, sentiment, name, n in cursor.fetchall():
+        counts.product_counts[(key, sentiment)] = n
+        counts.product_names[key] = name
+    cursor.execute(f"SELECT week_start, sentiment, interaction_count FROM analytics_weekly_sentiment{table_suffix}")
+    counts.week_counts.update({(week, sentiment): n for week, sentiment, n in cursor.fetchall()})
+    return counts
+
+
+def _pivot_sql(key_columns: str, table: str) -> str:
+    counts = ", ".join(
+        f"SUM(CASE WHEN sentiment = '{s}' THEN interaction_count ELSE 0 END)"
+        for s in SENTIMENTS + (UNKNOWN_SENTIMENT,)
+    )
+    return f"SELECT {key_columns}, {counts}, SUM(interaction_count) AS total FROM {table}"
+
+
+def query_rollups(conn, dimension: str, hcp_name: Optional[str] = None, product: Optional[str] = None,
+                  date_from: Optional[date] = None, date_to: Optional[date] = None, limit: int = 50) -> List[Dict[str, Any]]:
+    """
+    Sentiment counts per HCP (busiest first), per product (busiest first) or per week (newest
+    first), read from the rollup tables only. Runs on a pool worker thread.
+    """
+    clauses: List[str] = []
+    params: List[Any] = []
+    if dimension == "hcp":
+        sql = _pivot_sql("hcp_name, MIN(hcp_name)", "analytics_hcp_sentiment")
+        if hcp_name:
+            clauses.append("hcp_name = %s")
+            params.append(hcp_name)
+        group_order = " GROUP BY hcp_name ORDER BY total DESC, hcp_name"
+    elif dimension == "product":
+        sql = _pivot_sql("product_key, MIN(product_name)", "analytics_product_sentiment")
+        if product:
+            clauses.append("product_key = %s")
+            params.append(product_key(product))
+        group_order = " GROUP BY product_key ORDER BY total DESC, product_key"
+    elif dimension == "week":
+        sql = _pivot_sql("week_start, week_start", "analytics_weekly_sentiment")
+        if date_from:
+            clauses.append("week_start >= %s")
+            params.append(week_start(date_from))
+        if date_to:
+            clauses.append("week_start <= %s")
+            params.append(date_to)
+        group_order = " GROUP BY week_start ORDER BY week_start DESC"
+    else:
+        raise ValueError(f"Unknown analytics dimension: {dimension!r}")
+
+    if clauses:
+        sql += " WHERE " + " AND ".join(clauses)
+    sql += group_order + " LIMIT %s"
+    params.append(limit)
+
+    cursor = conn.cursor()
+    try:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+    finally:
+        cursor.close()
+
+    results = []
+    for key, label, *counts, total in rows:
+        results.append({
+            "key": key.isoformat() if isinstance(key, date) else key,
+            "label": label.isoformat() if isinstance(label, date) else label,
+            "counts": dict(zip(SENTIMENTS + (UNKNOWN_SENTIMENT,), (int(c) for c in counts))),
+            "total": int(total),
+        })
+    return results
+
+
+def main():
+    import argparse
+
+    import mysql.connector
+
+    from main import MYSQL_CONFIG
+
+    parser = argparse.ArgumentParser(description="Analytics rollup maintenance")
+    parser.add_argument("command", choices=["rebuild"])
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--database", default=None, help="Override MYSQL_CONFIG['database']")
+    args = parser.parse_args()
+
+    config = dict(MYSQL_CONFIG)
+    if args.database:
+        config["database"] = args.database
+    conn = mysql.connector.connect(**config)
+    try:
+        started = datetime.now()
+        rebuild_rollups(conn, batch_size=args.batch_size)
+        print(f"Rebuilt analytics rollups in {(datetime.now() - started).total_seconds():.1f}s")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
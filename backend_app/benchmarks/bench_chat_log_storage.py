@@ -0,0 +1,226 @@
+# backend_app/benchmarks/bench_chat_log_storage.py
+#
+# Row size and scan speed of hcp_interactions before and after migration 5, which moves
+# raw_chat_log out of the main table into zlib-compressed interaction_chat_logs. Seeds the
+# legacy layout (transcript inline), measures, runs the migration 5 steps, and measures again.
+#
+# Runs on the SQLite stand-in by default. --mysql uses MYSQL_CONFIG from main.py against the
+# scratch schema given by --database; every app table in it is dropped first.
+#
+# Run (from backend_app directory):
+#   python benchmarks/bench_chat_log_storage.py --rows 50000
+#   python benchmarks/bench_chat_log_storage.py --mysql --database hcp_bench --rows 500000
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from chat_log_storage import load_chat_log  # noqa: E402
+from interaction_queries import InteractionFilters, build_list_query  # noqa: E402
+from migrations import MIGRATIONS, apply_migrations  # noqa: E402
+from sqlite_standin import create_standin_database  # noqa: E402
+
+CHAT_LOG_MIGRATION = 5
+LEGACY_INSERT_SQL = """
+    INSERT INTO hcp_interactions
+    (hcp_name, interaction_date, products_discussed, key_discussion_points, sentiment, follow_up_actions, interaction_method, raw_chat_log)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+"""
+BASE_COLUMNS = ("hcp_name", "products_discussed", "key_discussion_points", "follow_up_actions", "interaction_method")
+APP_TABLES = (
+    "interaction_chat_logs", "interaction_search_docs", "interaction_products", "analytics_hcp_sentiment",
+    "analytics_product_sentiment", "analytics_weekly_sentiment", "hcp_interactions", "schema_migrations",
+)
+SENTENCES = [
+    "Can you tell me more about the renal dosing guidance?",
+    "We reviewed the phase three results and the safety profile in older adults.",
+    "They were concerned about formulary coverage for the next plan year.",
+    "Please send the patient support brochure and the savings card details.",
+    "The practice sees roughly forty patients a week who might qualify.",
+    "Thanks, that covers it. What else do you need from me?",
+]
+
+
+def legacy_layout_sqlite(path):
+    factory = create_standin_database(path)
+    conn = factory()
+    cursor = conn.cursor()
+    cursor.execute("DROP TABLE IF EXISTS interaction_chat_logs")
+    cursor.execute("ALTER TABLE hcp_interactions ADD COLUMN raw_chat_log TEXT")
+    conn.commit()
+    cursor.close()
+    return conn
+
+
+def legacy_layout_mysql(database):
+    import mysql.connector
+
+    from main import MYSQL_CONFIG
+
+    conn = mysql.connector.connect(**{**MYSQL_CONFIG, "database": database})
+    cursor = conn.cursor()
+    for table in APP_TABLES:
+        cursor.execute(f"DROP TABLE IF EXISTS {table}")
+    cursor.close()
+    apply_migrations(conn, target_version=CHAT_LOG_MIGRATION - 1)
+    return conn
+
+
+def seed(conn, rows, chat_share, min_turns, max_turns, batch_size=2000):
+    rng = random.Random(7)
+    cursor = conn.cursor()
+    total_log_bytes = 0
+    for start in range(0, rows, batch_size):
+        batch = []
+        for _ in range(min(batch_size, rows - start)):
+            is_chat = rng.random() < chat_share
+            raw_chat_log = None
+            if is_chat:
+                turns = [
+                    {"role": "user" if i % 2 == 0 else "assistant", "content": " ".join(rng.sample(SENTENCES, rng.randint(1, 3)))}
+                    for i in range(rng.randint(min_turns, max_turns))
+                ]
+                raw_chat_log = json.dumps(turns)
+                total_log_bytes += len(raw_chat_log)
+            batch.append((
+                f"Dr. Bench {rng.randint(0, 2000)}",
+                date(2022, 1, 1) + timedelta(days=rng.randint(0, 1000)),
+                "ProductA, ProductB",
+                "Reviewed efficacy data and next steps.",
+                rng.choice(["Positive", "Neutral", "Negative"]),
+                "Send follow-up materials.",
+                "chat" if is_chat else "form",
+                raw_chat_log,
+            ))
+        cursor.executemany(LEGACY_INSERT_SQL, batch)
+        conn.commit()
+    cursor.close()
+    return total_log_bytes
+
+
+def time_median(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return round(statistics.median(samples), 3)
+
+
+def table_sizes(conn, backend):
+    """Physical bytes per table (data plus indexes) as reported by the engine."""
+    cursor = conn.cursor()
+    try:
+        if backend == "mysql":
+            cursor.execute("ANALYZE TABLE hcp_interactions")
+            cursor.fetchall()
+            cursor.execute(
+                "SELECT table_name, data_length + index_length, avg_row_length FROM information_schema.TABLES "
+                "WHERE table_schema = DATABASE() AND table_name IN ('hcp_interactions', 'interaction_chat_logs')"
+            )
+            return {name: {"bytes": int(size), "avg_row_length": int(avg)} for name, size, avg in cursor.fetchall()}
+        cursor.execute(
+            "SELECT name, SUM(pgsize) FROM dbstat WHERE name IN ('hcp_interactions', 'interaction_chat_logs') GROUP BY name"
+        )
+        return {name: {"bytes": int(size)} for name, size in cursor.fetchall()}
+    finally:
+        cursor.close()
+
+
+def measure(conn, backend, inline_log, sample_ids, repeat):
+    columns = BASE_COLUMNS + (("raw_chat_log",) if inline_log else ())
+    lengths = " + ".join(f"COALESCE(LENGTH({column}), 0)" for column in columns)
+    cursor = conn.cursor()
+    cursor.execute(f"SELECT COUNT(*), AVG({lengths}) FROM hcp_interactions")
+    row_count, avg_bytes = cursor.fetchone()
+
+    def full_scan():
+        cursor.execute("SELECT * FROM hcp_interactions")
+        cursor.fetchall()
+
+    def point_fetches():
+        for interaction_id in sample_ids:
+            cursor.execute("SELECT * FROM hcp_interactions WHERE id = %s", (interaction_id,))
+            cursor.fetchone()
+
+    list_sql, list_params = build_list_query(InteractionFilters(), None, 50)
+
+    def list_page():
+        cursor.execute(list_sql, list_params)
+        cursor.fetchall()
+
+    result = {
+        "rows": row_count,
+        "avg_logical_row_bytes": round(float(avg_bytes or 0), 1),
+        "table_bytes": table_sizes(conn, backend),
+        "full_scan_ms": time_median(full_scan, repeat),
+        "select_star_by_id_ms_per_1000": round(time_median(point_fetches, repeat) * 1000 / len(sample_ids), 3),
+        "list_page_ms": time_median(list_page, repeat),
+    }
+    if not inline_log:
+        cursor.execute("SELECT COALESCE(SUM(raw_bytes), 0), COALESCE(SUM(LENGTH(log_zlib)), 0) FROM interaction_chat_logs")
+        raw_bytes, compressed_bytes = cursor.fetchone()
+        result["chat_log_compression_ratio"] = round(raw_bytes / compressed_bytes, 2) if compressed_bytes else None
+        result["lazy_chat_log_fetch_ms_per_1000"] = round(
+            time_median(lambda: [load_chat_log(cursor, i) for i in sample_ids], repeat) * 1000 / len(sample_ids), 3
+        )
+    cursor.close()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="hcp_interactions row size and scan speed before/after moving raw_chat_log out")
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--chat-share", type=float, default=0.5, help="Fraction of interactions logged through chat")
+    parser.add_argument("--min-turns", type=int, default=4)
+    parser.add_argument("--max-turns", type=int, default=60)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--mysql", action="store_true", help="Use MySQL (MYSQL_CONFIG) instead of the SQLite stand-in")
+    parser.add_argument("--database", default=None, help="Scratch MySQL schema; required with --mysql")
+    parser.add_argument("--output", default=None, help="Write results as JSON to this file")
+    args = parser.parse_args()
+    if args.mysql and not args.database:
+        parser.error("--mysql needs --database pointing at a scratch schema (its tables are dropped)")
+
+    backend = "mysql" if args.mysql else "sqlite"
+    conn = legacy_layout_mysql(args.database) if args.mysql else legacy_layout_sqlite(os.path.join(tempfile.mkdtemp(prefix="crm-chatlog-"), "bench.db"))
+    print(f"Seeding {args.rows} interactions ({backend})...")
+    log_bytes = seed(conn, args.rows, args.chat_share, args.min_turns, args.max_turns)
+    sample_ids = random.Random(3).sample(range(1, args.rows + 1), min(1000, args.rows))
+
+    before = measure(conn, backend, True, sample_ids, args.repeat)
+    started = time.perf_counter()
+    cursor = conn.cursor()
+    (_, _, steps), = [m for m in MIGRATIONS if m[0] == CHAT_LOG_MIGRATION]
+    for step in steps:
+        step(conn) if callable(step) else cursor.execute(step)
+    conn.commit()
+    if backend == "sqlite":
+        # InnoDB rebuilds the table on DROP COLUMN; SQLite leaves the old pages in place until VACUUM
+        cursor.execute("VACUUM")
+    cursor.close()
+    migration_s = round(time.perf_counter() - started, 2)
+    after = measure(conn, backend, False, sample_ids, args.repeat)
+    conn.close()
+
+    results = {
+        "backend": backend, "rows": args.rows, "chat_share": args.chat_share,
+        "turns": [args.min_turns, args.max_turns], "raw_chat_log_bytes": log_bytes,
+        "migration_s": migration_s, "before": before, "after": after,
+    }
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
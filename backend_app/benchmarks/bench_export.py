@@ -0,0 +1,171 @@
+# backend_app/benchmarks/bench_export.py
+#
+# Peak memory and throughput of the streaming interaction export (interaction_export.py) as the
+# export grows, against the naive approach of fetchall() and building HCPInteractionOutput models.
+# Seeds the SQLite stand-in, runs each export through the real connection pool, and traces Python
+# allocations on every thread (tracemalloc), so the peak covers the cursor, encoders and queue.
+# Also checks that a slow reader holds the export back rather than letting chunks pile up, and
+# that a client disconnecting mid-export frees the pool connection.
+#
+# Run (from backend_app directory):
+#   python benchmarks/bench_export.py --rows 200000
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from chat_log_storage import chat_log_row  # noqa: E402
+from db import MySQLConnectionPool  # noqa: E402
+from interaction_export import EXPORT_COLUMNS, InteractionExport, build_export_query, parquet_available  # noqa: E402
+from interaction_queries import InteractionFilters  # noqa: E402
+from sqlite_standin import create_standin_database  # noqa: E402
+
+INSERT_SQL = """
+    INSERT INTO hcp_interactions
+    (hcp_name, interaction_date, products_discussed, key_discussion_points, sentiment, follow_up_actions, interaction_method, hcp_id)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+"""
+
+
+def seed(connect, rows, batch_size=5000):
+    rng = random.Random(5)
+    conn = connect()
+    cursor = conn.cursor()
+    for start in range(0, rows, batch_size):
+        count = min(batch_size, rows - start)
+        cursor.executemany(INSERT_SQL, [
+            (
+                f"Dr. Export {rng.randint(0, 5000)}",
+                date(2022, 1, 1) + timedelta(days=rng.randint(0, 1000)),
+                "ProductA, ProductB",
+                "Reviewed efficacy data, the dosing schedule and coverage for the next plan year.",
+                rng.choice(["Positive", "Neutral", "Negative"]),
+                "Send follow-up materials and schedule a lunch-and-learn.",
+                rng.choice(["form", "chat"]),
+                rng.randint(1, 5000),
+            )
+            for _ in range(count)
+        ])
+        transcript = json.dumps([{"role": "user", "content": "Logged a visit about ProductA dosing."}] * 6)
+        cursor.executemany(
+            "INSERT INTO interaction_chat_logs (interaction_id, turn_count, raw_bytes, log_zlib) VALUES (%s, %s, %s, %s)",
+            [chat_log_row(interaction_id, transcript) for interaction_id in range(start + 1, start + count + 1, 2)],
+        )
+        conn.commit()
+    cursor.close()
+    conn.close()
+
+
+async def run_export(pool, export_format, filters, gzip=False, include_chat_log=False, read_delay=0.0, stop_after=None):
+    export = InteractionExport(export_format, filters, include_chat_log, gzip)
+    received = chunks = 0
+    stream = export.stream(pool)
+    async for chunk in stream:
+        received += len(chunk)
+        chunks += 1
+        if read_delay:
+            await asyncio.sleep(read_delay)
+        if stop_after is not None and chunks >= stop_after:
+            break
+    await stream.aclose()
+    return export, received
+
+
+def naive_export(conn, filters):
+    """What the request warns about: the whole result, then one model per row, then the body."""
+    from main import HCPInteractionOutput
+
+    sql, params = build_export_query(filters, False)
+    cursor = conn.cursor()
+    cursor.execute(sql, params)
+    rows = cursor.fetchall()
+    cursor.close()
+    models = [HCPInteractionOutput(**dict(zip(EXPORT_COLUMNS, row))) for row in rows]
+    return "\n".join(model.model_dump_json() for model in models)
+
+
+async def traced(fn):
+    """Awaits fn() and returns (result, seconds, peak traced MB above the starting point)."""
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    started = time.perf_counter()
+    result = await fn()
+    elapsed = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, round(elapsed, 2), round((peak - baseline) / 1024 / 1024, 2)
+
+
+async def run_benchmark(connect, rows):
+    pool = MySQLConnectionPool({}, pool_size=2, connect=connect)
+    # The whole table, and a date filter covering roughly a tenth of it
+    tenth = InteractionFilters(date_from=date(2022, 1, 1), date_to=date(2022, 4, 10))
+    full = InteractionFilters()
+    formats = [("ndjson", False, False), ("ndjson", True, False), ("csv", False, False), ("csv", False, True)]
+    if parquet_available():
+        formats.append(("parquet", False, False))
+
+    results = {"rows": rows, "streaming": [], "naive": []}
+    for export_format, gzip, include_chat_log in formats:
+        for label, filters in (("tenth", tenth), ("full", full)):
+            (export, received), seconds, peak_mb = await traced(
+                lambda: run_export(pool, export_format, filters, gzip, include_chat_log)
+            )
+            results["streaming"].append({
+                "format": export_format, "gzip": gzip, "chat_log": include_chat_log, "export": label,
+                "rows": export.rows, "bytes": received, "seconds": seconds,
+                "rows_per_s": int(export.rows / seconds) if seconds else None, "peak_traced_mb": peak_mb,
+            })
+            print(json.dumps(results["streaming"][-1]))
+
+    for label, filters in (("tenth", tenth), ("full", full)):
+        body, seconds, peak_mb = await traced(lambda: pool.run(naive_export, filters))
+        results["naive"].append({"export": label, "bytes": len(body), "seconds": seconds, "peak_traced_mb": peak_mb})
+        print(json.dumps(results["naive"][-1]))
+        del body
+
+    # A reader taking 20 ms per chunk: the worker has to wait on the bounded queue, not run ahead
+    (export, _), seconds, peak_mb = await traced(lambda: run_export(pool, "ndjson", tenth, read_delay=0.02))
+    results["slow_reader"] = {"rows": export.rows, "seconds": seconds, "peak_traced_mb": peak_mb}
+
+    # Disconnect after three chunks: the worker stops and drops the connection it was reading on
+    before = pool.stats()
+    export, _ = await run_export(pool, "ndjson", full, stop_after=3)
+    await asyncio.sleep(1.0)  # The worker notices the cancel within its 0.25 s poll
+    after = pool.stats()
+    results["disconnect"] = {
+        "rows_fetched": export.rows, "open_before": before["open"], "open_after": after["open"],
+        "in_use_after": after["in_use"],
+    }
+    pool.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Streaming export memory and throughput on the SQLite stand-in")
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--output", default=None, help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    connect = create_standin_database(os.path.join(tempfile.mkdtemp(prefix="crm-export-"), "bench.db"))
+    print(f"Seeding {args.rows} interactions...")
+    seed(connect, args.rows)
+    results = asyncio.run(run_benchmark(connect, args.rows))
+
+    print(json.dumps({key: results[key] for key in ("slow_reader", "disconnect")}, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+# backend_app/benchmarks/bench_extraction.py
+#
+# Microbenchmark: compiled extractor vs. the original per-field regex extractor.
+# Also asserts both produce identical output on the corpus, so a speedup can't hide a regression.
+#
+# Run (from backend_app directory): python benchmarks/bench_extraction.py [--texts 5000] [--repeat 5]
+
+import argparse
+import os
+import random
+import re
+import sys
+import time
+from datetime import date
+from typing import Any, Dict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from extraction import InteractionExtractor  # noqa: E402
+
+
+def legacy_extract_interaction_details_from_text(text: str, existing_data: Dict = None) -> Dict[str, Any]:
+    """Verbatim copy of the original implementation from main.py, kept as the reference."""
+    if existing_data is None:
+        existing_data = {}
+
+    extracted = existing_data.copy()
+
+    if not extracted.get("hcp_name"):
+        match_hcp = re.search(r"(?:dr\.|doctor|hcp)\s*([A-Za-z\s]+?)(?:\s*(?:on|about|regarding|and|\.|$))", text, re.IGNORECASE)
+        if match_hcp:
+            extracted["hcp_name"] = match_hcp.group(1).strip().title()
+
+    if not extracted.get("interaction_date"):
+        match_date = re.search(r"(\d{4}-\d{2}-\d{2})|today", text, re.IGNORECASE)
+        if match_date:
+            if match_date.group(1):
+                extracted["interaction_date"] = match_date.group(1)
+            elif match_date.group(0).lower() == "today":
+                extracted["interaction_date"] = date.today().isoformat()
+
+    if not extracted.get("products_discussed"):
+        match_products = re.search(r"(?:products? discussed|talked about|mentioned)\s*(.*?)(?:\.|and key|and the main)", text, re.IGNORECASE)
+        if match_products:
+            extracted["products_discussed"] = match_products.group(1).strip()
+        elif "producta" in text.lower() or "productb" in text.lower():
+            prods = []
+            if "producta" in text.lower(): prods.append("ProductA")
+            if "productb" in text.lower(): prods.append("ProductB")
+            extracted["products_discussed"] = ", ".join(prods)
+
+    if not extracted.get("key_discussion_points"):
+        match_points = re.search(r"(?:key points?|discussion points|main point was)\s*(.*?)(?:\.|and sentiment|and follow-up)", text, re.IGNORECASE)
+        if match_points:
+            extracted["key_discussion_points"] = match_points.group(1).strip()
+        elif "efficacy data" in text.lower():
+            extracted["key_discussion_points"] = "Efficacy data"
+
+    if not extracted.get("sentiment"):
+        if "positive" in text.lower(): extracted["sentiment"] = "Positive"
+        elif "neutral" in text.lower(): extracted["sentiment"] = "Neutral"
+        elif "negative" in text.lower(): extracted["sentiment"] = "Negative"
+
+    if not extracted.get("follow_up_actions"):
+        match_follow_up = re.search(r"(?:follow-up actions?|next steps?|action items?)\s*(.*?)(?:\.|$)", text, re.IGNORECASE)
+        if match_follow_up:
+            extracted["follow_up_actions"] = match_follow_up.group(1).strip()
+        elif "send publication" in text.lower():
+            extracted["follow_up_actions"] = "Send publication"
+
+    return extracted
+
+
+FRAGMENTS = [
+    "Met Dr. Smith today",
+    "Visited doctor Alice Brown on 2024-03-15",
+    "hcp Patel regarding the new guidance",
+    "We talked about ProductA and key points were dosing.",
+    "Products discussed ProductB, ProductC. ",
+    "The main point was efficacy data and sentiment positive.",
+    "Key points renal safety and follow-up with MSL.",
+    "Overall it felt neutral",
+    "She was negative about pricing",
+    "Next steps send publication.",
+    "Action items schedule a lunch and learn",
+    "follow-up actions: share the trial summary.",
+    "mentioned productb interest",
+    "hi",
+    "log it",
+    "yes that's correct",
+    "Thanks, nothing else to add right now",
+    "DR. JONES AND TEAM",
+    "Discussion points covered the TODAY study and next step planning",
+    "Doctor Dr. Who met the hcproducts discussed team",
+    "Rendez-vous avec Dr. Müller aujourd'hui, Ärztin sehr positiv",
+    "\u0130stanbul visit with DOCTOR Kaya, next ſteps unclear.",
+]
+
+
+def build_corpus(count: int, seed: int = 7):
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(count):
+        parts = rng.sample(FRAGMENTS, rng.randint(1, 5))
+        filler = " ".join(rng.choice(["lorem", "ipsum", "clinic", "visit", "patients", "weekly"]) for _ in range(rng.randint(0, 60)))
+        corpus.append(" ".join(parts[:2]) + " " + filler + " " + " ".join(parts[2:]))
+    corpus.extend(FRAGMENTS)
+    return corpus
+
+
+def bench(fn, corpus, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for text in corpus:
+            fn(text)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--texts", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    extractor = InteractionExtractor()
+    corpus = build_corpus(args.texts)
+
+    # Behavioural equivalence, both from scratch and with partially filled state
+    partial_states = [{}, {"hcp_name": "Dr X"}, {"hcp_name": "A", "interaction_date": "2024-01-01", "sentiment": "Neutral"}]
+    for text in corpus:
+        for state in partial_states:
+            expected = legacy_extract_interaction_details_from_text(text, state)
+            actual = extractor.extract(text, state)
+            if expected != actual:
+                raise SystemExit(f"Mismatch on {text!r} with {state}:\n legacy={expected}\n   new={actual}")
+    print(f"Equivalence: OK on {len(corpus)} texts x {len(partial_states)} starting states")
+
+    legacy_time = bench(legacy_extract_interaction_details_from_text, corpus, args.repeat)
+    new_time = bench(extractor.extract, corpus, args.repeat)
+    started = time.perf_counter()
+    extractor.extract_batch(corpus)
+    batch_time = time.perf_counter() - started
+
+    per_text = lambda t: 1e6 * t / len(corpus)
+    print(f"legacy  : {legacy_time:.4f}s  ({per_text(legacy_time):.2f} us/text)")
+    print(f"compiled: {new_time:.4f}s  ({per_text(new_time):.2f} us/text)  speedup x{legacy_time / new_time:.2f}")
+    print(f"batch   : {batch_time:.4f}s  ({per_text(batch_time):.2f} us/text)")
+
+
+if __name__ == "__main__":
+    main()
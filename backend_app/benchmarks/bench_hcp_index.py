@@ -0,0 +1,137 @@
+# backend_app/benchmarks/bench_hcp_index.py
+#
+# Lookup latency, build time and memory of the in-memory HCP directory index (hcp_directory.py)
+# on a synthetic directory. Entirely in-process, no database: the index is built the same way
+# HCPIndex.load() builds it from the hcps table.
+#
+# Run (from backend_app directory):
+#   python benchmarks/bench_hcp_index.py --hcps 150000
+
+import argparse
+import json
+import os
+import random
+import statistics
+import string
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from hcp_directory import HCPEntry, HCPIndex, name_key  # noqa: E402
+
+FIRST_NAMES = [
+    "james", "mary", "robert", "patricia", "john", "jennifer", "michael", "linda", "david", "elizabeth",
+    "william", "barbara", "richard", "susan", "joseph", "jessica", "thomas", "sarah", "charles", "karen",
+    "priya", "rahul", "sanika", "aditya", "wei", "mei", "hiroshi", "yuki", "fatima", "omar", "ana", "jose",
+    "lucia", "mateo", "olga", "ivan", "chloe", "lucas", "amara", "kwame",
+]
+SYLLABLES = ["son", "ler", "man", "berg", "ton", "ski", "ova", "ez", "well", "field", "ridge", "ford", "wood", "ham", "kar", "dia"]
+
+
+def synthetic_names(count, rng):
+    names = set()
+    while len(names) < count:
+        last = "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(2, 4))) + "".join(rng.sample(SYLLABLES, rng.randint(1, 2)))
+        middle = f" {rng.choice(string.ascii_lowercase)}." if rng.random() < 0.2 else ""
+        names.add(f"Dr. {rng.choice(FIRST_NAMES).title()}{middle} {last.title()}")
+    return sorted(names)
+
+
+def typo(name, rng):
+    chars = list(name)
+    i = rng.randrange(4, len(chars) - 1)  # Past the "Dr. " title
+    edit = rng.choice(("swap", "drop", "replace"))
+    if edit == "swap":
+        chars[i], chars[i + 1] = chars[i + 1], chars[i]
+    elif edit == "drop":
+        del chars[i]
+    else:
+        chars[i] = rng.choice(string.ascii_lowercase)
+    return "".join(chars)
+
+
+def latency(fn, queries):
+    samples = []
+    for query in queries:
+        started = time.perf_counter()
+        fn(query)
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return {
+        "p50_ms": round(statistics.median(samples), 4),
+        "p99_ms": round(samples[int(len(samples) * 0.99) - 1], 4),
+        "max_ms": round(samples[-1], 4),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HCP directory index lookup latency and memory")
+    parser.add_argument("--hcps", type=int, default=150000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--output", default=None, help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    rng = random.Random(11)
+    names = synthetic_names(args.hcps, rng)
+    # Zipf-like interaction counts, so the ranking of short prefixes matters
+    entries = [HCPEntry(i + 1, name_key(name), name, int(1000 / (rng.random() * 50 + 1))) for i, name in enumerate(names)]
+
+    tracemalloc.start()  # Separate build: tracing slows it down several times
+    traced = HCPIndex()
+    traced.build(entries)
+    index_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del traced
+    index = HCPIndex()
+    started = time.perf_counter()
+    index.build(entries)
+    build_s = time.perf_counter() - started
+
+    sample = rng.sample(names, args.queries)
+    keys = [name_key(name) for name in sample]
+    last_names = [key.split()[-1] for key in keys]
+    results = {
+        "hcps": len(index),
+        "build_s": round(build_s, 2),
+        "index_mb": round(index_bytes / 1024 / 1024, 1),
+        "stats": index.stats(),
+        "suggest": {
+            "prefix_1_char": latency(lambda q: index.suggest(q, args.limit), [key[:1] for key in keys]),
+            "prefix_3_chars": latency(lambda q: index.suggest(q, args.limit), [key[:3] for key in keys]),
+            "prefix_5_chars": latency(lambda q: index.suggest(q, args.limit), [key[:5] for key in keys]),
+            "last_name_prefix_6": latency(lambda q: index.suggest(q, args.limit), [last[:6] for last in last_names]),
+            "full_name": latency(lambda q: index.suggest(q, args.limit), sample),
+            "typo_fuzzy": latency(lambda q: index.suggest(q, args.limit), [typo(name, rng) for name in sample]),
+        },
+        "resolve": {
+            "exact": latency(index.resolve, sample),
+            "typo": latency(index.resolve, [typo(name, rng) for name in sample]),
+            "unknown": latency(index.resolve, synthetic_names(args.queries, random.Random(99))),
+        },
+    }
+
+    new_rows = [(len(names) + i + 1, name_key(name), name, 1) for i, name in enumerate(synthetic_names(200, random.Random(5)))]
+    results["record_new_hcp"] = latency(lambda row: index.record([row]), new_rows)
+    results["record_count_bump"] = latency(
+        lambda entry: index.record([(entry.id, entry.key, entry.name, entry.interaction_count + 1)]), rng.sample(entries, 200)
+    )
+
+    typos = [(typo(name, rng), name) for name in sample]
+    resolved = [index.resolve(wrong) for wrong, _ in typos]
+    results["typo_resolution"] = {
+        "resolved_correctly": sum(1 for entry, (_, right) in zip(resolved, typos) if entry is not None and entry.name == right),
+        "resolved_wrongly": sum(1 for entry, (_, right) in zip(resolved, typos) if entry is not None and entry.name != right),
+        "unresolved": sum(1 for entry in resolved if entry is None),
+    }
+
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+# backend_app/benchmarks/bench_interaction_pages.py
+#
+# Page latency of the interaction list query at millions of rows: keyset (seek) pagination vs.
+# the OFFSET equivalent, with and without filters. Needs a MySQL server; uses MYSQL_CONFIG from
+# main.py unless --database points somewhere else. Seeds synthetic rows until the table holds
+# --rows rows, applying migrations first so the composite indexes exist.
+#
+# Run (from backend_app directory): python benchmarks/bench_interaction_pages.py --rows 2000000
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import mysql.connector  # noqa: E402
+
+from main import INTERACTION_INSERT_SQL, MYSQL_CONFIG  # noqa: E402
+from migrations import apply_migrations  # noqa: E402
+from interaction_queries import InteractionFilters, LIST_COLUMNS, build_list_query, list_interactions  # noqa: E402
+
+HCP_NAMES = [f"Dr. Synthetic {i}" for i in range(5000)]
+PRODUCTS = ["ProductA", "ProductB", "ProductC", "ProductD"]
+SENTIMENTS = ["Positive", "Neutral", "Negative", None]
+
+
+def seed(conn, target_rows, batch_size=5000):
+    cursor = conn.cursor()
+    cursor.execute("SELECT COUNT(*) FROM hcp_interactions")
+    (existing,) = cursor.fetchone()
+    rng = random.Random(42)
+    start_day = date(2018, 1, 1)
+    remaining = target_rows - existing
+    print(f"Table has {existing} rows; seeding {max(0, remaining)} more")
+    while remaining > 0:
+        batch = []
+        for _ in range(min(batch_size, remaining)):
+            batch.append((
+                rng.choice(HCP_NAMES),
+                start_day + timedelta(days=rng.randint(0, 365 * 7)),
+                ", ".join(rng.sample(PRODUCTS, rng.randint(1, 2))),
+                "Synthetic discussion points",
+                rng.choice(SENTIMENTS),
+                "Synthetic follow-up",
+                rng.choice(["form", "chat"]),
+                None,  # hcp_id; synthetic rows are not linked to the HCP directory
+            ))
+        cursor.executemany(INTERACTION_INSERT_SQL, batch)
+        conn.commit()
+        remaining -= len(batch)
+    cursor.close()
+
+
+def time_call(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return round(statistics.median(samples), 3)
+
+
+def offset_page(conn, filters, page, limit):
+    sql, params = build_list_query(filters, None, limit)
+    sql = sql.replace("LIMIT %s", "LIMIT %s OFFSET %s")
+    params = params[:-1] + [limit, page * limit]
+    cursor = conn.cursor()
+    cursor.execute(sql, params)
+    cursor.fetchall()
+    cursor.close()
+
+
+def keyset_cursor_for_page(conn, filters, page, limit):
+    """Walks to the requested page using keyset cursors (untimed set-up)."""
+    cursor = None
+    for _ in range(page):
+        _, cursor = list_interactions(conn, filters, cursor, limit)
+        if cursor is None:
+            break
+    return cursor
+
+
+def explain(conn, filters, limit):
+    sql, params = build_list_query(filters, None, limit)
+    cursor = conn.cursor()
+    cursor.execute("EXPLAIN " + sql, params)
+    columns = [c[0] for c in cursor.description]
+    plan = [dict(zip(columns, row)) for row in cursor.fetchall()]
+    cursor.close()
+    return [{k: p.get(k) for k in ("table", "type", "key", "rows", "Extra")} for p in plan]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Keyset vs OFFSET page latency on hcp_interactions")
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--pages", default="0,10,100,1000,5000")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--database", default=None, help="Override MYSQL_CONFIG['database']")
+    parser.add_argument("--output", default=None, help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    config = dict(MYSQL_CONFIG)
+    if args.database:
+        config["database"] = args.database
+    conn = mysql.connector.connect(**config)
+    apply_migrations(conn)
+    seed(conn, args.rows)
+
+    scenarios = {
+        "unfiltered": InteractionFilters(),
+        "by_hcp": InteractionFilters(hcp_name=HCP_NAMES[7]),
+        "by_sentiment": InteractionFilters(sentiment="Positive"),
+        "by_date_range": InteractionFilters(date_from=date(2020, 1, 1), date_to=date(2021, 12, 31)),
+    }
+    pages = [int(p) for p in args.pages.split(",")]
+    results = {"rows": args.rows, "limit": args.limit, "columns": list(LIST_COLUMNS), "scenarios": {}}
+
+    for name, filters in scenarios.items():
+        scenario = {"plan": explain(conn, filters, args.limit), "pages": []}
+        for page in pages:
+            cursor = keyset_cursor_for_page(conn, filters, page, args.limit) if page else None
+            if page and cursor is None:
+                break  # Filter has fewer pages than requested
+            keyset_ms = time_call(lambda: list_interactions(conn, filters, cursor, args.limit), args.repeat)
+            offset_ms = time_call(lambda: offset_page(conn, filters, page, args.limit), args.repeat)
+            scenario["pages"].append({"page": page, "keyset_ms": keyset_ms, "offset_ms": offset_ms})
+            print(f"{name:14s} page {page:6d}: keyset {keyset_ms:8.3f} ms   offset {offset_ms:9.3f} ms")
+        results["scenarios"][name] = scenario
+
+    conn.close()
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2, default=str)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+# backend_app/benchmarks/bench_llm_cache.py
+#
+# Hit rate and latency of the LLM response cache in call_groq_llm against the local stub server.
+# Sends --requests prompts drawn from --distinct-prompts, once with temperature 0 (cacheable) and
+# once with no temperature (the API samples at 1.0), and checks that only the first is ever served
+# from the cache. (Uncached calls can still share an upstream call with an identical one already
+# in flight; that is the client's coalescing, not the cache.)
+#
+# Run (from backend_app directory):
+#   python benchmarks/bench_llm_cache.py --requests 2000 --distinct-prompts 200 --latency-ms 50
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main as app_main  # noqa: E402
+from llm_stub_server import start_stub_server  # noqa: E402
+
+
+async def run_pass(prompts, temperature, concurrency):
+    cache_before = app_main.llm_cache.stats()
+    upstream_before = app_main.llm_client.stats()["upstream_calls"]
+    queue = asyncio.Queue()
+    for prompt in prompts:
+        queue.put_nowait(prompt)
+
+    async def worker():
+        while not queue.empty():
+            await app_main.call_groq_llm(queue.get_nowait(), temperature=temperature)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    cache_after = app_main.llm_cache.stats()
+    return {
+        "temperature": temperature,
+        "requests": len(prompts),
+        "elapsed_s": round(elapsed, 3),
+        "req_per_s": round(len(prompts) / elapsed, 1),
+        "cache_hits": (cache_after["hits_memory"] + cache_after["hits_disk"]) - (cache_before["hits_memory"] + cache_before["hits_disk"]),
+        "cache_bypassed": cache_after["bypassed"] - cache_before["bypassed"],
+        "upstream_calls": app_main.llm_client.stats()["upstream_calls"] - upstream_before,
+    }
+
+
+async def run(args):
+    runner, base_url = await start_stub_server(latency_ms=args.latency_ms, jitter_ms=args.latency_ms / 4, seed=1)
+    app_main.LLM_CONFIG["backend"] = "live"
+    app_main.LLM_CACHE_CONFIG["enabled"] = True
+    app_main.llm_client.api_url = f"{base_url}/openai/v1/chat/completions"
+    rng = random.Random(3)
+    prompts = [f"What did Dr. Cache {rng.randint(0, args.distinct_prompts - 1)} say about ProductA?" for _ in range(args.requests)]
+
+    results = {"cacheable": await run_pass(prompts, 0, args.concurrency), "sampled": await run_pass(prompts, None, args.concurrency)}
+    await app_main.llm_client.close()
+    await runner.cleanup()
+
+    sampled = results["sampled"]
+    if sampled["cache_hits"] or sampled["cache_bypassed"] != sampled["requests"]:
+        raise SystemExit(f"Calls without a temperature were served from the cache: {sampled}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="LLM response cache hit rate against the local stub server")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--distinct-prompts", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
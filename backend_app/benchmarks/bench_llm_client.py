@@ -0,0 +1,97 @@
+# backend_app/benchmarks/bench_llm_client.py
+#
+# Offline throughput / tail-latency test of LLMClient against the local stub server.
+# Starts the stub in-process, fires --requests chat completions at --concurrency, and reports
+# req/s and p50/p95/p99 latency plus the client's retry and coalescing counters.
+#
+# Run (from backend_app directory):
+#   python benchmarks/bench_llm_client.py --requests 2000 --concurrency 64 --rate-limit-rate 0.02 --duplicate-rate 0.2
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from llm_client import LLMClient, LLMError  # noqa: E402
+from llm_stub_server import start_stub_server  # noqa: E402
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+async def run(args):
+    runner, base_url = await start_stub_server(
+        latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate, rate_limit_rate=args.rate_limit_rate, seed=1,
+    )
+    client = LLMClient(
+        api_url=f"{base_url}/openai/v1/chat/completions", api_key="stub",
+        default_concurrency=args.model_concurrency, backoff_base=0.02, max_retries=4,
+    )
+    rng = random.Random(2)
+    latencies = []
+    failures = 0
+    queue = asyncio.Queue()
+    for i in range(args.requests):
+        # A share of requests repeat a recent prompt so coalescing has something to merge
+        prompt = f"prompt {rng.randint(0, 9)}" if rng.random() < args.duplicate_rate else f"prompt {i}"
+        model = "gemma2-9b-it" if rng.random() < 0.8 else "llama-3.3-70b-versatile"
+        queue.put_nowait((model, prompt))
+
+    async def worker():
+        nonlocal failures
+        while not queue.empty():
+            model, prompt = queue.get_nowait()
+            started = time.perf_counter()
+            try:
+                await client.chat_completion(model, [{"role": "user", "content": prompt}])
+                latencies.append(time.perf_counter() - started)
+            except LLMError:
+                failures += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    result = {
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "failures": failures,
+        "elapsed_s": round(elapsed, 3),
+        "req_per_s": round(args.requests / elapsed, 1),
+        "p50_ms": round(1000 * percentile(latencies, 0.50), 2),
+        "p95_ms": round(1000 * percentile(latencies, 0.95), 2),
+        "p99_ms": round(1000 * percentile(latencies, 0.99), 2),
+        "client": client.stats(),
+    }
+    await client.close()
+    await runner.cleanup()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="LLM client throughput against the local stub server")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--model-concurrency", type=int, default=32)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--jitter-ms", type=float, default=20.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--duplicate-rate", type=float, default=0.0)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+# backend_app/benchmarks/bench_search.py
+#
+# Correctness checks and latency of the full-text search in search.py. The SQLite stand-in has no
+# MATCH ... AGAINST, so this is the one place the FULLTEXT SQL runs: needs a MySQL server, and
+# recreates --database from scratch (MYSQL_CONFIG from main.py for host and credentials).
+# Seeds a handful of known interactions through the real insert path, checks natural-language,
+# boolean and phrase queries, filters, chat-turn hits and malformed boolean syntax, then pads the
+# table to --rows interactions and times each query. Exits non-zero if a check fails.
+#
+# Run (from backend_app directory): python benchmarks/bench_search.py --rows 200000
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import mysql.connector  # noqa: E402
+
+import main as app_main  # noqa: E402
+from interaction_queries import InteractionFilters  # noqa: E402
+from migrations import apply_migrations  # noqa: E402
+from search import SearchQueryError, search_interactions  # noqa: E402
+
+# (hcp_name, interaction_date, key_discussion_points, follow_up_actions, chat turns or None)
+KNOWN = [
+    ("Dr. Ada Search", date(2024, 3, 1), "Discussed the trial design and an adverse event in the cohort.", "Send trial protocol.", None),
+    ("Dr. Ada Search", date(2024, 6, 1), "Reviewed placebo arm results from the trial.", None, None),
+    ("Dr. Ben Search", date(2024, 3, 5), "Coverage questions for the spring formulary.", None,
+     [{"role": "user", "content": "Met Dr. Ben about renal dosing"}, {"role": "assistant", "content": "Noted the renal dosing question."}]),
+]
+MALFORMED = ['+', '"adverse', '(trial', 'trial)', '+-trial', '@', 'trial*adverse']
+FILLER = ["Reviewed efficacy data and the dosing schedule.", "Coverage for the next plan year.", "Samples requested for the clinic."]
+
+
+def recreate_database(database):
+    server = mysql.connector.connect(**{k: v for k, v in app_main.MYSQL_CONFIG.items() if k != "database"})
+    cursor = server.cursor()
+    cursor.execute(f"DROP DATABASE IF EXISTS {database}")
+    cursor.execute(f"CREATE DATABASE {database}")
+    cursor.close()
+    server.close()
+    conn = mysql.connector.connect(**{**app_main.MYSQL_CONFIG, "database": database})
+    apply_migrations(conn)
+    app_main.hcp_index.load(conn)
+    return conn
+
+
+def values(hcp_name, interaction_date, points, follow_up, turns):
+    method = "chat" if turns else "form"
+    return (hcp_name, interaction_date, "ProductA", points, "Neutral", follow_up, method, json.dumps(turns) if turns else None, None)
+
+
+def run_checks(conn):
+    ids = app_main.insert_interactions_batch(conn, [values(*row) for row in KNOWN])
+    failures = []
+
+    def check(name, condition, detail):
+        print(f"{'ok  ' if condition else 'FAIL'} {name}")
+        if not condition:
+            failures.append({"check": name, "detail": detail})
+
+    def search(query, mode="natural", filters=None):
+        return search_interactions(conn, query, mode, filters or InteractionFilters(), 20)
+
+    results = search("adverse event")
+    check("natural: best match first", bool(results) and results[0]["interaction_id"] == ids[0], results)
+    check("natural: hits are highlighted", bool(results) and "<mark>" in results[0]["hits"][0]["snippet"], results)
+
+    results = search("+trial -placebo", "boolean")
+    check("boolean: required and excluded terms", [r["interaction_id"] for r in results] == [ids[0]], results)
+
+    results = search('"adverse event"', "boolean")
+    check("boolean: phrase", [r["interaction_id"] for r in results] == [ids[0]], results)
+
+    results = search("trial", filters=InteractionFilters(date_from=date(2024, 5, 1)))
+    check("filters: date range", [r["interaction_id"] for r in results] == [ids[1]], results)
+    results = search("trial", filters=InteractionFilters(hcp_name="Dr. Ben Search"))
+    check("filters: hcp name", results == [], results)
+
+    results = search("renal dosing")
+    hits = results[0]["hits"] if results else []
+    check("chat turns: hit per turn with role", bool(hits) and all(h["field"] == "chat_turn" and h["role"] for h in hits), results)
+
+    outcomes = {}
+    for query in MALFORMED:
+        try:
+            search(query, "boolean")
+            outcomes[query] = "ok"
+        except SearchQueryError:
+            outcomes[query] = "SearchQueryError"
+        except mysql.connector.Error as err:
+            outcomes[query] = f"mysql error {err.errno}"
+    check("boolean: malformed syntax is a SearchQueryError, never a raw database error",
+          all(outcome in ("ok", "SearchQueryError") for outcome in outcomes.values()), outcomes)
+    return failures, outcomes
+
+
+def pad(conn, rows, batch_size=2000):
+    rng = random.Random(9)
+    remaining = rows - len(KNOWN)
+    while remaining > 0:
+        batch = [
+            values(f"Dr. Filler {rng.randint(0, 5000)}", date(2020, 1, 1) + timedelta(days=rng.randint(0, 1800)),
+                   rng.choice(FILLER), rng.choice(FILLER), None)
+            for _ in range(min(batch_size, remaining))
+        ]
+        app_main.insert_interactions_batch(conn, batch)
+        remaining -= len(batch)
+
+
+def time_queries(conn, repeat):
+    queries = [("adverse event", "natural"), ("dosing schedule", "natural"), ("+trial -placebo", "boolean"), ('"plan year"', "boolean")]
+    timings = {}
+    for query, mode in queries:
+        samples = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            search_interactions(conn, query, mode, InteractionFilters(), 20)
+            samples.append((time.perf_counter() - started) * 1000)
+        timings[f"{mode}: {query}"] = round(statistics.median(samples), 3)
+        print(f"{mode:8s} {query:20s} {timings[f'{mode}: {query}']:9.3f} ms")
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Full-text search checks and latency against MySQL")
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--database", default="crm_search_bench", help="Scratch database, dropped and recreated")
+    parser.add_argument("--output", default=None, help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    conn = recreate_database(args.database)
+    failures, malformed = run_checks(conn)
+    print(f"Padding to {args.rows} interactions...")
+    pad(conn, args.rows)
+    results = {"rows": args.rows, "failures": failures, "malformed_boolean": malformed, "median_ms": time_queries(conn, args.repeat)}
+    conn.close()
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2, default=str)
+    if failures:
+        raise SystemExit(f"{len(failures)} search check(s) failed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,491 @@
+# backend_app/benchmarks/load_test.py
+#
+# Reproducible load test of the API: starts the FastAPI app against the SQLite stand-in database
+# (benchmarks/sqlite_standin.py) and the mocked LLM, drives a mixed workload of form posts,
+# multi-turn chats of growing length and reads (list pages, single interactions, analytics) at
+# a fixed concurrency, and reports req/s, p50/p95/p99 latency per operation and server memory.
+#
+# By default the app runs under uvicorn in a child process and is driven over HTTP, so server
+# memory and CPU are measured separately from the load generator. --in-process drives the ASGI
+# app directly instead (no uvicorn or sockets; needs httpx) for quick runs.
+#
+# Results are written as JSON with --output; --compare checks a run against a saved baseline and
+# exits with status 1 when throughput, p95 latency or peak memory regress by more than
+# --max-regression.
+#
+# Run (from backend_app directory):
+#   python benchmarks/load_test.py --concurrency 32 --duration 30 --output bench_results/baseline.json
+#   python benchmarks/load_test.py --concurrency 32 --duration 30 --compare bench_results/baseline.json
+#   python benchmarks/load_test.py --llm stub --llm-latency-ms 150 --mix form=1,chat=4,read=1
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlite_standin import create_standin_database  # noqa: E402
+
+# Letters only, so the chat extractor can pick the names out of "I met Dr. <name> on <date>"
+HCP_NAMES = [
+    f"Dr. {first} {last}"
+    for first in ("Ada", "Ben", "Chloe", "Dev", "Elena", "Farid", "Grace", "Hiro", "Ines", "Jonas", "Kavya", "Liam", "Mei", "Nora", "Omar", "Priya", "Quinn", "Rosa", "Sami", "Tara")
+    for last in ("Adler", "Bose", "Castro", "Dunn", "Eze", "Fischer", "Gupta", "Hale", "Ito", "Jensen", "Khan", "Lopez", "Moreau", "Novak", "Okafor", "Patel", "Reyes", "Silva", "Tan", "Ueda", "Varga", "Weiss", "Yilmaz", "Zhou", "Brandt")
+]
+PRODUCTS = ["ProductA", "ProductB", "ProductC", "Cardiozen", "Neurovix"]
+SENTIMENTS = ["Positive", "Neutral", "Negative"]
+FILLER_SENTENCES = [
+    "The clinic has been busy with the new referral pathway this quarter.",
+    "They asked about dosing in elderly patients with renal impairment.",
+    "We went over the latest formulary decision and the prior authorization steps.",
+    "There was some concern about supply interruptions last winter.",
+    "They are interested in the patient support program and the starter kits.",
+    "A colleague in the practice has been seeing good adherence on the once-daily regimen.",
+]
+OPERATIONS = ("form", "chat_turn", "list", "get", "analytics")
+BYTES_PER_MB = 1024 * 1024
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        if name not in ("form", "chat", "read"):
+            raise argparse.ArgumentTypeError(f"Unknown workload {name!r}; use form, chat and read")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def read_memory(pid):
+    """Current and peak resident set size of a process in MB, from /proc (None elsewhere)."""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            fields = dict(line.split(":", 1) for line in f if ":" in line)
+    except OSError:
+        return None, None
+    to_mb = lambda key: round(int(fields[key].split()[0]) * 1024 / BYTES_PER_MB, 1) if key in fields else None  # noqa: E731
+    return to_mb("VmRSS"), to_mb("VmHWM")
+
+
+# --- App under test ---
+async def prepare_app(db_path, llm, llm_latency_ms, llm_cache, write_behind, log_level):
+    """
+    Points the app at the stand-in database and the chosen LLM backend. Returns (app, cleanup).
+    "mock" uses the canned call_groq_llm responses; "stub" sends live-path requests through the
+    pooled LLM client to llm_stub_server with simulated model latency.
+    """
+    import main
+    from migrations import MIGRATIONS
+
+    logging.getLogger("crm").setLevel(log_level)
+    # The pool opens connections lazily, so swapping the factory before startup routes every
+    # checkout to SQLite without touching pool sizing, timeouts or instrumentation.
+    main.db_pool._connect = create_standin_database(db_path, [version for version, _, _ in MIGRATIONS])
+    main.LLM_CACHE_CONFIG["enabled"] = llm_cache
+    main.WRITE_BEHIND_CONFIG["enabled"] = write_behind
+
+    stub_runner = None
+    if llm == "stub":
+        from llm_stub_server import start_stub_server
+        stub_runner, base_url = await start_stub_server(latency_ms=llm_latency_ms, jitter_ms=llm_latency_ms / 4, seed=1)
+        main.LLM_CONFIG["backend"] = "live"
+        main.llm_client.api_url = f"{base_url}/openai/v1/chat/completions"
+    else:
+        main.LLM_CONFIG["backend"] = "mock"
+
+    async def cleanup():
+        if stub_runner is not None:
+            await stub_runner.cleanup()
+
+    return main.app, cleanup
+
+
+def serve(args):
+    """Child-process entry point: runs the prepared app under uvicorn until terminated."""
+    import uvicorn
+
+    async def run_server():
+        app, cleanup = await prepare_app(args.db, args.llm, args.llm_latency_ms, not args.no_llm_cache, args.write_behind, args.log_level)
+        server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=args.port, log_level="warning", access_log=False))
+        try:
+            await server.serve()
+        finally:
+            await cleanup()
+
+    asyncio.run(run_server())
+
+
+class HttpTarget:
+    """Drives the app over HTTP in a uvicorn child process."""
+
+    def __init__(self, args, db_path):
+        self.args = args
+        self.db_path = db_path
+        self.process = None
+        self.session = None
+        self.base_url = None
+
+    @property
+    def pid(self):
+        return self.process.pid
+
+    async def start(self):
+        import aiohttp
+
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            port = sock.getsockname()[1]
+        command = [
+            sys.executable, os.path.abspath(__file__), "--serve", "--port", str(port), "--db", self.db_path,
+            "--llm", self.args.llm, "--llm-latency-ms", str(self.args.llm_latency_ms), "--log-level", self.args.log_level,
+        ]
+        if self.args.no_llm_cache:
+            command.append("--no-llm-cache")
+        if self.args.write_behind:
+            command.append("--write-behind")
+        self.process = subprocess.Popen(command, cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        self.base_url = f"http://127.0.0.1:{port}"
+        connector = aiohttp.TCPConnector(limit=self.args.concurrency * 2)
+        self.session = aiohttp.ClientSession(connector=connector)
+
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"Server process exited with status {self.process.returncode}")
+            try:
+                status, _ = await self.request("GET", "/")
+                if status == 200:
+                    return
+            except aiohttp.ClientError:
+                pass
+            await asyncio.sleep(0.1)
+        raise RuntimeError("Server did not become ready within 30s")
+
+    async def request(self, method, path, body=None, params=None):
+        async with self.session.request(method, self.base_url + path, json=body, params=params) as response:
+            return response.status, await response.json(content_type=None)
+
+    async def stop(self):
+        await self.session.close()
+        self.process.terminate()
+        try:
+            self.process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+
+
+class AsgiTarget:
+    """Drives the ASGI app in this process through httpx, without uvicorn or sockets."""
+
+    def __init__(self, args, db_path):
+        self.args = args
+        self.db_path = db_path
+        self.client = None
+        self.cleanup = None
+
+    @property
+    def pid(self):
+        return os.getpid()
+
+    async def start(self):
+        import httpx
+
+        import main
+
+        app, self.cleanup = await prepare_app(
+            self.db_path, self.args.llm, self.args.llm_latency_ms, not self.args.no_llm_cache, self.args.write_behind, self.args.log_level
+        )
+        await main.startup_event()
+        self.client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://load-test", timeout=60)
+
+    async def request(self, method, path, body=None, params=None):
+        response = await self.client.request(method, path, json=body, params=params)
+        return response.status_code, response.json()
+
+    async def stop(self):
+        import main
+
+        await self.client.aclose()
+        await main.shutdown_event()
+        await self.cleanup()
+
+
+# --- Workload ---
+class Recorder:
+    def __init__(self):
+        self.latencies = {op: [] for op in OPERATIONS}
+        self.errors = {op: 0 for op in OPERATIONS}
+        self.recording = False
+
+    async def timed(self, target, op, method, path, body=None, params=None):
+        started = time.perf_counter()
+        try:
+            status, data = await target.request(method, path, body, params)
+        except Exception:
+            status, data = 599, None
+        elapsed = time.perf_counter() - started
+        if self.recording:
+            self.latencies[op].append(elapsed)
+            if status >= 400:
+                self.errors[op] += 1
+        return status, data
+
+
+class Workload:
+    def __init__(self, target, recorder, rng, max_chat_turns, known_ids):
+        self.target = target
+        self.recorder = recorder
+        self.rng = rng
+        self.max_chat_turns = max_chat_turns
+        self.known_ids = known_ids
+
+    def form_payload(self):
+        rng = self.rng
+        return {
+            "hcp_name": rng.choice(HCP_NAMES),
+            "interaction_date": (date.today() - timedelta(days=rng.randint(0, 730))).isoformat(),
+            "products_discussed": ", ".join(rng.sample(PRODUCTS, rng.randint(1, 3))),
+            "key_discussion_points": " ".join(rng.sample(FILLER_SENTENCES, 2)),
+            "sentiment": rng.choice(SENTIMENTS),
+            "follow_up_actions": "Send the updated efficacy data and schedule a follow-up visit.",
+        }
+
+    def chat_script(self):
+        """A conversation that gathers the fields over several turns; earlier turns are small talk, so history grows."""
+        rng = self.rng
+        hcp = rng.choice(HCP_NAMES)
+        day = (date.today() - timedelta(days=rng.randint(0, 60))).isoformat()
+        product_a, product_b = rng.sample(PRODUCTS, 2)
+        closing = [
+            f"I met {hcp} on {day}.",
+            f"We talked about {product_a} and {product_b}. Key discussion points were {rng.choice(FILLER_SENTENCES).lower()}",
+            f"Sentiment was {rng.choice(SENTIMENTS).lower()}. Follow-up actions: send the brochure.",
+            "Yes, log it.",
+        ]
+        small_talk = [" ".join(rng.sample(FILLER_SENTENCES, rng.randint(1, 3))) for _ in range(rng.randint(0, max(0, self.max_chat_turns - len(closing) - 1)))]
+        return ["Hello, I want to log an interaction."] + small_talk + closing
+
+    async def run_form(self):
+        status, data = await self.recorder.timed(self.target, "form", "POST", "/api/log_interaction_form", self.form_payload())
+        if status == 200:
+            self.known_ids.append(data["id"])
+
+    async def run_chat(self):
+        session_id = None
+        for message in self.chat_script():
+            status, data = await self.recorder.timed(self.target, "chat_turn", "POST", "/api/log_interaction_chat", {"message": message, "session_id": session_id})
+            if status != 200:
+                return
+            session_id = data.get("session_id")
+            if data.get("interaction_id"):
+                self.known_ids.append(data["interaction_id"])
+
+    async def run_read(self):
+        roll = self.rng.random()
+        if roll < 0.5:
+            params = {"limit": "50"}
+            choice = self.rng.random()
+            if choice < 0.3:
+                params["hcp_name"] = self.rng.choice(HCP_NAMES)
+            elif choice < 0.5:
+                params["sentiment"] = self.rng.choice(SENTIMENTS)
+            for _ in range(self.rng.randint(1, 3)):  # Follow the keyset cursor for a few pages
+                status, data = await self.recorder.timed(self.target, "list", "GET", "/api/interactions", params=params)
+                if status != 200 or not data.get("next_cursor"):
+                    break
+                params["cursor"] = data["next_cursor"]
+        elif roll < 0.8 and self.known_ids:
+            await self.recorder.timed(self.target, "get", "GET", f"/api/interactions/{self.rng.choice(self.known_ids)}")
+        else:
+            await self.recorder.timed(self.target, "analytics", "GET", "/api/analytics", params={"dimension": self.rng.choice(["hcp", "product", "week"])})
+
+
+async def seed_database(target, rows, rng, known_ids):
+    workload = Workload(target, Recorder(), rng, 0, known_ids)
+    for start in range(0, rows, 500):
+        batch = [workload.form_payload() for _ in range(min(500, rows - start))]
+        status, data = await target.request("POST", "/api/log_interactions_bulk", batch)
+        if status != 200:
+            raise RuntimeError(f"Seeding failed with status {status}: {data}")
+        known_ids.extend(r["id"] for r in data["results"] if r.get("id"))
+
+
+async def run_load(args):
+    db_dir = tempfile.mkdtemp(prefix="crm-load-")
+    db_path = os.path.join(db_dir, "standin.db")
+    target = AsgiTarget(args, db_path) if args.in_process else HttpTarget(args, db_path)
+    await target.start()
+    rss_start, _ = read_memory(target.pid)
+
+    rng = random.Random(args.seed)
+    known_ids = []
+    await seed_database(target, args.seed_rows, rng, known_ids)
+
+    recorder = Recorder()
+    mix_names = list(args.mix)
+    mix_weights = [args.mix[name] for name in mix_names]
+    started = time.monotonic()
+    measure_from = started + args.warmup
+    deadline = measure_from + args.duration
+    rss_peak = rss_start or 0.0
+
+    async def worker(worker_index):
+        workload = Workload(target, recorder, random.Random(args.seed * 1000 + worker_index), args.chat_turns, known_ids)
+        runners = {"form": workload.run_form, "chat": workload.run_chat, "read": workload.run_read}
+        while time.monotonic() < deadline:
+            await runners[workload.rng.choices(mix_names, mix_weights)[0]]()
+
+    async def monitor():
+        nonlocal rss_peak
+        while time.monotonic() < deadline:
+            if time.monotonic() >= measure_from:
+                recorder.recording = True
+            await asyncio.sleep(0.5 if recorder.recording else 0.05)
+            rss, _ = read_memory(target.pid)
+            if rss is not None:
+                rss_peak = max(rss_peak, rss)
+
+    await asyncio.gather(monitor(), *(worker(i) for i in range(args.concurrency)))
+    recorder.recording = False
+    elapsed = time.monotonic() - measure_from
+
+    rss_end, rss_hwm = read_memory(target.pid)
+    server_stats = {}
+    for name, path in (("db_pool", "/api/db/pool_stats"), ("chat_routes", "/api/chat/route_stats"), ("llm", "/api/llm/stats"), ("chat_sessions", "/api/chat/sessions/stats"), ("write_queue", "/api/db/write_queue_stats")):
+        status, data = await target.request("GET", path)
+        server_stats[name] = data if status == 200 else None
+    await target.stop()
+
+    operations = {}
+    total = 0
+    total_errors = 0
+    for op in OPERATIONS:
+        samples = sorted(recorder.latencies[op])
+        if not samples:
+            continue
+        total += len(samples)
+        total_errors += recorder.errors[op]
+        operations[op] = {
+            "count": len(samples),
+            "errors": recorder.errors[op],
+            "req_per_s": round(len(samples) / elapsed, 1),
+            "p50_ms": round(1000 * percentile(samples, 0.50), 2),
+            "p95_ms": round(1000 * percentile(samples, 0.95), 2),
+            "p99_ms": round(1000 * percentile(samples, 0.99), 2),
+            "max_ms": round(1000 * samples[-1], 2),
+        }
+
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {
+            "target": "in-process" if args.in_process else "uvicorn",
+            "concurrency": args.concurrency, "duration_s": args.duration, "warmup_s": args.warmup,
+            "mix": args.mix, "chat_turns": args.chat_turns, "seed_rows": args.seed_rows, "seed": args.seed,
+            "llm": args.llm, "llm_latency_ms": args.llm_latency_ms if args.llm == "stub" else None,
+            "llm_cache": not args.no_llm_cache, "write_behind": args.write_behind,
+        },
+        "totals": {
+            "requests": total,
+            "errors": total_errors,
+            "elapsed_s": round(elapsed, 3),
+            "req_per_s": round(total / elapsed, 1),
+        },
+        "operations": operations,
+        "memory_mb": {"rss_start": rss_start, "rss_end": rss_end, "rss_peak": rss_peak or None, "rss_high_water": rss_hwm},
+        "server": server_stats,
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(current, baseline, max_regression):
+    """Lists regressions beyond `max_regression` (a fraction) in throughput, per-operation p95 and peak memory."""
+    checks = [("totals.req_per_s", current["totals"]["req_per_s"], baseline["totals"]["req_per_s"], False)]
+    for op, stats in current["operations"].items():
+        if op in baseline["operations"]:
+            checks.append((f"{op}.p95_ms", stats["p95_ms"], baseline["operations"][op]["p95_ms"], True))
+    if current["memory_mb"].get("rss_peak") and baseline["memory_mb"].get("rss_peak"):
+        checks.append(("memory_mb.rss_peak", current["memory_mb"]["rss_peak"], baseline["memory_mb"]["rss_peak"], True))
+
+    regressions = []
+    for name, now, before, higher_is_worse in checks:
+        if not before:
+            continue
+        change = (now - before) / before
+        worse = change > max_regression if higher_is_worse else change < -max_regression
+        print(f"{name:24s} {before:10.2f} -> {now:10.2f}  ({change:+.1%}){'  REGRESSION' if worse else ''}")
+        if worse:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mixed-workload load test against a local stand-in database and mocked LLM")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=20.0, help="Measured seconds, after warm-up")
+    parser.add_argument("--warmup", type=float, default=3.0)
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix("form=2,chat=3,read=5"), help="Relative weights of form, chat and read scenarios")
+    parser.add_argument("--chat-turns", type=int, default=10, help="Longest conversation; each chat runs 5..N turns")
+    parser.add_argument("--seed-rows", type=int, default=2000, help="Interactions bulk-loaded before the run")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--llm", choices=["mock", "stub"], default="mock")
+    parser.add_argument("--llm-latency-ms", type=float, default=100.0, help="Simulated model latency with --llm stub")
+    parser.add_argument("--no-llm-cache", action="store_true")
+    parser.add_argument("--write-behind", action="store_true", help="Enable the group-commit write queue")
+    parser.add_argument("--log-level", default="WARNING")
+    parser.add_argument("--in-process", action="store_true", help="Drive the ASGI app directly (needs httpx) instead of uvicorn over HTTP")
+    parser.add_argument("--output", default=None, help="Write results as JSON to this file")
+    parser.add_argument("--compare", default=None, help="Baseline results JSON to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.15, help="Allowed fractional regression for --compare")
+    # Internal: child-process server mode used by the HTTP target
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, default=0, help=argparse.SUPPRESS)
+    parser.add_argument("--db", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args)
+        return
+
+    results = asyncio.run(run_load(args))
+    print(json.dumps({k: results[k] for k in ("totals", "operations", "memory_mb")}, indent=2))
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2, default=str)
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.max_regression)
+        if regressions:
+            print(f"Regressed beyond {args.max_regression:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
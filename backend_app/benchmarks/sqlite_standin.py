@@ -0,0 +1,243 @@
+# backend_app/benchmarks/sqlite_standin.py
+#
+# Local stand-in for the MySQL database, for load tests on machines without a MySQL server.
+# Exposes the small slice of the mysql.connector connection/cursor API the app uses and is
+# plugged in through MySQLConnectionPool's `connect` factory, so every query still goes through
+# the pool, the executor and the real query builders. The SQL is translated on the fly
+# (placeholders, INSERT IGNORE, ON DUPLICATE KEY UPDATE, LIKE escapes, and the information_schema
+# lookups of the guarded migration steps).
+#
+# Not covered: MATCH ... AGAINST full-text search (SQLite has no FULLTEXT index), and SQLite
+# serializes writers, so write-heavy numbers are a lower bound on what MySQL would do.
+
+import functools
+import re
+import sqlite3
+from datetime import date, datetime
+from typing import Any, Callable, List, Optional, Sequence
+
+import mysql.connector
+
+# SQLite equivalent of the schema built by migrations.py. Keep in step with new migrations.
+SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS hcp_interactions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        hcp_name VARCHAR(255) NOT NULL COLLATE NOCASE,
+        interaction_date DATE NOT NULL,
+        products_discussed TEXT,
+        key_discussion_points TEXT,
+        sentiment TEXT CHECK (sentiment IN ('Positive', 'Neutral', 'Negative')),
+        follow_up_actions TEXT,
+        interaction_method TEXT NOT NULL CHECK (interaction_method IN ('form', 'chat')),
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        hcp_id INTEGER NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_interactions_date ON hcp_interactions (interaction_date, id)",
+    "CREATE INDEX IF NOT EXISTS idx_interactions_hcp_date ON hcp_interactions (hcp_name, interaction_date, id)",
+    "CREATE INDEX IF NOT EXISTS idx_interactions_sentiment_date ON hcp_interactions (sentiment, interaction_date, id)",
+    "CREATE INDEX IF NOT EXISTS idx_interactions_method_date ON hcp_interactions (interaction_method, interaction_date, id)",
+    "CREATE INDEX IF NOT EXISTS idx_interactions_hcp_id_date ON hcp_interactions (hcp_id, interaction_date, id)",
+    """
+    CREATE TABLE IF NOT EXISTS interaction_search_docs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        interaction_id INTEGER NOT NULL,
+        field TEXT NOT NULL,
+        turn_index INTEGER NULL,
+        role VARCHAR(16) NULL,
+        content TEXT NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_search_docs_interaction ON interaction_search_docs (interaction_id)",
+    """
+    CREATE TABLE IF NOT EXISTS interaction_chat_logs (
+        interaction_id INTEGER PRIMARY KEY,
+        turn_count INTEGER NOT NULL,
+        raw_bytes INTEGER NOT NULL,
+        log_zlib BLOB NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS hcps (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name_key VARCHAR(191) NOT NULL UNIQUE,
+        display_name VARCHAR(255) NOT NULL,
+        interaction_count INTEGER NOT NULL DEFAULT 0,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS interaction_products (
+        interaction_id INTEGER NOT NULL,
+        product_key VARCHAR(191) NOT NULL,
+        product_name VARCHAR(255) NOT NULL,
+        PRIMARY KEY (interaction_id, product_key)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_interaction_products_key ON interaction_products (product_key, interaction_id)",
+    """
+    CREATE TABLE IF NOT EXISTS analytics_hcp_sentiment (
+        hcp_name VARCHAR(255) NOT NULL COLLATE NOCASE,
+        sentiment VARCHAR(16) NOT NULL,
+        interaction_count INTEGER NOT NULL,
+        PRIMARY KEY (hcp_name, sentiment)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS analytics_product_sentiment (
+        product_key VARCHAR(191) NOT NULL,
+        sentiment VARCHAR(16) NOT NULL,
+        product_name VARCHAR(255) NOT NULL,
+        interaction_count INTEGER NOT NULL,
+        PRIMARY KEY (product_key, sentiment)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS analytics_weekly_sentiment (
+        week_start DATE NOT NULL,
+        sentiment VARCHAR(16) NOT NULL,
+        interaction_count INTEGER NOT NULL,
+        PRIMARY KEY (week_start, sentiment)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS schema_migrations (
+        version INTEGER PRIMARY KEY,
+        description VARCHAR(255) NOT NULL,
+        applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+]
+
+_ON_DUPLICATE = re.compile(r"ON\s+DUPLICATE\s+KEY\s+UPDATE\s+(.*)$", re.IGNORECASE | re.DOTALL)
+_VALUES_FN = re.compile(r"VALUES\((\w+)\)", re.IGNORECASE)
+_INSERT_IGNORE = re.compile(r"\bINSERT\s+IGNORE\b", re.IGNORECASE)
+_LIKE_PARAM = re.compile(r"\bLIKE\s+\?", re.IGNORECASE)
+# migrations.py column / index existence checks; the pragma functions take the same two parameters
+_SCHEMA_LOOKUPS = (
+    (re.compile(r"FROM\s+information_schema\.columns\s+WHERE\s+table_schema\s*=\s*DATABASE\(\)\s+AND\s+table_name\s*=\s*\?\s+AND\s+column_name\s*=\s*\?", re.IGNORECASE),
+     "FROM pragma_table_info(?) WHERE name = ?"),
+    (re.compile(r"FROM\s+information_schema\.statistics\s+WHERE\s+table_schema\s*=\s*DATABASE\(\)\s+AND\s+table_name\s*=\s*\?\s+AND\s+index_name\s*=\s*\?", re.IGNORECASE),
+     "FROM pragma_index_list(?) WHERE name = ?"),
+)
+
+
+@functools.lru_cache(maxsize=256)
+def translate_sql(sql: str) -> str:
+    """Rewrites the MySQL dialect the app emits into SQLite."""
+    sql = sql.replace("%s", "?")
+    sql = _INSERT_IGNORE.sub("INSERT OR IGNORE", sql)
+    for pattern, replacement in _SCHEMA_LOOKUPS:
+        sql = pattern.sub(replacement, sql)
+    match = _ON_DUPLICATE.search(sql)
+    if match:
+        assignments = _VALUES_FN.sub(r"excluded.\1", match.group(1))
+        sql = sql[:match.start()] + "ON CONFLICT DO UPDATE SET " + assignments
+    # MySQL treats backslash as the LIKE escape character by default; SQLite needs it spelled out
+    return _LIKE_PARAM.sub("LIKE ? ESCAPE '\\\\'", sql)
+
+
+# Explicit date handling, matching what mysql.connector returns for DATE/TIMESTAMP columns
+sqlite3.register_adapter(date, date.isoformat)
+sqlite3.register_adapter(datetime, lambda value: value.isoformat(" "))
+sqlite3.register_converter("DATE", lambda raw: date.fromisoformat(raw.decode()))
+sqlite3.register_converter("TIMESTAMP", lambda raw: datetime.fromisoformat(raw.decode()))
+
+
+def _as_mysql_error(err: sqlite3.Error) -> mysql.connector.Error:
+    if isinstance(err, sqlite3.IntegrityError):
+        return mysql.connector.errors.IntegrityError(msg=str(err))
+    return mysql.connector.errors.DatabaseError(msg=str(err))
+
+
+class StandInCursor:
+    def __init__(self, cursor: sqlite3.Cursor):
+        self._cursor = cursor
+        self.lastrowid: Optional[int] = None
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+    @property
+    def rowcount(self) -> int:
+        return self._cursor.rowcount
+
+    def execute(self, sql: str, params: Sequence[Any] = ()):
+        if sql.lstrip().upper().startswith("SET SESSION"):
+            return  # MySQL session variables have no SQLite counterpart
+        try:
+            self._cursor.execute(translate_sql(sql), tuple(params or ()))
+        except sqlite3.Error as err:
+            raise _as_mysql_error(err) from err
+        self.lastrowid = self._cursor.lastrowid
+
+    def executemany(self, sql: str, seq_of_params: Sequence[Sequence[Any]]):
+        rows = [tuple(params) for params in seq_of_params]
+        try:
+            self._cursor.executemany(translate_sql(sql), rows)
+            if rows and sql.lstrip().upper().startswith("INSERT"):
+                # mysql.connector reports the first id of a multi-row insert; ids are consecutive
+                # because this connection holds SQLite's write lock for the whole transaction.
+                (last_id,) = self._cursor.execute("SELECT last_insert_rowid()").fetchone()
+                self.lastrowid = last_id - len(rows) + 1
+        except sqlite3.Error as err:
+            raise _as_mysql_error(err) from err
+
+    def fetchone(self):
+        return self._cursor.fetchone()
+
+    def fetchall(self) -> List[tuple]:
+        return self._cursor.fetchall()
+
+    def fetchmany(self, size: int = 1) -> List[tuple]:
+        return self._cursor.fetchmany(size)
+
+    def close(self):
+        self._cursor.close()
+
+
+class StandInConnection:
+    def __init__(self, path: str, busy_timeout: float = 30.0):
+        # Pool connections move between executor threads, but only one thread uses one at a time
+        self._conn = sqlite3.connect(path, timeout=busy_timeout, check_same_thread=False, detect_types=sqlite3.PARSE_DECLTYPES)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        # MySQL named locks (migrations.apply_migrations); SQLite already serializes writers
+        self._conn.create_function("GET_LOCK", 2, lambda name, timeout: 1)
+        self._conn.create_function("RELEASE_LOCK", 1, lambda name: 1)
+
+    def cursor(self, buffered: bool = False) -> StandInCursor:
+        # sqlite3 cursors always step through results lazily, like an unbuffered MySQL cursor
+        return StandInCursor(self._conn.cursor())
+
+    def commit(self):
+        self._conn.commit()
+
+    def rollback(self):
+        self._conn.rollback()
+
+    def ping(self, reconnect: bool = False, attempts: int = 1, delay: int = 0):
+        self._conn.execute("SELECT 1")
+
+    def close(self):
+        self._conn.close()
+
+
+def create_standin_database(path: str, migration_versions: Sequence[int] = ()) -> Callable[[], StandInConnection]:
+    """
+    Creates the schema in the SQLite file at `path`, records `migration_versions` as applied so
+    the app's startup migrations are skipped, and returns a connection factory for the pool.
+    """
+    conn = StandInConnection(path)
+    cursor = conn.cursor()
+    for statement in SCHEMA:
+        cursor.execute(statement)
+    cursor.executemany(
+        "INSERT IGNORE INTO schema_migrations (version, description) VALUES (%s, %s)",
+        [(version, "sqlite stand-in schema") for version in migration_versions],
+    )
+    conn.commit()
+    conn.close()
+    return lambda: StandInConnection(path)
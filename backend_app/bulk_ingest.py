@@ -0,0 +1,146 @@
+# backend_app/bulk_ingest.py
+
+import codecs
+import json
+import re
+from typing import Any, AsyncIterator, Tuple
+
+# Each parsed item is (record_index, payload, error). Exactly one of payload / error is set.
+ParsedRecord = Tuple[int, Any, str]
+
+
+class BulkPayloadError(Exception):
+    """Raised when the request body is not a JSON array / NDJSON stream at all."""
+
+
+async def _decode_chunks(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Decodes a byte stream to text without splitting multi-byte UTF-8 sequences."""
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    async for chunk in chunks:
+        text = decoder.decode(chunk)
+        if text:
+            yield text
+    tail = decoder.decode(b"", final=True)
+    if tail:
+        yield tail
+
+
+async def iter_ndjson_records(chunks: AsyncIterator[bytes]) -> AsyncIterator[ParsedRecord]:
+    """Yields one record per non-blank line of an NDJSON body, holding at most one line in memory."""
+    buffer = ""
+    index = 0
+    async for text in _decode_chunks(chunks):
+        buffer += text
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            if not line.strip():
+                continue
+            yield _parse_line(index, line)
+            index += 1
+    if buffer.strip():
+        yield _parse_line(index, buffer)
+
+
+def _parse_line(index: int, line: str) -> ParsedRecord:
+    try:
+        return index, json.loads(line), None
+    except json.JSONDecodeError as e:
+        return index, None, f"Invalid JSON: {e.msg}"
+
+
+async def iter_json_array_records(chunks: AsyncIterator[bytes]) -> AsyncIterator[ParsedRecord]:
+    """
+    Incrementally parses a top-level JSON array, yielding elements as soon as they are complete.
+    Only the unparsed tail of the body is buffered, never the whole array: an element that fails
+    to decode for any reason other than being cut off at the end of the buffer raises
+    BulkPayloadError right away.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+    pos = 0
+    index = 0
+    state = "start"  # start -> value -> (comma | end) -> value ... -> done
+    eof = False
+    stream = _decode_chunks(chunks)
+
+    while True:
+        if not eof:
+            try:
+                buffer = buffer[pos:] + await stream.__anext__()
+                pos = 0
+            except StopAsyncIteration:
+                eof = True
+
+        while True:
+            pos = _skip_whitespace(buffer, pos)
+            if pos >= len(buffer):
+                break
+            if state == "start":
+                if buffer[pos] != "[":
+                    raise BulkPayloadError("Request body must be a JSON array or NDJSON stream.")
+                pos += 1
+                state = "first_value"
+            elif state in ("first_value", "value"):
+                if state == "first_value" and buffer[pos] == "]":
+                    state = "done"
+                    pos += 1
+                    continue
+                try:
+                    record, end = decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError as e:
+                    if not eof and _needs_more_data(buffer, e):
+                        break  # Element not fully received yet
+                    # Malformed element: stop here rather than buffering the rest of the body
+                    raise BulkPayloadError(f"Invalid JSON at record {index}: {e.msg}")
+                following = _skip_whitespace(buffer, end)
+                if not eof and (following >= len(buffer) or buffer[following] not in ",]"):
+                    break  # A scalar such as 1.5 might continue in the next chunk
+                yield index, record, None
+                index += 1
+                pos = end
+                state = "separator"
+            elif state == "separator":
+                char = buffer[pos]
+                pos += 1
+                if char == ",":
+                    state = "value"
+                elif char == "]":
+                    state = "done"
+                else:
+                    raise BulkPayloadError(f"Expected ',' or ']' after record {index - 1}.")
+            else:  # done
+                raise BulkPayloadError("Unexpected data after the end of the JSON array.")
+
+        if eof:
+            break
+
+    if state != "done":
+        raise BulkPayloadError("Request body ended before the JSON array was closed.")
+
+
+_JSON_LITERALS = ("true", "false", "null", "NaN", "Infinity", "-Infinity")
+# What is left of a number cut off after its integer part, e.g. "1." or "2e-"
+_NUMBER_TAIL = re.compile(r"\.\d*(?:[eE][+-]?\d*)?|[eE][+-]?\d*")
+
+
+def _needs_more_data(buffer: str, err: json.JSONDecodeError) -> bool:
+    """True when a decode error is explained by the buffer ending mid-element rather than by bad JSON."""
+    if err.pos >= len(buffer) or err.msg.startswith("Unterminated string"):
+        return True
+    tail = buffer[err.pos:]
+    if len(tail) > len("-Infinity"):
+        return False  # The error is followed by more data, so more data cannot fix it
+    if err.msg == "Expecting value":
+        return any(literal.startswith(tail) for literal in _JSON_LITERALS)
+    if err.msg.startswith("Invalid \\uXXXX escape"):
+        return len(tail) < len("uXXXX")
+    if err.msg == "Expecting ',' delimiter":
+        return _NUMBER_TAIL.fullmatch(tail) is not None
+    return False
+
+
+def _skip_whitespace(buffer: str, pos: int) -> int:
+    length = len(buffer)
+    while pos < length and buffer[pos] in " \t\r\n":
+        pos += 1
+    return pos
@@ -0,0 +1,95 @@
+# backend_app/chat_log_storage.py
+
+import json
+import zlib
+from typing import Any, Dict, List, Optional, Sequence
+
+# Chat transcripts live outside hcp_interactions, zlib-compressed, one row per interaction. The
+# main table stays narrow, so list pages, SELECT * re-fetches and full scans never read log
+# bytes; the transcript is only decompressed when an interaction's log is explicitly requested.
+CHAT_LOGS_DDL = """
+    CREATE TABLE IF NOT EXISTS interaction_chat_logs (
+        interaction_id INT PRIMARY KEY,
+        turn_count INT NOT NULL,
+        raw_bytes INT NOT NULL,
+        log_zlib MEDIUMBLOB NOT NULL
+    )
+"""
+
+CHAT_LOG_INSERT_SQL = """
+    INSERT IGNORE INTO interaction_chat_logs (interaction_id, turn_count, raw_bytes, log_zlib)
+    VALUES (%s, %s, %s, %s)
+"""
+
+COMPRESSION_LEVEL = 6
+
+
+def chat_log_row(interaction_id: int, raw_chat_log: Optional[str]) -> Optional[tuple]:
+    """Row for interaction_chat_logs from a JSON transcript string; None when there is no log."""
+    if not raw_chat_log:
+        return None
+    raw = raw_chat_log.encode("utf-8")
+    try:
+        turns = json.loads(raw_chat_log)
+        turn_count = len(turns) if isinstance(turns, list) else 0
+    except json.JSONDecodeError:
+        turn_count = 0
+    return (interaction_id, turn_count, len(raw), zlib.compress(raw, COMPRESSION_LEVEL))
+
+
+def decompress_chat_log(log_zlib: bytes) -> str:
+    return zlib.decompress(log_zlib).decode("utf-8")
+
+
+def store_chat_logs(cursor, rows: Sequence[Optional[tuple]]):
+    """Writes transcripts inside the caller's transaction, alongside the interactions they belong to."""
+    rows = [row for row in rows if row is not None]
+    if rows:
+        cursor.executemany(CHAT_LOG_INSERT_SQL, rows)
+
+
+def load_chat_log(cursor, interaction_id: int) -> Optional[str]:
+    """The interaction's transcript as the original JSON string, or None."""
+    cursor.execute("SELECT log_zlib FROM interaction_chat_logs WHERE interaction_id = %s", (interaction_id,))
+    row = cursor.fetchone()
+    return decompress_chat_log(row[0]) if row else None
+
+
+def load_chat_turns(conn, interaction_id: int) -> Optional[List[Dict[str, Any]]]:
+    """The interaction's transcript as a list of turns, or None. Runs on a pool worker thread."""
+    cursor = conn.cursor()
+    try:
+        raw_chat_log = load_chat_log(cursor, interaction_id)
+    finally:
+        cursor.close()
+    if raw_chat_log is None:
+        return None
+    try:
+        turns = json.loads(raw_chat_log)
+    except json.JSONDecodeError:
+        return []
+    return turns if isinstance(turns, list) else []
+
+
+def convert_raw_chat_logs(conn, batch_size: int = 500):
+    """
+    Copies every hcp_interactions.raw_chat_log into interaction_chat_logs, compressed, committing
+    per batch. INSERT IGNORE makes an interrupted run safe to repeat. Used by migration 5, which
+    drops the old column afterwards.
+    """
+    cursor = conn.cursor()
+    try:
+        last_id = 0
+        while True:
+            cursor.execute(
+                "SELECT id, raw_chat_log FROM hcp_interactions WHERE id > %s AND raw_chat_log IS NOT NULL ORDER BY id LIMIT %s",
+                (last_id, batch_size),
+            )
+            rows = cursor.fetchall()
+            if not rows:
+                break
+            store_chat_logs(cursor, [chat_log_row(interaction_id, raw) for interaction_id, raw in rows])
+            conn.commit()
+            last_id = rows[-1][0]
+    finally:
+        cursor.close()
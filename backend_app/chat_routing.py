@@ -0,0 +1,82 @@
+# backend_app/chat_routing.py
+
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+SMALL_MODEL = "gemma2-9b-it"
+LARGE_MODEL = "llama-3.3-70b-versatile"
+
+ROUTE_LOG = "log"              # Required fields present and the user confirmed: write to DB, no LLM
+ROUTE_CONFIRM = "confirm"      # Required fields present: echo them back for confirmation, no LLM
+ROUTE_LLM_SMALL = "llm_small"  # Fields missing: ask the small model to drive the conversation
+ROUTE_LLM_LARGE = "llm_large"  # Long free-form message the rule extractor made nothing of
+
+REQUIRED_FIELDS = ("hcp_name", "interaction_date")  # Minimal for logging attempt
+LOG_INTENT_KEYWORDS = ("log it", "yes", "correct")
+# Messages at least this long that yield no new fields are escalated to the large model.
+LARGE_MODEL_MIN_WORDS = 40
+
+
+@dataclass
+class RouteDecision:
+    route: str
+    model: Optional[str] = None  # Set only for the LLM routes
+    reason: str = ""
+
+    @property
+    def needs_llm(self) -> bool:
+        return self.model is not None
+
+
+def has_log_intent(user_message: str) -> bool:
+    lowered = user_message.lower()
+    return any(keyword in lowered for keyword in LOG_INTENT_KEYWORDS)
+
+
+def route_chat_turn(user_message: str, previous_data: Dict[str, Any], updated_data: Dict[str, Any]) -> RouteDecision:
+    """
+    Decides from extraction state and intent keywords whether this turn needs a model call at all.
+    The LLM reply is only ever shown when required fields are still missing, so in every other
+    case the call is skipped.
+    """
+    if all(updated_data.get(field) for field in REQUIRED_FIELDS):
+        if has_log_intent(user_message):
+            return RouteDecision(ROUTE_LOG, reason="required fields present and user confirmed")
+        return RouteDecision(ROUTE_CONFIRM, reason="required fields present")
+
+    gained_fields = any(value and not previous_data.get(key) for key, value in updated_data.items())
+    if not gained_fields and len(user_message.split()) >= LARGE_MODEL_MIN_WORDS:
+        return RouteDecision(ROUTE_LLM_LARGE, model=LARGE_MODEL, reason="long message with nothing extracted")
+    return RouteDecision(ROUTE_LLM_SMALL, model=SMALL_MODEL, reason="required fields missing")
+
+
+class RouteStats:
+    """Per-route turn counts and per-stage latency totals/maxima, in milliseconds."""
+
+    STAGES = ("extract", "route", "llm", "db", "total")
+
+    def __init__(self):
+        self._routes: Dict[str, Dict[str, Any]] = {}
+
+    def record(self, route: str, timings_ms: Dict[str, float]):
+        entry = self._routes.get(route)
+        if entry is None:
+            entry = {"count": 0, "sum": {stage: 0.0 for stage in self.STAGES}, "max": {stage: 0.0 for stage in self.STAGES}}
+            self._routes[route] = entry
+        entry["count"] += 1
+        for stage in self.STAGES:
+            value = timings_ms.get(stage, 0.0)
+            entry["sum"][stage] += value
+            if value > entry["max"][stage]:
+                entry["max"][stage] = value
+
+    def snapshot(self) -> Dict[str, Any]:
+        result = {}
+        for route, entry in self._routes.items():
+            count = entry["count"]
+            result[route] = {
+                "count": count,
+                "avg_ms": {stage: round(total / count, 3) for stage, total in entry["sum"].items()},
+                "max_ms": {stage: round(value, 3) for stage, value in entry["max"].items()},
+            }
+        return result
@@ -0,0 +1,230 @@
+# backend_app/db.py
+
+import asyncio
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+import mysql.connector
+
+T = TypeVar("T")
+
+
+class DatabaseUnavailableError(Exception):
+    """Raised when the pool cannot hand out a working connection."""
+
+
+class PoolTimeoutError(DatabaseUnavailableError):
+    """Raised when no pooled connection becomes free within the acquire timeout."""
+
+
+class _PooledConnection:
+    """A raw MySQL connection plus the bookkeeping the pool needs for health checks."""
+
+    __slots__ = ("conn", "last_used")
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.last_used = time.monotonic()
+
+
+class MySQLConnectionPool:
+    """
+    Bounded pool of MySQL connections whose blocking work runs on a dedicated executor.
+
+    Request handlers call `await pool.run(fn, *args)`; `fn(conn, *args)` executes on one of
+    `pool_size` worker threads with a checked-out connection, so the uvicorn event loop never
+    blocks on the handshake, the query or the commit. Waiting for a free slot happens on the
+    event loop and is bounded by `acquire_timeout`.
+    """
+
+    def __init__(
+        self,
+        config: Dict[str, Any],
+        pool_size: int = 10,
+        acquire_timeout: float = 5.0,
+        health_check_interval: float = 30.0,
+        connect: Optional[Callable[[], Any]] = None,
+        on_acquire: Optional[Callable[[float], None]] = None,
+    ):
+        if pool_size < 1:
+            raise ValueError("pool_size must be at least 1")
+        self.config = config
+        self.pool_size = pool_size
+        self.acquire_timeout = acquire_timeout
+        self.health_check_interval = health_check_interval
+        self._connect = connect or (lambda: mysql.connector.connect(**self.config))
+        # Called from the worker thread with the seconds from run() to a usable connection
+        # (slot wait, executor hand-off and checkout/connect), e.g. to feed a latency histogram.
+        self._on_acquire = on_acquire
+
+        # LIFO keeps the most recently used (and therefore most likely alive) connection hot.
+        self._idle: "queue.LifoQueue[_PooledConnection]" = queue.LifoQueue()
+        self._executor = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix="mysql-pool")
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._lock = threading.Lock()
+        self._closed = False
+
+        # Saturation / health counters
+        self._in_use = 0
+        self._waiting = 0
+        self._open = 0
+        self._acquired_total = 0
+        self._timeouts_total = 0
+        self._created_total = 0
+        self._health_check_failures = 0
+        self._wait_time_total = 0.0
+
+    # --- Connection lifecycle (runs on worker threads) ---
+    def _checkout(self) -> _PooledConnection:
+        while True:
+            try:
+                pooled = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            if self._is_healthy(pooled):
+                return pooled
+            self._discard(pooled)
+
+        try:
+            conn = self._connect()
+        except mysql.connector.Error as err:
+            raise DatabaseUnavailableError(f"Error connecting to MySQL: {err}") from err
+        with self._lock:
+            self._open += 1
+            self._created_total += 1
+        return _PooledConnection(conn)
+
+    def _is_healthy(self, pooled: _PooledConnection) -> bool:
+        """Pings connections that sat idle longer than the health check interval."""
+        if time.monotonic() - pooled.last_used < self.health_check_interval:
+            return True
+        try:
+            pooled.conn.ping(reconnect=True, attempts=1, delay=0)
+            return True
+        except Exception:
+            with self._lock:
+                self._health_check_failures += 1
+            return False
+
+    def _checkin(self, pooled: _PooledConnection, healthy: bool):
+        if self._closed or not healthy:
+            self._discard(pooled)
+            return
+        pooled.last_used = time.monotonic()
+        self._idle.put(pooled)
+
+    def _discard(self, pooled: _PooledConnection):
+        with self._lock:
+            self._open -= 1
+        try:
+            pooled.conn.close()
+        except Exception:
+            pass
+
+    def _run_with_connection(self, started: float, fn: Callable[..., T], *args, **kwargs) -> T:
+        pooled = self._checkout()
+        if self._on_acquire is not None:
+            self._on_acquire(time.monotonic() - started)
+        healthy = True
+        try:
+            return fn(pooled.conn, *args, **kwargs)
+        except Exception:
+            # Leave no half-finished transaction behind on a connection we hand out again.
+            try:
+                pooled.conn.rollback()
+            except Exception:
+                healthy = False
+            raise
+        except BaseException:
+            healthy = False
+            raise
+        finally:
+            self._checkin(pooled, healthy)
+
+    # --- Public API ---
+    async def run(self, fn: Callable[..., T], *args, **kwargs) -> T:
+        """
+        Runs `fn(conn, *args, **kwargs)` on the pool executor with a checked-out connection.
+        Raises PoolTimeoutError if no connection frees up within `acquire_timeout`, and
+        DatabaseUnavailableError if a new connection cannot be opened.
+        """
+        if self._closed:
+            raise RuntimeError("Connection pool is closed.")
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.pool_size)
+
+        started = time.monotonic()
+        self._waiting += 1
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout=self.acquire_timeout)
+        except asyncio.TimeoutError:
+            self._timeouts_total += 1
+            raise PoolTimeoutError(
+                f"Timed out after {self.acquire_timeout}s waiting for a database connection."
+            )
+        finally:
+            self._waiting -= 1
+
+        self._in_use += 1
+        self._acquired_total += 1
+        self._wait_time_total += time.monotonic() - started
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self._executor, lambda: self._run_with_connection(started, fn, *args, **kwargs)
+            )
+        finally:
+            self._in_use -= 1
+            self._slots.release()
+
+    @contextmanager
+    def connection(self):
+        """
+        Synchronous checkout for startup tasks and CLI scripts that run outside the event loop.
+        Not bounded by the async slot semaphore, so do not use it from request handlers.
+        """
+        pooled = self._checkout()
+        healthy = True
+        try:
+            yield pooled.conn
+        except Exception:
+            try:
+                pooled.conn.rollback()
+            except Exception:
+                healthy = False
+            raise
+        except BaseException:
+            healthy = False
+            raise
+        finally:
+            self._checkin(pooled, healthy)
+
+    def stats(self) -> Dict[str, Any]:
+        """Pool saturation snapshot, suitable for returning from a health endpoint."""
+        return {
+            "pool_size": self.pool_size,
+            "in_use": self._in_use,
+            "idle": self._idle.qsize(),
+            "open": self._open,
+            "waiting": self._waiting,
+            "saturation": round(self._in_use / self.pool_size, 3),
+            "acquired_total": self._acquired_total,
+            "timeouts_total": self._timeouts_total,
+            "created_total": self._created_total,
+            "health_check_failures": self._health_check_failures,
+            "avg_wait_ms": round(1000 * self._wait_time_total / self._acquired_total, 3) if self._acquired_total else 0.0,
+        }
+
+    def close(self):
+        """Closes idle connections and stops the executor. In-flight work finishes first."""
+        self._closed = True
+        self._executor.shutdown(wait=True)
+        while True:
+            try:
+                self._discard(self._idle.get_nowait())
+            except queue.Empty:
+                break
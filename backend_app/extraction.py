@@ -0,0 +1,150 @@
+# backend_app/extraction.py
+
+import json
+import re
+from datetime import date
+from typing import Any, Dict, Iterable, List, Optional
+
+# Field patterns, compiled once. Each one starts with a literal trigger phrase, so its leftmost
+# match can only begin where the trigger lookup below found that phrase.
+_HCP_PATTERN = re.compile(r"(?:dr\.|doctor|hcp)\s*([A-Za-z\s]+?)(?:\s*(?:on|about|regarding|and|\.|$))", re.IGNORECASE)
+_DATE_PATTERN = re.compile(r"(\d{4}-\d{2}-\d{2})|today", re.IGNORECASE)
+_PRODUCTS_PATTERN = re.compile(r"(?:products? discussed|talked about|mentioned)\s*(.*?)(?:\.|and key|and the main)", re.IGNORECASE)
+_POINTS_PATTERN = re.compile(r"(?:key points?|discussion points|main point was)\s*(.*?)(?:\.|and sentiment|and follow-up)", re.IGNORECASE)
+_FOLLOW_UP_PATTERN = re.compile(r"(?:follow-up actions?|next steps?|action items?)\s*(.*?)(?:\.|$)", re.IGNORECASE)
+
+# Literal trigger phrases per regex-backed field, as they appear in lowercased text. Located with
+# str.find, which is several times faster than running an IGNORECASE alternation over the text.
+_FIELD_TRIGGER_LITERALS = {
+    "hcp_name": ("dr.", "doctor", "hcp"),
+    "interaction_date": ("today",),
+    "products_discussed": ("product discussed", "products discussed", "talked about", "mentioned"),
+    "key_discussion_points": ("key point", "discussion points", "main point was"),
+    "follow_up_actions": ("follow-up action", "next step", "action item"),
+}
+_DATE_DIGITS = re.compile(r"\d{4}-\d{2}-\d{2}")
+
+_FIELD_PATTERNS = {
+    "hcp_name": _HCP_PATTERN,
+    "interaction_date": _DATE_PATTERN,
+    "products_discussed": _PRODUCTS_PATTERN,
+    "key_discussion_points": _POINTS_PATTERN,
+    "follow_up_actions": _FOLLOW_UP_PATTERN,
+}
+
+ALL_FIELDS = ("hcp_name", "interaction_date", "products_discussed", "key_discussion_points", "sentiment", "follow_up_actions")
+
+def _first_trigger_offsets(text: str, lowered: str, fields: Iterable[str]) -> Dict[str, int]:
+    """
+    Records where each missing field's trigger first occurs; fields without one are omitted.
+    Only valid for ASCII text, where lowercasing keeps offsets aligned and agrees exactly with
+    re.IGNORECASE.
+    """
+    offsets: Dict[str, int] = {}
+    for name in fields:
+        first = -1
+        for literal in _FIELD_TRIGGER_LITERALS[name]:
+            # Only an occurrence starting before the best offset so far can improve on it
+            end = first + len(literal) - 1 if first >= 0 else len(lowered)
+            found = lowered.find(literal, 0, end)
+            if found >= 0:
+                first = found
+        if name == "interaction_date":
+            digits = _DATE_DIGITS.search(text)
+            if digits and (first < 0 or digits.start() < first):
+                first = digits.start()
+        if first >= 0:
+            offsets[name] = first
+    return offsets
+
+
+class InteractionExtractor:
+    """
+    Compiled version of the rule-based interaction extractor. The text is lowercased once and
+    trigger phrases are located up front; a field's regex only runs when its trigger occurs,
+    starting at that offset. Produces exactly the same fields as the original per-field
+    regex implementation.
+    """
+
+    def extract(self, text: str, existing_data: Optional[Dict] = None) -> Dict[str, Any]:
+        extracted = dict(existing_data) if existing_data else {}
+        missing = [name for name in ALL_FIELDS if not extracted.get(name)]
+        if not missing:
+            return extracted
+
+        lowered = text.lower()  # The only lowercase pass; keyword fallbacks all read from it
+        if text.isascii():
+            offsets = _first_trigger_offsets(text, lowered, [name for name in missing if name in _FIELD_PATTERNS])
+        else:
+            offsets = None  # Non-ASCII case folding can shift offsets; search each field from the start
+
+        for name in missing:
+            if name == "sentiment":
+                if "positive" in lowered: extracted["sentiment"] = "Positive"
+                elif "neutral" in lowered: extracted["sentiment"] = "Neutral"
+                elif "negative" in lowered: extracted["sentiment"] = "Negative"
+                continue
+
+            if offsets is None:
+                match = _FIELD_PATTERNS[name].search(text)
+            else:
+                start = offsets.get(name)
+                match = _FIELD_PATTERNS[name].search(text, start) if start is not None else None
+
+            if name == "hcp_name":
+                if match:
+                    extracted["hcp_name"] = match.group(1).strip().title()
+            elif name == "interaction_date":
+                if match:
+                    if match.group(1):
+                        extracted["interaction_date"] = match.group(1)
+                    elif match.group(0).lower() == "today":
+                        extracted["interaction_date"] = date.today().isoformat()
+            elif name == "products_discussed":
+                if match:
+                    extracted["products_discussed"] = match.group(1).strip()
+                else:
+                    prods = []
+                    if "producta" in lowered: prods.append("ProductA")
+                    if "productb" in lowered: prods.append("ProductB")
+                    if prods:
+                        extracted["products_discussed"] = ", ".join(prods)
+            elif name == "key_discussion_points":
+                if match:
+                    extracted["key_discussion_points"] = match.group(1).strip()
+                elif "efficacy data" in lowered:
+                    extracted["key_discussion_points"] = "Efficacy data"
+            elif name == "follow_up_actions":
+                if match:
+                    extracted["follow_up_actions"] = match.group(1).strip()
+                elif "send publication" in lowered:
+                    extracted["follow_up_actions"] = "Send publication"
+
+        return extracted
+
+    def extract_batch(self, texts: Iterable[str], existing_data: Optional[Dict] = None) -> List[Dict[str, Any]]:
+        """Extracts from many independent texts, e.g. when re-processing stored interactions."""
+        extract = self.extract
+        return [extract(text, existing_data) for text in texts]
+
+    def extract_from_chat_log(self, chat_log: Iterable[Dict[str, str]]) -> Dict[str, Any]:
+        """Replays the user turns of a stored conversation the way the chat flow accumulates them."""
+        extracted: Dict[str, Any] = {}
+        for turn in chat_log:
+            if turn.get("role") == "user":
+                extracted = self.extract(turn.get("content", ""), extracted)
+        return extracted
+
+    def extract_from_raw_chat_logs(self, raw_chat_logs: Iterable[Optional[str]]) -> List[Dict[str, Any]]:
+        """Batch re-processing of stored transcripts, as returned by `load_chat_log` (JSON lists of turns)."""
+        results = []
+        for raw in raw_chat_logs:
+            try:
+                turns = json.loads(raw) if raw else []
+            except json.JSONDecodeError:
+                turns = []
+            results.append(self.extract_from_chat_log(turns))
+        return results
+
+
+default_extractor = InteractionExtractor()
@@ -0,0 +1,432 @@
+# backend_app/hcp_directory.py
+
+import bisect
+import heapq
+import re
+import threading
+import unicodedata
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Canonical HCP entities. hcp_interactions.hcp_name keeps the spelling that was entered; hcp_id
+# links the row to one hcps entry, identified by a normalized name key ("Dr. Jane  Doe, MD" and
+# "jane doe" share name_key "jane doe"). HCPIndex mirrors the table in memory for autocomplete
+# and for resolving names extracted from chat messages.
+HCP_DIRECTORY_DDL = """
+    CREATE TABLE IF NOT EXISTS hcps (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        name_key VARCHAR(191) NOT NULL,
+        display_name VARCHAR(255) NOT NULL,
+        interaction_count INT NOT NULL DEFAULT 0,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE KEY uq_hcps_name_key (name_key)
+    )
+"""
+
+HCP_UPSERT_SQL = """
+    INSERT INTO hcps (name_key, display_name, interaction_count) VALUES (%s, %s, %s)
+    ON DUPLICATE KEY UPDATE interaction_count = interaction_count + VALUES(interaction_count)
+"""
+
+SUGGEST_MIN_SIMILARITY = 0.3  # Trigram Jaccard similarity for fuzzy autocomplete suggestions
+RESOLVE_MIN_SIMILARITY = 0.65 # A chat name only resolves fuzzily to a clearly better match than this
+RESOLVE_MARGIN = 0.1          # ... that beats the runner-up by at least this much
+FUZZY_MIN_QUERY_LEN = 3
+
+_TITLE_PREFIX = re.compile(r"^(?:(?:dr|doctor|prof|professor|mr|mrs|ms|miss)(?:\.\s*|\s+))+")
+_DROPPED_CHARS = re.compile(r"[.']")
+_SEPARATORS = re.compile(r"[\W_]+")
+_DEGREE_SUFFIXES = {"md", "phd", "do", "dds", "jr", "sr"}
+_WHITESPACE = re.compile(r"\s+")
+
+
+def _fold(name: str) -> str:
+    decomposed = unicodedata.normalize("NFKD", name.lower())
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def name_key(name: Optional[str], strip_degrees: bool = True) -> Optional[str]:
+    """
+    Identity of an HCP name: lowercased, accents folded, leading titles and trailing degrees
+    removed, punctuation collapsed. None when nothing is left.
+    """
+    if not name:
+        return None
+    text = _fold(name).strip()
+    text = _TITLE_PREFIX.sub("", text) or text
+    words = _SEPARATORS.sub(" ", _DROPPED_CHARS.sub("", text)).split()
+    while strip_degrees and len(words) > 1 and words[-1] in _DEGREE_SUFFIXES:
+        words.pop()
+    return " ".join(words)[:191] or None
+
+
+def display_name(name: str) -> str:
+    return _WHITESPACE.sub(" ", name.strip())[:255]
+
+
+def name_trigrams(key: str) -> List[str]:
+    """Distinct trigrams of each word padded with two leading blanks and one trailing blank, as in pg_trgm."""
+    grams: List[str] = []
+    seen = set()
+    for word in key.split():
+        padded = f"  {word} "
+        for i in range(len(padded) - 2):
+            gram = padded[i:i + 3]
+            if gram not in seen:
+                seen.add(gram)
+                grams.append(gram)
+    return grams
+
+
+def _prefix_range(tokens: List[Tuple[str, int]], prefix: str) -> Tuple[int, int]:
+    """Bounds of the (token, id) pairs whose token starts with `prefix` in the sorted token array."""
+    return bisect.bisect_left(tokens, (prefix,)), bisect.bisect_left(tokens, (prefix + "\U0010ffff",))
+
+
+def _word_suffixes(key: str) -> List[str]:
+    """"jane a doe" -> ["jane a doe", "a doe", "doe"], so a prefix can start at any word."""
+    words = key.split()
+    return [" ".join(words[i:]) for i in range(len(words))]
+
+
+class HCPEntry:
+    """One hcps row as held in memory."""
+
+    __slots__ = ("id", "key", "name", "interaction_count", "gram_count")
+
+    def __init__(self, hcp_id: int, key: str, name: str, interaction_count: int):
+        self.id = hcp_id
+        self.key = key
+        self.name = name
+        self.interaction_count = interaction_count
+        self.gram_count = len(name_trigrams(key))
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"id": self.id, "name": self.name, "interaction_count": self.interaction_count}
+
+
+class HCPIndex:
+    """
+    In-memory prefix and fuzzy index over the hcps table, loaded at startup and updated after
+    each insert transaction commits.
+
+    Prefix lookups use a sorted array of (word suffix, id) pairs: bisect finds the matching
+    range, which is what walking a character trie down to the prefix node gives, at a fraction
+    of the memory of one dict per node. Prefixes that match many names (every prefix of up to
+    `hot_prefix_len` characters, and longer ones covering more than `hot_range` tokens at build
+    time, e.g. a common first name) keep a precomputed list of their best `top_k` ids by
+    interaction count, maintained incrementally; counts only grow, so those lists stay exact.
+
+    Fuzzy matching ranks names by trigram Jaccard similarity. Posting lists are kept sorted by
+    id. Candidates come from the query's rarest trigrams, reading at most `fuzzy_budget` ids, so
+    a query made of common trigrams cannot turn into a scan of the directory; the best partial
+    matches are then scored exactly, checking the remaining trigrams by binary search.
+
+    All methods are thread-safe: lookups run on the event loop, updates on pool worker threads.
+    """
+
+    def __init__(self, top_k: int = 20, hot_prefix_len: int = 4, hot_range: int = 256, fuzzy_budget: int = 2000, fuzzy_candidates: int = 16):
+        self.top_k = top_k
+        self.hot_prefix_len = hot_prefix_len
+        self.hot_range = hot_range
+        self.fuzzy_budget = fuzzy_budget
+        self.fuzzy_candidates = fuzzy_candidates
+        self._lock = threading.RLock()
+        self._entries: Dict[int, HCPEntry] = {}
+        self._ids_by_key: Dict[str, int] = {}
+        self._tokens: List[Tuple[str, int]] = []
+        self._top: Dict[str, List[int]] = {}
+        self._postings: Dict[str, List[int]] = {}
+        self._loaded = False
+
+        self._suggest_total = 0
+        self._resolve_exact_total = 0
+        self._resolve_fuzzy_total = 0
+        self._resolve_miss_total = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _rank(self, hcp_id: int) -> Tuple[int, str]:
+        entry = self._entries[hcp_id]
+        return (-entry.interaction_count, entry.key)
+
+    def _short_prefixes(self, key: str) -> set:
+        return {
+            token[:length]
+            for token in _word_suffixes(key)
+            for length in range(1, min(len(token), self.hot_prefix_len) + 1)
+        }
+
+    def _hot_prefixes(self, key: str) -> set:
+        """Prefixes of `key` that have a precomputed top list (or get one, for short prefixes)."""
+        prefixes = set()
+        for token in _word_suffixes(key):
+            for length in range(1, len(token) + 1):
+                prefix = token[:length]
+                if length > self.hot_prefix_len and prefix not in self._top:
+                    break  # Longer prefixes of this token match fewer names, so none of them is hot either
+                prefixes.add(prefix)
+        return prefixes
+
+    # --- Loading and updates ---
+    def load(self, conn, batch_size: int = 10000):
+        """Replaces the index with the current contents of the hcps table. Runs on a pool worker thread."""
+        entries: Dict[int, HCPEntry] = {}
+        cursor = conn.cursor()
+        try:
+            last_id = 0
+            while True:
+                cursor.execute(
+                    "SELECT id, name_key, display_name, interaction_count FROM hcps WHERE id > %s ORDER BY id LIMIT %s",
+                    (last_id, batch_size),
+                )
+                rows = cursor.fetchall()
+                if not rows:
+                    break
+                for hcp_id, key, name, count in rows:
+                    entries[hcp_id] = HCPEntry(hcp_id, key, name, count)
+                last_id = rows[-1][0]
+        finally:
+            cursor.close()
+        self.build(entries.values())
+
+    def build(self, entries: Iterable[HCPEntry]):
+        """Builds every structure in one pass and swaps them in; much faster than adding entries one by one."""
+        entries_by_id = {entry.id: entry for entry in sorted(entries, key=lambda e: e.id)}
+        tokens: List[Tuple[str, int]] = []
+        postings: Dict[str, List[int]] = {}
+        for entry in entries_by_id.values():
+            tokens.extend((token, entry.id) for token in _word_suffixes(entry.key))
+            for gram in name_trigrams(entry.key):
+                postings.setdefault(gram, []).append(entry.id)  # Ascending ids, so already sorted
+        tokens.sort()
+
+        # Visiting entries best-ranked first fills each short prefix's top list in order
+        top: Dict[str, List[int]] = {}
+        for entry in sorted(entries_by_id.values(), key=lambda e: (-e.interaction_count, e.key)):
+            for prefix in self._short_prefixes(entry.key):
+                ids = top.setdefault(prefix, [])
+                if len(ids) < self.top_k:
+                    ids.append(entry.id)
+
+        def rank(hcp_id):
+            entry = entries_by_id[hcp_id]
+            return (-entry.interaction_count, entry.key)
+
+        # Longer prefixes with large ranges: children of a large range are the only candidates at the next length
+        level = [prefix for prefix in top if len(prefix) == self.hot_prefix_len]
+        while level:
+            next_level = []
+            for prefix in level:
+                lo, hi = _prefix_range(tokens, prefix)
+                if hi - lo <= self.hot_range:
+                    continue
+                if len(prefix) > self.hot_prefix_len:
+                    top[prefix] = heapq.nsmallest(self.top_k, {hcp_id for _, hcp_id in tokens[lo:hi]}, key=rank)
+                children = Counter(token[:len(prefix) + 1] for token, _ in tokens[lo:hi] if len(token) > len(prefix))
+                next_level.extend(child for child, count in children.items() if count > self.hot_range)
+            level = next_level
+        with self._lock:
+            self._entries = entries_by_id
+            self._ids_by_key = {entry.key: entry.id for entry in entries_by_id.values()}
+            self._tokens = tokens
+            self._postings = postings
+            self._top = top
+            self._loaded = True
+
+    def record(self, rows: Iterable[Sequence[Any]]):
+        """
+        Applies committed hcps rows, (id, name_key, display_name, interaction_count) as returned
+        by link(): adds new HCPs and raises the counts of known ones.
+        """
+        with self._lock:
+            for hcp_id, key, name, count in rows:
+                entry = self._entries.get(hcp_id)
+                if entry is None:
+                    entry = HCPEntry(hcp_id, key, name, count)
+                    self._entries[hcp_id] = entry
+                    self._ids_by_key[key] = hcp_id
+                    for token in _word_suffixes(key):
+                        bisect.insort(self._tokens, (token, hcp_id))
+                    for gram in name_trigrams(key):
+                        bisect.insort(self._postings.setdefault(gram, []), hcp_id)
+                elif count > entry.interaction_count:
+                    entry.interaction_count = count
+                else:
+                    continue
+                self._promote(entry)
+
+    def _promote(self, entry: HCPEntry):
+        """Re-ranks `entry` in the precomputed top lists of its prefixes after it was added or its count grew."""
+        rank = self._rank(entry.id)
+        for prefix in self._hot_prefixes(entry.key):
+            top = self._top.setdefault(prefix, [])
+            if entry.id not in top:
+                if len(top) >= self.top_k and rank >= self._rank(top[-1]):
+                    continue
+                top.append(entry.id)
+            top.sort(key=self._rank)
+            del top[self.top_k:]
+
+    # --- Lookups ---
+    def _prefix_ids(self, key: str, limit: int) -> List[int]:
+        top = self._top.get(key)
+        if top is not None or len(key) <= self.hot_prefix_len:
+            return (top or [])[:limit]
+        lo, hi = _prefix_range(self._tokens, key)
+        return heapq.nsmallest(limit, {hcp_id for _, hcp_id in self._tokens[lo:hi]}, key=self._rank)
+
+    def _fuzzy(self, key: str, limit: int, min_similarity: float) -> List[Tuple[float, int]]:
+        grams = name_trigrams(key)
+        if not grams:
+            return []
+        posting_lists = sorted((self._postings.get(gram, []) for gram in grams), key=len)
+        shared_counts: Counter = Counter()
+        read = 0
+        scanned = 0
+        for postings in posting_lists:
+            if scanned and read + len(postings) > self.fuzzy_budget:
+                break
+            shared_counts.update(postings)
+            read += len(postings)
+            scanned += 1
+        check_lists = posting_lists[scanned:]
+
+        scored = []
+        for hcp_id, shared in shared_counts.most_common(self.fuzzy_candidates):
+            for postings in check_lists:
+                i = bisect.bisect_left(postings, hcp_id)
+                if i < len(postings) and postings[i] == hcp_id:
+                    shared += 1
+            entry = self._entries[hcp_id]
+            similarity = shared / (len(grams) + entry.gram_count - shared)
+            if similarity >= min_similarity:
+                scored.append((similarity, hcp_id))
+        return heapq.nlargest(limit, scored, key=lambda item: (item[0], self._entries[item[1]].interaction_count))
+
+    def suggest(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Autocomplete: names with a word starting with the query, busiest HCPs first, then (for
+        queries of 3+ characters) fuzzy matches to cover typos, best similarity first.
+        """
+        key = name_key(query, strip_degrees=False)
+        if not key:
+            return []
+        with self._lock:
+            self._suggest_total += 1
+            ids = self._prefix_ids(key, limit)
+            results = [{**self._entries[hcp_id].as_dict(), "match": "prefix", "score": 1.0} for hcp_id in ids]
+            # Fuzzy matches fill up the list unless the query already is a complete known name
+            if len(results) < limit and len(key) >= FUZZY_MIN_QUERY_LEN and key not in self._ids_by_key:
+                seen = set(ids)
+                for similarity, hcp_id in self._fuzzy(key, limit, SUGGEST_MIN_SIMILARITY):
+                    if hcp_id not in seen and len(results) < limit:
+                        results.append({**self._entries[hcp_id].as_dict(), "match": "fuzzy", "score": round(similarity, 3)})
+        return results
+
+    def resolve(self, name: Optional[str]) -> Optional[HCPEntry]:
+        """
+        Canonical entry for a free-text name: the exact name_key when known, otherwise a fuzzy
+        match that is both close enough and clearly ahead of the next candidate. None if neither.
+        """
+        key = name_key(name)
+        if not key:
+            return None
+        with self._lock:
+            hcp_id = self._ids_by_key.get(key)
+            if hcp_id is not None:
+                self._resolve_exact_total += 1
+                return self._entries[hcp_id]
+            matches = self._fuzzy(key, 2, RESOLVE_MIN_SIMILARITY) if len(key) >= FUZZY_MIN_QUERY_LEN else []
+            if matches and (len(matches) == 1 or matches[0][0] - matches[1][0] >= RESOLVE_MARGIN):
+                self._resolve_fuzzy_total += 1
+                return self._entries[matches[0][1]]
+            self._resolve_miss_total += 1
+            return None
+
+    def get(self, hcp_id: Optional[int]) -> Optional[HCPEntry]:
+        with self._lock:
+            return self._entries.get(hcp_id) if hcp_id is not None else None
+
+    # --- Writes ---
+    def link(self, cursor, rows: Sequence[Tuple[Optional[str], Optional[int]]]) -> Tuple[List[Optional[int]], List[tuple]]:
+        """
+        Finds or creates the hcps row for each (hcp_name, hcp_id) pair about to be inserted and
+        adds the rows' interactions to its count, inside the caller's transaction. An hcp_id
+        known to the index wins over the name. Returns the hcp ids in input order (None for
+        names with nothing left to key on) and the hcps rows to pass to record() after commit.
+        """
+        keyed: List[Optional[Tuple[str, str]]] = []
+        with self._lock:
+            for name, hcp_id in rows:
+                entry = self._entries.get(hcp_id) if hcp_id is not None else None
+                if entry is None:
+                    key = name_key(name)
+                    known_id = self._ids_by_key.get(key) if key else None
+                    entry = self._entries[known_id] if known_id is not None else None
+                    if entry is None:
+                        keyed.append((key, display_name(name)) if key else None)
+                        continue
+                keyed.append((entry.key, entry.name))
+
+        counts = Counter(item[0] for item in keyed if item)
+        if not counts:
+            return [None] * len(rows), []
+        names: Dict[str, str] = {}
+        for item in keyed:
+            if item:
+                names.setdefault(item[0], item[1])
+        # Sorted so concurrent transactions take the unique-key locks in the same order
+        cursor.executemany(HCP_UPSERT_SQL, [(key, names[key], count) for key, count in sorted(counts.items())])
+        placeholders = ", ".join(["%s"] * len(counts))
+        cursor.execute(
+            f"SELECT id, name_key, display_name, interaction_count FROM hcps WHERE name_key IN ({placeholders})",
+            list(counts),
+        )
+        hcp_rows = cursor.fetchall()
+        ids_by_key = {key: hcp_id for hcp_id, key, _, _ in hcp_rows}
+        return [ids_by_key.get(item[0]) if item else None for item in keyed], hcp_rows
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "loaded": self._loaded,
+                "hcps": len(self._entries),
+                "prefix_tokens": len(self._tokens),
+                "hot_prefixes": len(self._top),
+                "trigrams": len(self._postings),
+                "suggest_total": self._suggest_total,
+                "resolve_exact_total": self._resolve_exact_total,
+                "resolve_fuzzy_total": self._resolve_fuzzy_total,
+                "resolve_miss_total": self._resolve_miss_total,
+            }
+
+
+def backfill_hcp_directory(conn, batch_size: int = 1000):
+    """
+    Creates hcps rows for every existing interaction and links them through hcp_id, committing
+    per batch. Only rows without an hcp_id are visited, so an interrupted run can be repeated
+    without double counting. Used by the migration that adds the table.
+    """
+    directory = HCPIndex()  # Left empty: every name goes through the upsert
+    cursor = conn.cursor()
+    try:
+        last_id = 0
+        while True:
+            cursor.execute(
+                "SELECT id, hcp_name FROM hcp_interactions WHERE id > %s AND hcp_id IS NULL ORDER BY id LIMIT %s",
+                (last_id, batch_size),
+            )
+            rows = cursor.fetchall()
+            if not rows:
+                break
+            hcp_ids, _ = directory.link(cursor, [(hcp_name, None) for _, hcp_name in rows])
+            cursor.executemany(
+                "UPDATE hcp_interactions SET hcp_id = %s WHERE id = %s",
+                [(hcp_id, interaction_id) for (interaction_id, _), hcp_id in zip(rows, hcp_ids) if hcp_id is not None],
+            )
+            conn.commit()
+            last_id = rows[-1][0]
+    finally:
+        cursor.close()
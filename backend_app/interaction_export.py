@@ -0,0 +1,382 @@
+# backend_app/interaction_export.py
+
+import asyncio
+import concurrent.futures
+import csv
+import io
+import json
+import logging
+import operator
+import threading
+import time
+import zlib
+from datetime import date, datetime
+from typing import Any, AsyncIterator, Callable, List, Optional, Sequence, Tuple
+
+from chat_log_storage import decompress_chat_log
+from db import MySQLConnectionPool
+from interaction_queries import InteractionFilters, build_filter_clauses
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # Parquet output is unavailable without pyarrow; NDJSON and CSV still work
+    pyarrow = None
+
+logger = logging.getLogger("crm.export")
+
+# Export column order. The chat transcript is appended (decompressed) only when requested.
+EXPORT_COLUMNS = (
+    "id", "hcp_id", "hcp_name", "interaction_date", "products_discussed", "key_discussion_points",
+    "sentiment", "follow_up_actions", "interaction_method", "created_at",
+)
+CHAT_LOG_COLUMN = "chat_log"
+
+# format -> (media type, file extension)
+EXPORT_FORMATS = {
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+
+class ExportFormatUnavailableError(Exception):
+    """Raised when the requested export format needs an optional dependency that is not installed."""
+
+
+class ExportCancelledError(Exception):
+    """Raised on the export worker thread when the client has gone away."""
+
+
+def parquet_available() -> bool:
+    return pyarrow is not None
+
+
+def build_export_query(filters: InteractionFilters, include_chat_log: bool) -> Tuple[str, List[Any]]:
+    """
+    Export query in primary key order, so MySQL can walk the clustered index and stream rows
+    without sorting the whole result first. The filters are the same ones the list endpoint uses.
+    """
+    clauses, params = build_filter_clauses(filters)
+    columns = ", ".join(f"i.{column}" for column in EXPORT_COLUMNS)
+    if include_chat_log:
+        sql = (
+            f"SELECT {columns}, c.log_zlib FROM hcp_interactions i "
+            "LEFT JOIN interaction_chat_logs c ON c.interaction_id = i.id"
+        )
+    else:
+        sql = f"SELECT {columns} FROM hcp_interactions i"
+    if clauses:
+        # Filter columns only exist on hcp_interactions, so they need no table prefix
+        sql += " WHERE " + " AND ".join(clauses)
+    sql += " ORDER BY i.id"
+    return sql, params
+
+
+# --- Encoders: each turns a batch of rows into bytes, holding no more than one batch ---
+class NDJSONEncoder:
+    def __init__(self, columns: Sequence[str]):
+        self.columns = columns
+
+    def header(self) -> bytes:
+        return b""
+
+    def encode(self, rows: Sequence[tuple]) -> bytes:
+        return "".join(
+            json.dumps(dict(zip(self.columns, row)), default=_json_default, ensure_ascii=False, separators=(",", ":")) + "\n"
+            for row in rows
+        ).encode("utf-8")
+
+    def finish(self) -> bytes:
+        return b""
+
+
+class CSVEncoder:
+    def __init__(self, columns: Sequence[str]):
+        self.columns = columns
+        self._buffer = io.StringIO()
+        self._writer = csv.writer(self._buffer)
+
+    def _drain(self) -> bytes:
+        data = self._buffer.getvalue().encode("utf-8")
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        return data
+
+    def header(self) -> bytes:
+        self._writer.writerow(self.columns)
+        return self._drain()
+
+    def encode(self, rows: Sequence[tuple]) -> bytes:
+        # csv writes dates via str(), i.e. ISO 8601; None becomes an empty field
+        self._writer.writerows(rows)
+        return self._drain()
+
+    def finish(self) -> bytes:
+        return b""
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file object that hands back whatever was written since the last drain."""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+class ParquetEncoder:
+    """
+    Columnar output. Rows are buffered until `row_group_rows` rows or roughly `row_group_bytes`
+    of values, whichever comes first, and written as one row group, whose bytes are handed on
+    right away, so memory is bounded by one row group rather than the file. The byte limit is
+    what holds with chat logs included, where a row can carry hundreds of kilobytes of transcript.
+    The footer (schema and row group offsets) is written by finish().
+    """
+
+    def __init__(self, columns: Sequence[str], row_group_rows: int = 50000, compression: str = "zstd", row_group_bytes: int = 32 * 1024 * 1024):
+        if pyarrow is None:
+            raise ExportFormatUnavailableError("Parquet export needs the pyarrow package.")
+        types = {
+            "id": pyarrow.int64(), "hcp_id": pyarrow.int64(), "interaction_date": pyarrow.date32(),
+            "created_at": pyarrow.timestamp("s"),
+        }
+        self.columns = columns
+        self.schema = pyarrow.schema([(column, types.get(column, pyarrow.string())) for column in columns])
+        self.row_group_rows = row_group_rows
+        self.row_group_bytes = row_group_bytes
+        # Text is what varies in size; fixed-width columns are left to the row count limit
+        self._text_columns = [operator.itemgetter(i) for i, field in enumerate(self.schema) if field.type == pyarrow.string()]
+        self._rows: List[tuple] = []
+        self._buffered_bytes = 0
+        self._sink = _ChunkSink()
+        self._writer = pyarrow.parquet.ParquetWriter(self._sink, self.schema, compression=compression)
+
+    def _write_row_group(self):
+        arrays = [
+            pyarrow.array(values, type=field.type)
+            for values, field in zip(zip(*self._rows), self.schema)
+        ]
+        self._writer.write_table(pyarrow.Table.from_arrays(arrays, schema=self.schema))
+        self._rows = []
+        self._buffered_bytes = 0
+
+    def header(self) -> bytes:
+        return b""
+
+    def _text_bytes(self, rows: Sequence[tuple]) -> int:
+        return sum(sum(map(len, filter(None, map(column, rows)))) for column in self._text_columns)
+
+    def encode(self, rows: Sequence[tuple]) -> bytes:
+        batch_bytes = self._text_bytes(rows)
+        if len(self._rows) + len(rows) < self.row_group_rows and self._buffered_bytes + batch_bytes < self.row_group_bytes:
+            self._rows.extend(rows)
+            self._buffered_bytes += batch_bytes
+        else:
+            # The batch crosses a limit: place the row group boundary at the row that reaches it
+            for row in rows:
+                self._rows.append(row)
+                self._buffered_bytes += self._text_bytes((row,))
+                if len(self._rows) >= self.row_group_rows or self._buffered_bytes >= self.row_group_bytes:
+                    self._write_row_group()
+        return self._sink.drain()
+
+    def finish(self) -> bytes:
+        if self._rows:
+            self._write_row_group()
+        self._writer.close()
+        return self._sink.drain()
+
+
+ENCODERS = {"ndjson": NDJSONEncoder, "csv": CSVEncoder, "parquet": ParquetEncoder}
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+# --- Export job ---
+class InteractionExport:
+    """
+    One streaming export of hcp_interactions. A pool worker thread executes the query on an
+    unbuffered cursor (rows arrive from the server as they are fetched instead of being read into
+    client memory by execute), encodes `batch_rows` rows at a time and hands the bytes to the
+    event loop through a queue of at most `max_pending_chunks` chunks. When the client reads
+    slowly the worker blocks on that queue, which stops it fetching, so memory stays at a few
+    batches however many rows are exported.
+
+    The export holds one pool connection until it finishes. A client that disconnects cancels it:
+    the worker stops at its next chunk and closes the connection, which may still have unread
+    rows, so the pool replaces it instead of reusing it.
+    """
+
+    def __init__(
+        self,
+        export_format: str,
+        filters: InteractionFilters,
+        include_chat_log: bool = False,
+        gzip: bool = False,
+        batch_rows: int = 1000,
+        max_pending_chunks: int = 8,
+        net_write_timeout: Optional[int] = None,
+        parquet_row_group_rows: int = 50000,
+        parquet_row_group_bytes: int = 32 * 1024 * 1024,
+        parquet_compression: str = "zstd",
+        on_finish: Optional[Callable[["InteractionExport", str], None]] = None,
+    ):
+        if export_format not in EXPORT_FORMATS:
+            raise ValueError(f"Unknown export format: {export_format!r}")
+        if export_format == "parquet" and pyarrow is None:
+            raise ExportFormatUnavailableError("Parquet export needs the pyarrow package.")
+        self.export_format = export_format
+        self.filters = filters
+        self.include_chat_log = include_chat_log
+        self.gzip = gzip
+        self.batch_rows = batch_rows
+        self.max_pending_chunks = max_pending_chunks
+        self.net_write_timeout = net_write_timeout
+        self.parquet_row_group_rows = parquet_row_group_rows
+        self.parquet_row_group_bytes = parquet_row_group_bytes
+        self.parquet_compression = parquet_compression
+        self._on_finish = on_finish  # Called with the outcome: "ok", "cancelled" or "error"
+        self.columns = EXPORT_COLUMNS + ((CHAT_LOG_COLUMN,) if include_chat_log else ())
+
+        self.rows = 0
+        self.bytes = 0
+        self._queue: Optional[asyncio.Queue] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._cancelled = threading.Event()
+
+    @property
+    def media_type(self) -> str:
+        return "application/gzip" if self.gzip else EXPORT_FORMATS[self.export_format][0]
+
+    @property
+    def filename(self) -> str:
+        name = f"hcp_interactions.{EXPORT_FORMATS[self.export_format][1]}"
+        return name + ".gz" if self.gzip else name
+
+    def _make_encoder(self):
+        if self.export_format == "parquet":
+            return ParquetEncoder(self.columns, self.parquet_row_group_rows, self.parquet_compression, self.parquet_row_group_bytes)
+        return ENCODERS[self.export_format](self.columns)
+
+    def _emit(self, chunk: bytes):
+        """Worker thread: queues a chunk for the response, waiting while the queue is full."""
+        if not chunk:
+            return
+        future = asyncio.run_coroutine_threadsafe(self._queue.put(chunk), self._loop)
+        while True:
+            try:
+                future.result(timeout=0.25)
+                break
+            except concurrent.futures.TimeoutError:
+                if self._cancelled.is_set():
+                    future.cancel()
+                    raise ExportCancelledError()
+        self.bytes += len(chunk)
+
+    def write(self, conn):
+        """Runs the query and emits the encoded output. Runs on a pool worker thread."""
+        sql, params = build_export_query(self.filters, self.include_chat_log)
+        encoder = self._make_encoder()
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if self.gzip else None  # wbits=31: gzip container
+
+        def emit(data: bytes):
+            self._emit(compressor.compress(data) if compressor else data)
+
+        cursor = conn.cursor(buffered=False)
+        finished = False
+        try:
+            if self.net_write_timeout:
+                # The server aborts a result the client stops reading for this long; a slow
+                # download pauses fetching, so give it more room than the default 60 seconds.
+                cursor.execute("SET SESSION net_write_timeout = %s", (self.net_write_timeout,))
+            cursor.execute(sql, params)
+            emit(encoder.header())
+            while True:
+                rows = cursor.fetchmany(self.batch_rows)
+                if not rows:
+                    break
+                if self.include_chat_log:
+                    rows = [row[:-1] + (decompress_chat_log(row[-1]) if row[-1] else None,) for row in rows]
+                self.rows += len(rows)
+                emit(encoder.encode(rows))
+            emit(encoder.finish())
+            if compressor:
+                self._emit(compressor.flush())
+            if self.net_write_timeout:
+                cursor.execute("SET SESSION net_write_timeout = @@GLOBAL.net_write_timeout")
+            finished = True
+        finally:
+            if finished:
+                cursor.close()
+            else:
+                # Unread rows may be left on the connection, and the pool's rollback would read
+                # them all to clear it. Close it instead; the failed rollback makes the pool discard it.
+                conn.close()
+
+    async def stream(self, pool: MySQLConnectionPool) -> AsyncIterator[bytes]:
+        """
+        Yields the export as byte chunks. Starts the worker on first iteration; errors it raises
+        (including pool timeouts) surface from this generator.
+        """
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(maxsize=self.max_pending_chunks)
+        started = time.monotonic()
+        writer = asyncio.ensure_future(pool.run(self.write))
+        # Never cancel the writer task: its pool slot must stay taken until the thread lets go
+        writer.add_done_callback(self._log_result(started))
+        get = None
+        try:
+            while True:
+                get = asyncio.ensure_future(self._queue.get())
+                done, _ = await asyncio.wait({get, writer}, return_when=asyncio.FIRST_COMPLETED)
+                if get in done:
+                    yield get.result()
+                    continue
+                get.cancel()
+                while not self._queue.empty():
+                    yield self._queue.get_nowait()
+                writer.result()  # Re-raises the worker's error, if any
+                return
+        finally:
+            self._cancelled.set()
+            if get is not None:
+                get.cancel()
+
+    def _log_result(self, started: float) -> Callable[[asyncio.Future], None]:
+        def log(writer: asyncio.Future):
+            elapsed = round(time.monotonic() - started, 3)
+            details = {"format": self.export_format, "gzip": self.gzip, "rows": self.rows, "bytes": self.bytes, "seconds": elapsed}
+            error = writer.exception() if not writer.cancelled() else None
+            if writer.cancelled() or isinstance(error, ExportCancelledError):
+                outcome = "cancelled"
+                logger.info("Export cancelled by client", extra=details)
+            elif error is None:
+                outcome = "ok"
+                logger.info("Export finished", extra=details)
+            else:
+                outcome = "error"
+                logger.error("Export failed: %s", error, extra=details)
+            if self._on_finish is not None:
+                self._on_finish(self, outcome)
+        return log
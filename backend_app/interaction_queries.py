@@ -0,0 +1,116 @@
+# backend_app/interaction_queries.py
+
+import base64
+from dataclasses import dataclass
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple
+
+# Columns returned by list queries. Chat transcripts live in interaction_chat_logs and are only
+# loaded when a single interaction's log is requested.
+LIST_COLUMNS = (
+    "id", "hcp_name", "interaction_date", "products_discussed", "key_discussion_points",
+    "sentiment", "follow_up_actions", "interaction_method", "created_at", "hcp_id",
+)
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor cannot be decoded."""
+
+
+@dataclass
+class InteractionFilters:
+    hcp_name: Optional[str] = None
+    hcp_id: Optional[int] = None
+    date_from: Optional[date] = None
+    date_to: Optional[date] = None
+    sentiment: Optional[str] = None
+    product: Optional[str] = None
+    interaction_method: Optional[str] = None
+
+
+def encode_cursor(interaction_date: date, interaction_id: int) -> str:
+    """Opaque keyset cursor: the sort key of the last row on the page."""
+    raw = f"{interaction_date.isoformat()}|{interaction_id}".encode("ascii")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[date, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        date_part, id_part = base64.urlsafe_b64decode(padded.encode("ascii")).decode("ascii").split("|")
+        return date.fromisoformat(date_part), int(id_part)
+    except (ValueError, UnicodeError) as e:
+        raise InvalidCursorError(f"Invalid pagination cursor: {cursor!r}") from e
+
+
+def build_filter_clauses(filters: InteractionFilters) -> Tuple[List[str], List[Any]]:
+    """WHERE clauses and parameters for the interaction filters, shared by list-style queries."""
+    clauses: List[str] = []
+    params: List[Any] = []
+    if filters.hcp_name:
+        clauses.append("hcp_name = %s")
+        params.append(filters.hcp_name)
+    if filters.hcp_id is not None:
+        clauses.append("hcp_id = %s")
+        params.append(filters.hcp_id)
+    if filters.date_from:
+        clauses.append("interaction_date >= %s")
+        params.append(filters.date_from)
+    if filters.date_to:
+        clauses.append("interaction_date <= %s")
+        params.append(filters.date_to)
+    if filters.sentiment:
+        clauses.append("sentiment = %s")
+        params.append(filters.sentiment)
+    if filters.interaction_method:
+        clauses.append("interaction_method = %s")
+        params.append(filters.interaction_method)
+    if filters.product:
+        # products_discussed is free text, so this is a residual filter applied while walking
+        # one of the (.., interaction_date, id) indexes rather than an index lookup itself.
+        clauses.append("products_discussed LIKE %s")
+        params.append(f"%{_escape_like(filters.product)}%")
+    return clauses, params
+
+
+def build_list_query(filters: InteractionFilters, cursor: Optional[str], limit: int) -> Tuple[str, List[Any]]:
+    """
+    Keyset (seek) pagination ordered by (interaction_date DESC, id DESC). Each page starts
+    strictly after the previous page's last row, so the cost of page N does not depend on N,
+    unlike OFFSET which has to read and discard every earlier row.
+    """
+    clauses, params = build_filter_clauses(filters)
+    if cursor:
+        after_date, after_id = decode_cursor(cursor)
+        # Expanded form of (interaction_date, id) < (%s, %s); MySQL turns this into an index range
+        clauses.append("(interaction_date < %s OR (interaction_date = %s AND id < %s))")
+        params.extend([after_date, after_date, after_id])
+
+    sql = f"SELECT {', '.join(LIST_COLUMNS)} FROM hcp_interactions"
+    if clauses:
+        sql += " WHERE " + " AND ".join(clauses)
+    sql += " ORDER BY interaction_date DESC, id DESC LIMIT %s"
+    params.append(limit + 1)  # One extra row tells us whether a next page exists
+    return sql, params
+
+
+def list_interactions(conn, filters: InteractionFilters, cursor: Optional[str], limit: int) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Returns one page of interactions and the cursor for the next page. Runs on a pool worker thread."""
+    sql, params = build_list_query(filters, cursor, limit)
+    db_cursor = conn.cursor()
+    try:
+        db_cursor.execute(sql, params)
+        rows = db_cursor.fetchall()
+    finally:
+        db_cursor.close()
+
+    items = [dict(zip(LIST_COLUMNS, row)) for row in rows[:limit]]
+    next_cursor = None
+    if len(rows) > limit:
+        last = items[-1]
+        next_cursor = encode_cursor(last["interaction_date"], last["id"])
+    return items, next_cursor
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
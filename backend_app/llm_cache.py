@@ -0,0 +1,130 @@
+# backend_app/llm_cache.py
+
+import asyncio
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+_WHITESPACE = re.compile(r"\s+")
+_TRAILING_PUNCTUATION = re.compile(r"[\s.!?,;:]+$")
+_DISK_PRUNE_EVERY = 100  # Disk writes between expiry / size-limit sweeps
+
+
+def normalize_prompt(text: str) -> str:
+    """Case, surrounding whitespace, inner whitespace runs and trailing punctuation don't change the key."""
+    return _TRAILING_PUNCTUATION.sub("", _WHITESPACE.sub(" ", text.strip().lower()))
+
+
+def cache_key(model: str, prompt: str, chat_history: Optional[List[Dict[str, str]]], history_window: int) -> str:
+    """Hash of the model, the normalized prompt and the last `history_window` history messages."""
+    window = (chat_history or [])[-history_window:] if history_window > 0 else []
+    material = [model, normalize_prompt(prompt), [[m.get("role", ""), normalize_prompt(m.get("content", ""))] for m in window]]
+    return hashlib.sha256(json.dumps(material, separators=(",", ":")).encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """
+    Two-tier cache of LLM responses: an in-memory LRU with TTL, optionally backed by an on-disk
+    SQLite tier that survives restarts and is shared by workers on the same host.
+    Disk reads and writes run in a worker thread.
+    """
+
+    def __init__(self, max_entries: int = 5000, ttl_seconds: float = 600.0, history_window: int = 4, disk_path: Optional[str] = None, disk_max_entries: int = 100000):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.history_window = history_window
+        self.disk_path = disk_path
+        self.disk_max_entries = disk_max_entries
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (response, expires_at)
+        self._local = threading.local()
+        self._disk_writes = 0
+        self._counters = {"hits_memory": 0, "hits_disk": 0, "misses": 0, "bypassed": 0, "stores": 0, "evictions": 0}
+        if disk_path:
+            conn = self._disk()
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS llm_cache (key TEXT PRIMARY KEY, response TEXT NOT NULL, expires_at REAL NOT NULL)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_expires ON llm_cache (expires_at)")
+            conn.commit()
+
+    def key_for(self, model: str, prompt: str, chat_history: Optional[List[Dict[str, str]]]) -> str:
+        return cache_key(model, prompt, chat_history, self.history_window)
+
+    def record_bypass(self):
+        self._counters["bypassed"] += 1
+
+    async def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        entry = self._memory.get(key)
+        if entry is not None:
+            if entry[1] > now:
+                self._memory.move_to_end(key)
+                self._counters["hits_memory"] += 1
+                return entry[0]
+            del self._memory[key]
+
+        if self.disk_path:
+            row = await asyncio.to_thread(self._disk_get, key, now)
+            if row is not None:
+                self._counters["hits_disk"] += 1
+                self._remember(key, row[0], row[1])
+                return row[0]
+
+        self._counters["misses"] += 1
+        return None
+
+    async def put(self, key: str, response: str):
+        expires_at = time.time() + self.ttl_seconds
+        self._remember(key, response, expires_at)
+        self._counters["stores"] += 1
+        if self.disk_path:
+            await asyncio.to_thread(self._disk_put, key, response, expires_at)
+
+    def _remember(self, key: str, response: str, expires_at: float):
+        self._memory[key] = (response, expires_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self._counters["evictions"] += 1
+
+    # --- Disk tier (worker threads) ---
+    def _disk(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.disk_path, timeout=5.0)
+            self._local.conn = conn
+        return conn
+
+    def _disk_get(self, key: str, now: float) -> Optional[tuple]:
+        return self._disk().execute(
+            "SELECT response, expires_at FROM llm_cache WHERE key = ? AND expires_at > ?", (key, now)
+        ).fetchone()
+
+    def _disk_put(self, key: str, response: str, expires_at: float):
+        conn = self._disk()
+        conn.execute("INSERT OR REPLACE INTO llm_cache (key, response, expires_at) VALUES (?, ?, ?)", (key, response, expires_at))
+        self._disk_writes += 1
+        if self._disk_writes % _DISK_PRUNE_EVERY == 0:
+            # Expired rows first, then the soonest-to-expire rows down to the size limit
+            conn.execute("DELETE FROM llm_cache WHERE expires_at <= ?", (time.time(),))
+            (count,) = conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()
+            if count > self.disk_max_entries:
+                conn.execute(
+                    "DELETE FROM llm_cache WHERE key IN (SELECT key FROM llm_cache ORDER BY expires_at LIMIT ?)",
+                    (count - self.disk_max_entries,),
+                )
+        conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self._counters["hits_memory"] + self._counters["hits_disk"] + self._counters["misses"]
+        hits = self._counters["hits_memory"] + self._counters["hits_disk"]
+        return {
+            **self._counters,
+            "entries_memory": len(self._memory),
+            "hit_ratio": round(hits / lookups, 3) if lookups else 0.0,
+            "disk_tier": bool(self.disk_path),
+        }
@@ -0,0 +1,196 @@
+# backend_app/llm_client.py
+
+import asyncio
+import hashlib
+import json
+import random
+from typing import Any, Dict, List, Optional
+
+import aiohttp
+
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+
+class LLMError(Exception):
+    """Raised when the LLM API call fails after all retries, fails with a non-retryable status, or returns a body that is not a chat completion."""
+
+    def __init__(self, message: str, status: Optional[int] = None):
+        super().__init__(message)
+        self.status = status
+
+
+class LLMClient:
+    """
+    Async client for an OpenAI-compatible chat completions API (Groq, or the local stub server).
+
+    - One long-lived aiohttp session with a keep-alive connection pool, so turns reuse TLS connections.
+    - A semaphore per model caps concurrent requests, so a burst on one model cannot starve another.
+    - Timeouts per attempt, and retry with full-jitter exponential backoff on 429/5xx and network errors
+      (honouring Retry-After when the server sends it).
+    - Identical requests that are already in flight are coalesced onto the same upstream call.
+    """
+
+    def __init__(
+        self,
+        api_url: str,
+        api_key: str,
+        timeout: float = 30.0,
+        max_retries: int = 3,
+        backoff_base: float = 0.25,
+        backoff_max: float = 8.0,
+        default_concurrency: int = 16,
+        model_concurrency: Optional[Dict[str, int]] = None,
+        connection_limit: int = 100,
+        keepalive_timeout: float = 60.0,
+    ):
+        self.api_url = api_url
+        self.api_key = api_key
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.default_concurrency = default_concurrency
+        self.model_concurrency = model_concurrency or {}
+        self.connection_limit = connection_limit
+        self.keepalive_timeout = keepalive_timeout
+
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._session_lock: Optional[asyncio.Lock] = None
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+        self._requests_total = 0
+        self._upstream_calls = 0
+        self._coalesced_total = 0
+        self._retries_total = 0
+        self._errors_total = 0
+        self._active: Dict[str, int] = {}
+
+    # --- Session lifecycle ---
+    async def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is not None and not self._session.closed:
+            return self._session
+        if self._session_lock is None:
+            self._session_lock = asyncio.Lock()
+        async with self._session_lock:
+            if self._session is None or self._session.closed:
+                connector = aiohttp.TCPConnector(limit=self.connection_limit, keepalive_timeout=self.keepalive_timeout)
+                self._session = aiohttp.ClientSession(
+                    connector=connector,
+                    headers={"Authorization": f"Bearer {self.api_key}", "Content-Type": "application/json"},
+                )
+        return self._session
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    def _semaphore(self, model: str) -> asyncio.Semaphore:
+        semaphore = self._semaphores.get(model)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.model_concurrency.get(model, self.default_concurrency))
+            self._semaphores[model] = semaphore
+        return semaphore
+
+    # --- Public API ---
+    async def chat_completion(self, model: str, messages: List[Dict[str, str]], **params) -> str:
+        """Returns the assistant message content for `messages`. Raises LLMError on failure."""
+        self._requests_total += 1
+        payload = {"model": model, "messages": messages, **params}
+        key = hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self._coalesced_total += 1
+            return await asyncio.shield(inflight)
+
+        future = asyncio.ensure_future(self._request_with_retries(model, payload))
+        self._inflight[key] = future
+        future.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # Shield so one cancelled caller does not cancel the call other coalesced callers await.
+        return await asyncio.shield(future)
+
+    async def _request_with_retries(self, model: str, payload: Dict[str, Any]) -> str:
+        session = await self._get_session()
+        attempt = 0
+        async with self._semaphore(model):
+            self._active[model] = self._active.get(model, 0) + 1
+            try:
+                while True:
+                    retry_after = None
+                    try:
+                        self._upstream_calls += 1
+                        async with session.post(
+                            self.api_url, json=payload, timeout=aiohttp.ClientTimeout(total=self.timeout)
+                        ) as response:
+                            if response.status in RETRYABLE_STATUSES:
+                                retry_after = _parse_retry_after(response.headers.get("Retry-After"))
+                                error = LLMError(f"LLM API returned HTTP {response.status}", status=response.status)
+                            elif response.status >= 400:
+                                body = await response.text()
+                                self._errors_total += 1
+                                raise LLMError(f"LLM API returned HTTP {response.status}: {body[:200]}", status=response.status)
+                            else:
+                                try:
+                                    result = await response.json()
+                                except ValueError:
+                                    result = None
+                                content = _message_content(result)
+                                if content is None:
+                                    # A 2xx with the wrong shape will not get better on retry
+                                    self._errors_total += 1
+                                    raise LLMError("LLM API returned an unexpected response shape", status=response.status)
+                                return content
+                    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                        error = LLMError(f"Error calling LLM API: {e!r}")
+
+                    if attempt >= self.max_retries:
+                        self._errors_total += 1
+                        raise error
+                    attempt += 1
+                    self._retries_total += 1
+                    await asyncio.sleep(self._backoff_delay(attempt, retry_after))
+            finally:
+                self._active[model] -= 1
+
+    def _backoff_delay(self, attempt: int, retry_after: Optional[float]) -> float:
+        """Full-jitter exponential backoff; a server-provided Retry-After is used as the floor."""
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.backoff_max))
+        return delay
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "requests_total": self._requests_total,
+            "upstream_calls": self._upstream_calls,
+            "coalesced_total": self._coalesced_total,
+            "retries_total": self._retries_total,
+            "errors_total": self._errors_total,
+            "inflight_unique": len(self._inflight),
+            "active_by_model": dict(self._active),
+            "session_open": self._session is not None and not self._session.closed,
+        }
+
+
+def _message_content(result: Any) -> Optional[str]:
+    """The first choice's message content, or None if the response is not a chat completion."""
+    if not isinstance(result, dict):
+        return None
+    choices = result.get("choices")
+    if not isinstance(choices, list) or not choices or not isinstance(choices[0], dict):
+        return None
+    message = choices[0].get("message")
+    if not isinstance(message, dict) or not isinstance(message.get("content"), str):
+        return None
+    return message["content"]
+
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return None  # HTTP-date form; fall back to computed backoff
@@ -0,0 +1,92 @@
+# backend_app/llm_stub_server.py
+#
+# Local OpenAI-compatible chat completions server for testing the LLM client offline.
+# Simulates model latency, jitter, rate limiting (429) and server errors (5xx).
+#
+# Run: python llm_stub_server.py --port 8081 --latency-ms 150 --jitter-ms 50 --rate-limit-rate 0.02
+# Then point LLM_CONFIG["api_url"] at http://127.0.0.1:8081/openai/v1/chat/completions
+
+import argparse
+import asyncio
+import random
+import time
+import uuid
+
+from aiohttp import web
+
+
+def create_stub_app(latency_ms: float = 100.0, jitter_ms: float = 30.0, error_rate: float = 0.0, rate_limit_rate: float = 0.0, seed=None) -> web.Application:
+    """Builds the stub application. Rates are probabilities per request in [0, 1]."""
+    rng = random.Random(seed)
+    stats = {"requests": 0, "rate_limited": 0, "errors": 0}
+
+    async def chat_completions(request: web.Request) -> web.Response:
+        stats["requests"] += 1
+        try:
+            payload = await request.json()
+        except ValueError:
+            return web.json_response({"error": {"message": "Invalid JSON body"}}, status=400)
+        messages = payload.get("messages") or []
+        if not messages:
+            return web.json_response({"error": {"message": "'messages' must be a non-empty list"}}, status=400)
+
+        roll = rng.random()
+        if roll < rate_limit_rate:
+            stats["rate_limited"] += 1
+            return web.json_response({"error": {"message": "Rate limit reached"}}, status=429, headers={"Retry-After": "0.05"})
+        if roll < rate_limit_rate + error_rate:
+            stats["errors"] += 1
+            return web.json_response({"error": {"message": "Upstream model error"}}, status=503)
+
+        await asyncio.sleep(max(0.0, latency_ms + rng.uniform(-jitter_ms, jitter_ms)) / 1000.0)
+        last_message = str(messages[-1].get("content", ""))
+        content = f"[stub:{payload.get('model', 'unknown')}] You said: {last_message[:200]}"
+        prompt_tokens = sum(len(str(m.get("content", "")).split()) for m in messages)
+        return web.json_response({
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": payload.get("model", "unknown"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": len(content.split()), "total_tokens": prompt_tokens + len(content.split())},
+        })
+
+    async def stub_stats(request: web.Request) -> web.Response:
+        return web.json_response(stats)
+
+    app = web.Application()
+    # Both the plain OpenAI path and the Groq-style prefixed path
+    app.router.add_post("/v1/chat/completions", chat_completions)
+    app.router.add_post("/openai/v1/chat/completions", chat_completions)
+    app.router.add_get("/stats", stub_stats)
+    app["stats"] = stats
+    return app
+
+
+async def start_stub_server(host: str = "127.0.0.1", port: int = 0, **options):
+    """Starts the stub in the running event loop. Returns (runner, base_url); call runner.cleanup() to stop."""
+    runner = web.AppRunner(create_stub_app(**options))
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    bound_port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://{host}:{bound_port}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local OpenAI-compatible stub LLM server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--latency-ms", type=float, default=100.0)
+    parser.add_argument("--jitter-ms", type=float, default=30.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    args = parser.parse_args()
+    web.run_app(
+        create_stub_app(args.latency_ms, args.jitter_ms, args.error_rate, args.rate_limit_rate),
+        host=args.host, port=args.port,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,34 @@
 # backend_app/main.py
 
 import json
+import logging
 import re
-from fastapi import FastAPI, HTTPException, Request
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from pydantic import ValidationError
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field
 from typing import Optional, List, Dict, Any
 from datetime import date, datetime
 import mysql.connector
 import asyncio
-import aiohttp # For actual async HTTP requests if Groq API were live
+import time
+from db import MySQLConnectionPool, DatabaseUnavailableError
+from bulk_ingest import BulkPayloadError, iter_json_array_records, iter_ndjson_records
+from session_store import ChatSession, create_session_store, new_session_id
+from extraction import default_extractor
+from llm_client import LLMClient, LLMError
+from llm_cache import LLMResponseCache
+from migrations import MigrationLockError, apply_migrations
+from interaction_queries import InteractionFilters, InvalidCursorError, list_interactions
+from search import SearchQueryError, build_search_docs, index_documents, search_interactions
+from chat_log_storage import chat_log_row, load_chat_log, load_chat_turns, store_chat_logs
+from analytics import RollupDelta, query_rollups
+from hcp_directory import HCPIndex
+from interaction_export import ExportFormatUnavailableError, InteractionExport
+from chat_routing import ROUTE_LOG, ROUTE_CONFIRM, RouteStats, route_chat_turn
+from write_behind import WriteBehindQueue
+from telemetry import MetricsRegistry, RequestMetricsMiddleware, SamplingProfiler, configure_logging, stats_collector
 
 # --- Configuration ---
 MYSQL_CONFIG = {
@@ -19,65 +38,276 @@ MYSQL_CONFIG = {
     "database": "hcp_db" # Ensure this database exists
 }
 
+# Connection pool sizing. Request handlers never block the event loop on MySQL:
+# queries run on a dedicated executor with one thread per pooled connection.
+DB_POOL_CONFIG = {
+    "pool_size": 10,              # Max concurrent connections (and executor threads)
+    "acquire_timeout": 5.0,       # Seconds to wait for a free connection before returning 503
+    "health_check_interval": 30.0 # Idle connections older than this are pinged before reuse
+}
+
+# Chat session store. "memory" is per-process; "sqlite" is a local stand-in for a store
+# shared by all workers on the host (path is the shared database file).
+SESSION_STORE_CONFIG = {
+    "backend": "memory",
+    "max_sessions": 10000,
+    "ttl_seconds": 3600.0,          # Sessions idle longer than this are dropped
+    "max_bytes": 64 * 1024 * 1024,  # Approximate cap on history held across all sessions
+    "max_history_messages": 200,    # Older turns beyond this are trimmed per session
+    "path": "chat_sessions.db"
+}
+
+# Bulk ingestion: records are validated as they stream in and written in chunked transactions
+BULK_INSERT_CHUNK_SIZE = 500
+
+# Write-behind group commit (off by default). When enabled, form, chat and bulk inserts are
+# queued and a background writer commits whatever accumulated within max_delay_ms (up to
+# max_batch_rows rows) in one transaction. Requests still wait for their group to commit, so ids
+# are real and acknowledged writes are durable; a full queue makes writers wait up to
+# enqueue_timeout seconds and then returns 503.
+WRITE_BEHIND_CONFIG = {
+    "enabled": False,
+    "max_batch_rows": 200,
+    "max_delay_ms": 5.0,
+    "max_pending": 5000,
+    "enqueue_timeout": 2.0
+}
+
+# Streaming export (/api/export). Rows are fetched and encoded batch_rows at a time on an
+# unbuffered cursor; at most max_pending_chunks encoded batches wait for a slow client before the
+# query stops fetching. Each running export holds one pool connection (and executor thread) for
+# its whole duration, also while a slow client is reading, so max_concurrent_exports stays well
+# below DB_POOL_CONFIG["pool_size"]; further exports get 429 instead of starving other endpoints.
+EXPORT_CONFIG = {
+    "max_concurrent_exports": 2,
+    "retry_after_seconds": 30,        # Retry-After sent with the 429
+    "batch_rows": 1000,
+    "max_pending_chunks": 8,
+    "net_write_timeout": 600,         # MySQL session setting; seconds the server waits on a paused read
+    "parquet_row_group_rows": 50000,  # Rows buffered per Parquet row group (needs pyarrow)
+    "parquet_row_group_bytes": 32 * 1024 * 1024,  # ...or fewer, once their values reach this size
+    "parquet_compression": "zstd"
+}
+
 # Conceptual Groq API Configuration
 GROQ_API_KEY = "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" # Replace with your actual Groq API key for live calls
 GROQ_API_URL_GEMMA = "https://api.groq.com/openai/v1/chat/completions" # Example, verify actual endpoint
 
+# LLM client. "mock" keeps the canned responses below; "live" calls api_url through the pooled
+# client (point api_url at llm_stub_server.py to exercise the live path offline).
+LLM_CONFIG = {
+    "backend": "mock",
+    "api_url": GROQ_API_URL_GEMMA,
+    "timeout": 30.0,           # Seconds per attempt
+    "max_retries": 3,          # Retries on 429/5xx/network errors, with jittered backoff
+    "default_concurrency": 16, # Concurrent requests per model unless overridden below
+    "model_concurrency": {"gemma2-9b-it": 32, "llama-3.3-70b-versatile": 8},
+    "connection_limit": 100,   # Keep-alive connection pool size
+    "chat_temperature": 0.0,   # Chat replies are sent with temperature 0 so repeat turns can be cached
+}
+
+# LLM response cache. Keys hash the model, the normalized prompt and the last
+# `history_window` history messages. Set "disk_path" to add a persistent SQLite tier.
+LLM_CACHE_CONFIG = {
+    "enabled": True,
+    "max_entries": 5000,
+    "ttl_seconds": 600.0,
+    "history_window": 4,
+    "disk_path": None # e.g. "llm_cache.db"
+}
+
+# Observability. Logs are JSON lines gated by log_level; chat payloads are only logged at DEBUG.
+# /metrics is always served. /api/debug/profiler (start/stop the sampling profiler, read stacks
+# and file names) has no authentication, so it is off by default; enable "profiler_endpoints"
+# only where the API is reachable by operators alone, e.g. staging or a local load test.
+OBSERVABILITY_CONFIG = {
+    "log_level": "INFO",
+    "log_json": True,
+    "profiler_endpoints": False,
+    "profiler_interval_ms": 5.0 # Default sampling interval
+}
+
+configure_logging(OBSERVABILITY_CONFIG["log_level"], OBSERVABILITY_CONFIG["log_json"])
+logger = logging.getLogger("crm.main")
+
+# --- Metrics ---
+metrics = MetricsRegistry()
+STAGE_SECONDS = metrics.histogram(
+    "crm_stage_duration_seconds",
+    "Hot-path stage latency: extract, route, llm, db_acquire, db_insert, db_commit (and *_batch for bulk chunks)",
+    ("stage",)
+)
+CHAT_TURN_SECONDS = metrics.histogram("crm_chat_turn_duration_seconds", "End-to-end chat turn latency by route", ("route",))
+LLM_CALLS = metrics.counter("crm_llm_calls_total", "LLM calls by model and outcome (cache_hit, mock, live, error)", ("model", "outcome"))
+EXPORTS = metrics.counter("crm_exports_total", "Streaming exports by format and outcome (ok, cancelled, error, rejected)", ("format", "outcome"))
+EXPORT_ROWS = metrics.counter("crm_export_rows_total", "Rows written by streaming exports", ("format",))
+HTTP_REQUEST_SECONDS = metrics.histogram("crm_http_request_duration_seconds", "HTTP request latency by method, route and status", ("method", "route", "status"))
+profiler = SamplingProfiler()
+
 # --- Database Setup and Utility ---
-def get_db_connection():
-    """Establishes a connection to the MySQL database."""
+db_pool = MySQLConnectionPool(
+    MYSQL_CONFIG, **DB_POOL_CONFIG,
+    on_acquire=lambda seconds: STAGE_SECONDS.observe(seconds, stage="db_acquire")
+)
+session_store = create_session_store(**SESSION_STORE_CONFIG)
+
+hcp_index = HCPIndex()
+
+def initialize_database():
+    """Brings the schema up to date by applying pending migrations (see migrations.py) and loads the HCP directory index."""
     try:
-        conn = mysql.connector.connect(**MYSQL_CONFIG)
-        return conn
+        with db_pool.connection() as conn:
+            applied = apply_migrations(conn)
+            hcp_index.load(conn)
+        logger.info("Database initialized successfully. Applied migrations: %s.", applied or "none pending")
+        logger.info("HCP directory index loaded", extra={"hcps": len(hcp_index)})
+    except DatabaseUnavailableError as err:
+        logger.error("Failed to connect to database for initialization: %s", err)
     except mysql.connector.Error as err:
-        print(f"Error connecting to MySQL: {err}")
-        # In a real app, you might want to raise this or handle it more gracefully
-        return None
+        logger.error("Error initializing database: %s", err)
+    except MigrationLockError as err:
+        logger.error("Database migrations not applied: %s", err)
 
-def initialize_database():
-    """Creates the hcp_interactions table if it doesn't exist."""
-    conn = get_db_connection()
-    if not conn:
-        print("Failed to connect to database for initialization.")
-        return
+# Interaction values tuples are (hcp_name, interaction_date, products_discussed,
+# key_discussion_points, sentiment, follow_up_actions, interaction_method, raw_chat_log, hcp_id).
+# The first seven go into hcp_interactions along with the hcp_id resolved by hcp_index.link();
+# the chat log is stored compressed in interaction_chat_logs by _write_derived_rows. hcp_id is
+# the directory id the client picked, or None to resolve by name.
+INTERACTION_INSERT_SQL = """
+    INSERT INTO hcp_interactions 
+    (hcp_name, interaction_date, products_discussed, key_discussion_points, sentiment, follow_up_actions, interaction_method, hcp_id) 
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+"""
+
+def _write_derived_rows(cursor, ids: List[int], values_list: List[tuple]):
+    """
+    Writes chat logs, search documents and analytics rollup increments for freshly inserted
+    interactions, from their values tuples, inside the same transaction as the inserts.
+    """
+    docs = []
+    chat_logs = []
+    rollups = RollupDelta()
+    for interaction_id, values in zip(ids, values_list):
+        chat_logs.append(chat_log_row(interaction_id, values[7]))
+        docs.extend(build_search_docs(interaction_id, values[3], values[5], values[7]))
+        rollups.add(interaction_id, values[0], values[1], values[2], values[4])
+    store_chat_logs(cursor, chat_logs)
+    index_documents(cursor, docs)
+    rollups.apply(cursor)
+
+def insert_interaction(conn, values: tuple) -> int:
+    """Inserts one interaction row plus its HCP link, search documents and rollups, and commits. Runs on a pool worker thread."""
     cursor = conn.cursor()
     try:
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS hcp_interactions (
-                id INT AUTO_INCREMENT PRIMARY KEY,
-                hcp_name VARCHAR(255) NOT NULL,
-                interaction_date DATE NOT NULL,
-                products_discussed TEXT,
-                key_discussion_points TEXT,
-                sentiment ENUM('Positive', 'Neutral', 'Negative'),
-                follow_up_actions TEXT,
-                interaction_method ENUM('form', 'chat') NOT NULL,
-                raw_chat_log TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        conn.commit()
-        print("Database initialized successfully. `hcp_interactions` table checked/created.")
-    except mysql.connector.Error as err:
-        print(f"Error initializing database: {err}")
+        with STAGE_SECONDS.time(stage="db_insert"):
+            (hcp_id,), hcp_rows = hcp_index.link(cursor, [(values[0], values[8])])
+            cursor.execute(INTERACTION_INSERT_SQL, values[:7] + (hcp_id,))
+            interaction_id = cursor.lastrowid
+            _write_derived_rows(cursor, [interaction_id], [values])
+        with STAGE_SECONDS.time(stage="db_commit"):
+            conn.commit()
+        hcp_index.record(hcp_rows)
+        return interaction_id
+    finally:
+        cursor.close()
+
+def fetch_interaction(conn, interaction_id: int, include_chat_log: bool = False) -> Optional[Dict[str, Any]]:
+    """
+    Fetches one interaction row as a dict. The chat log is only read and decompressed when
+    `include_chat_log` is set. Runs on a pool worker thread.
+    """
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT * FROM hcp_interactions WHERE id = %s", (interaction_id,))
+        row = cursor.fetchone()
+        if not row:
+            return None
+        columns = [col[0] for col in cursor.description]
+        record = dict(zip(columns, row))
+        if include_chat_log:
+            record["raw_chat_log"] = load_chat_log(cursor, interaction_id)
+        return record
+    finally:
+        cursor.close()
+
+def insert_interactions_batch(conn, values_list: List[tuple]) -> List[int]:
+    """
+    Inserts a chunk of interactions in one transaction and returns their ids in input order.
+    executemany() rewrites the INSERT into a single multi-row statement; InnoDB allocates
+    consecutive auto-increment values for such "simple inserts", so ids follow lastrowid.
+    """
+    cursor = conn.cursor()
+    try:
+        with STAGE_SECONDS.time(stage="db_insert_batch"):
+            hcp_ids, hcp_rows = hcp_index.link(cursor, [(values[0], values[8]) for values in values_list])
+            cursor.executemany(INTERACTION_INSERT_SQL, [values[:7] + (hcp_id,) for values, hcp_id in zip(values_list, hcp_ids)])
+            first_id = cursor.lastrowid
+            ids = list(range(first_id, first_id + len(values_list)))
+            _write_derived_rows(cursor, ids, values_list)
+        with STAGE_SECONDS.time(stage="db_commit_batch"):
+            conn.commit()
+        hcp_index.record(hcp_rows)
+        return ids
     finally:
         cursor.close()
-        conn.close()
+
+write_queue = WriteBehindQueue(
+    db_pool, insert_interactions_batch,
+    max_batch_rows=WRITE_BEHIND_CONFIG["max_batch_rows"],
+    max_delay=WRITE_BEHIND_CONFIG["max_delay_ms"] / 1000,
+    max_pending=WRITE_BEHIND_CONFIG["max_pending"],
+    enqueue_timeout=WRITE_BEHIND_CONFIG["enqueue_timeout"]
+)
+
+async def write_interaction(values: tuple) -> int:
+    """Inserts one interaction through the group-commit queue when write-behind is enabled, else in its own transaction."""
+    if WRITE_BEHIND_CONFIG["enabled"]:
+        return await write_queue.submit(values)
+    return await db_pool.run(insert_interaction, values)
+
+async def write_interactions(values_list: List[tuple]) -> List[int]:
+    """Inserts a chunk of interactions that commit together; same routing as write_interaction."""
+    if WRITE_BEHIND_CONFIG["enabled"]:
+        return await write_queue.submit_many(values_list)
+    return await db_pool.run(insert_interactions_batch, values_list)
+
+def insert_and_fetch_interaction(conn, values: tuple) -> Optional[Dict[str, Any]]:
+    """Insert followed by the read-back, on the same checked-out connection."""
+    interaction_id = insert_interaction(conn, values)
+    return fetch_interaction(conn, interaction_id)
 
 # --- Pydantic Models for Request/Response ---
 class HCPInteractionBase(BaseModel):
-    hcp_name: str = Field(..., min_length=1, example="Dr. Jane Doe")
+    hcp_name: str = Field(..., min_length=1, max_length=255, example="Dr. Jane Doe") # hcp_interactions.hcp_name is VARCHAR(255)
     interaction_date: date = Field(..., example=date.today())
     products_discussed: Optional[str] = Field(None, example="ProductX, ProductY")
     key_discussion_points: Optional[str] = Field(None, example="Discussed new trial results for ProductX.")
     sentiment: Optional[str] = Field(None, example="Positive") # Positive, Neutral, Negative
     follow_up_actions: Optional[str] = Field(None, example="Send follow-up email with trial data.")
+    hcp_id: Optional[int] = Field(None, example=42) # Directory id from /api/hcps/suggest; resolved from hcp_name when absent
 
 class HCPInteractionFormInput(HCPInteractionBase):
     pass
 
+def form_interaction_values(interaction: HCPInteractionFormInput) -> tuple:
+    """Row values for a form-submitted interaction, in INTERACTION_INSERT_SQL column order."""
+    return (
+        interaction.hcp_name,
+        interaction.interaction_date,
+        interaction.products_discussed,
+        interaction.key_discussion_points,
+        interaction.sentiment if interaction.sentiment in ['Positive', 'Neutral', 'Negative'] else None,
+        interaction.follow_up_actions,
+        "form",
+        None,
+        interaction.hcp_id
+    )
+
 class HCPInteractionChatInput(BaseModel):
     message: str
+    session_id: Optional[str] = None # Server-side session holding history and extraction state
+    # Only used to seed a new session, e.g. when the previous one expired or lives on another
+    # worker. Clients keep sending their (small) extraction state so a miss loses no fields.
     history: List[Dict[str, str]] = [] # List of {"role": "user/assistant", "content": "message"}
     current_extraction_data: Optional[Dict[str, Any]] = {} # To maintain state of extracted data during chat
 
@@ -87,25 +317,124 @@ class HCPInteractionOutput(HCPInteractionBase):
     raw_chat_log: Optional[str] = None
     created_at: datetime
 
+class BulkRecordResult(BaseModel):
+    index: int # Position of the record in the submitted array / NDJSON stream
+    id: Optional[int] = None
+    error: Optional[str] = None
+
+class BulkIngestResponse(BaseModel):
+    received: int
+    inserted: int
+    failed: int
+    results: List[BulkRecordResult]
+    error: Optional[str] = None # Set (with status 400) when the body itself was malformed; results still list the committed ids
+
+class InteractionPage(BaseModel):
+    items: List[HCPInteractionOutput]
+    next_cursor: Optional[str] = None # Pass as `cursor` to fetch the next page; None on the last page
+
+class SearchHit(BaseModel):
+    field: str # key_discussion_points, follow_up_actions or chat_turn
+    turn_index: Optional[int] = None # Position in the chat log, for chat_turn hits
+    role: Optional[str] = None
+    snippet: str # HTML-escaped, matches wrapped in <mark>
+    score: float
+
+class SearchResult(BaseModel):
+    interaction_id: int
+    score: float
+    hits: List[SearchHit]
+    interaction: Dict[str, Any] # id, hcp_name, interaction_date, products_discussed, sentiment, interaction_method
+
+class HCPSuggestion(BaseModel):
+    id: int
+    name: str
+    interaction_count: int
+    match: str # prefix or fuzzy
+    score: float # 1.0 for prefix matches, trigram similarity for fuzzy ones
+
 class ChatResponse(BaseModel):
     ai_message: str
     is_complete: bool = False
     extracted_data: Optional[Dict[str, Any]] = None # Data extracted so far
     interaction_id: Optional[int] = None # If logged
+    session_id: Optional[str] = None # Send back with the next message instead of the history
+    session_restarted: bool = False # The sent session_id was unknown; a new session was started under this session_id
 
 # --- AI Service Mocks / Conceptual LangGraph & LLM Calls ---
+llm_client = LLMClient(
+    api_url=LLM_CONFIG["api_url"],
+    api_key=GROQ_API_KEY,
+    timeout=LLM_CONFIG["timeout"],
+    max_retries=LLM_CONFIG["max_retries"],
+    default_concurrency=LLM_CONFIG["default_concurrency"],
+    model_concurrency=LLM_CONFIG["model_concurrency"],
+    connection_limit=LLM_CONFIG["connection_limit"],
+)
+llm_cache = LLMResponseCache(
+    max_entries=LLM_CACHE_CONFIG["max_entries"],
+    ttl_seconds=LLM_CACHE_CONFIG["ttl_seconds"],
+    history_window=LLM_CACHE_CONFIG["history_window"],
+    disk_path=LLM_CACHE_CONFIG["disk_path"],
+)
+chat_route_stats = RouteStats()
 
-async def call_groq_llm(prompt: str, model: str = "gemma2-9b-it", chat_history: List[Dict[str, str]] = None) -> str:
+# Values the components already track are read at scrape time rather than counted per request
+metrics.register_collector(stats_collector("crm_db_pool", db_pool.stats, "MySQL connection pool"))
+metrics.register_collector(stats_collector("crm_llm_client", llm_client.stats, "LLM client"))
+metrics.register_collector(stats_collector("crm_llm_cache", llm_cache.stats, "LLM response cache"))
+metrics.register_collector(stats_collector("crm_chat_sessions", session_store.stats, "Chat session store"))
+metrics.register_collector(stats_collector("crm_write_queue", write_queue.stats, "Write-behind group commit queue"))
+metrics.register_collector(stats_collector("crm_hcp_index", hcp_index.stats, "HCP directory index"))
+
+async def call_groq_llm(prompt: str, model: str = "gemma2-9b-it", chat_history: List[Dict[str, str]] = None, temperature: Optional[float] = None, use_cache: bool = True) -> str:
     """
-    MOCK function to simulate a call to Groq's LLM API.
-    In a real scenario, this would make an authenticated async HTTP request.
+    Calls Groq's LLM API through the shared pooled client when LLM_CONFIG["backend"] is "live";
+    otherwise returns a MOCK response that simulates basic NLU.
+    Only requests that explicitly ask for temperature 0 are served from the response cache: with no
+    temperature the API samples at its default of 1.0, so a cached reply would not be what it returns.
     """
-    print(f"\n--- Mocking Groq LLM Call ({model}) ---")
-    print(f"Prompt: {prompt}")
-    if chat_history:
-        print(f"History: {json.dumps(chat_history, indent=2)}")
-    print("---------------------------------------\n")
+    cache_key = None
+    if LLM_CACHE_CONFIG["enabled"]:
+        if use_cache and temperature == 0:
+            cache_key = llm_cache.key_for(model, prompt, chat_history)
+            cached_response = await llm_cache.get(cache_key)
+            if cached_response is not None:
+                LLM_CALLS.inc(model=model, outcome="cache_hit")
+                logger.debug("LLM cache hit", extra={"model": model})
+                return cached_response
+        else:
+            llm_cache.record_bypass() # Sampled or explicitly uncached requests must reach the model
+
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("LLM call", extra={
+            "model": model, "backend": LLM_CONFIG["backend"], "prompt": prompt,
+            "history_messages": len(chat_history) if chat_history else 0
+        })
+
+    if LLM_CONFIG["backend"] != "live":
+        LLM_CALLS.inc(model=model, outcome="mock")
+        response_text = _mock_groq_response(prompt)
+    else:
+        messages_payload = []
+        if chat_history:
+            messages_payload.extend(chat_history)
+        messages_payload.append({"role": "user", "content": prompt})
+        params = {"temperature": temperature} if temperature is not None else {}
+        try:
+            response_text = await llm_client.chat_completion(model, messages_payload, **params)
+        except LLMError as e:
+            LLM_CALLS.inc(model=model, outcome="error")
+            logger.warning("Error calling Groq API: %s", e, extra={"model": model, "status": e.status})
+            return f"Error communicating with AI service: {e}" # Errors are never cached
+
+    if cache_key is not None:
+        await llm_cache.put(cache_key, response_text)
+    return response_text
 
+
+def _mock_groq_response(prompt: str) -> str:
+    """MOCK response used when no live LLM backend is configured."""
     # Simulate some basic NLU and response generation
     # This is highly simplified. A real LLM would provide much richer responses.
     lower_prompt = prompt.lower()
@@ -132,95 +461,29 @@ async def call_groq_llm(prompt: str, model: str = "gemma2-9b-it", chat_history:
     
     return "I'm sorry, I didn't quite understand. Could you please rephrase or provide more details?"
 
-    # --- Example of actual aiohttp call (conceptual, not run in this mock) ---
-    # headers = {
-    #     "Authorization": f"Bearer {GROQ_API_KEY}",
-    #     "Content-Type": "application/json"
-    # }
-    # messages_payload = []
-    # if chat_history:
-    #     messages_payload.extend(chat_history)
-    # messages_payload.append({"role": "user", "content": prompt})
-    
-    # payload = {
-    #     "model": model,
-    #     "messages": messages_payload
-    # }
-    # async with aiohttp.ClientSession() as session:
-    #     try:
-    #         async with session.post(GROQ_API_URL_GEMMA, headers=headers, json=payload) as response:
-    #             response.raise_for_status() # Raise an exception for HTTP errors
-    #             result = await response.json()
-    #             return result.get("choices", [{}])[0].get("message", {}).get("content", "Error parsing LLM response.")
-    #     except aiohttp.ClientError as e:
-    #         print(f"Error calling Groq API: {e}")
-    #         return f"Error communicating with AI service: {e}"
-    #     except Exception as e:
-    #         print(f"An unexpected error occurred during Groq API call: {e}")
-    #         return "An unexpected error occurred while processing your request with the AI."
-
 
 def extract_interaction_details_from_text(text: str, existing_data: Dict = None) -> Dict[str, Any]:
     """
     Rudimentary extraction of interaction details from text.
     A real LLM/NLU system (like one built with LangGraph) would be far more sophisticated.
+    Delegates to the precompiled single-pass engine in extraction.py.
     """
-    if existing_data is None:
-        existing_data = {}
-    
-    extracted = existing_data.copy()
-
-    # HCP Name
-    if not extracted.get("hcp_name"):
-        match_hcp = re.search(r"(?:dr\.|doctor|hcp)\s*([A-Za-z\s]+?)(?:\s*(?:on|about|regarding|and|\.|$))", text, re.IGNORECASE)
-        if match_hcp:
-            extracted["hcp_name"] = match_hcp.group(1).strip().title()
-
-    # Date
-    if not extracted.get("interaction_date"):
-        match_date = re.search(r"(\d{4}-\d{2}-\d{2})|today", text, re.IGNORECASE)
-        if match_date:
-            if match_date.group(1):
-                extracted["interaction_date"] = match_date.group(1)
-            elif match_date.group(0).lower() == "today":
-                extracted["interaction_date"] = date.today().isoformat()
-    
-    # Products Discussed (very basic)
-    if not extracted.get("products_discussed"):
-        match_products = re.search(r"(?:products? discussed|talked about|mentioned)\s*(.*?)(?:\.|and key|and the main)", text, re.IGNORECASE)
-        if match_products:
-            extracted["products_discussed"] = match_products.group(1).strip()
-        elif "producta" in text.lower() or "productb" in text.lower(): # simple keyword
-             prods = []
-             if "producta" in text.lower(): prods.append("ProductA")
-             if "productb" in text.lower(): prods.append("ProductB")
-             extracted["products_discussed"] = ", ".join(prods)
-
-
-    # Key Discussion Points (very basic)
-    if not extracted.get("key_discussion_points"):
-        match_points = re.search(r"(?:key points?|discussion points|main point was)\s*(.*?)(?:\.|and sentiment|and follow-up)", text, re.IGNORECASE)
-        if match_points:
-            extracted["key_discussion_points"] = match_points.group(1).strip()
-        elif "efficacy data" in text.lower(): # simple keyword
-            extracted["key_discussion_points"] = "Efficacy data"
-
-
-    # Sentiment
-    if not extracted.get("sentiment"):
-        if "positive" in text.lower(): extracted["sentiment"] = "Positive"
-        elif "neutral" in text.lower(): extracted["sentiment"] = "Neutral"
-        elif "negative" in text.lower(): extracted["sentiment"] = "Negative"
-
-    # Follow-up Actions
-    if not extracted.get("follow_up_actions"):
-        match_follow_up = re.search(r"(?:follow-up actions?|next steps?|action items?)\s*(.*?)(?:\.|$)", text, re.IGNORECASE)
-        if match_follow_up:
-            extracted["follow_up_actions"] = match_follow_up.group(1).strip()
-        elif "send publication" in text.lower(): # simple keyword
-            extracted["follow_up_actions"] = "Send publication"
-            
-    return extracted
+    return default_extractor.extract(text, existing_data)
+
+
+def resolve_extracted_hcp(extracted_data: Dict[str, Any]):
+    """
+    Links a newly extracted HCP name to its directory entry by setting hcp_id. hcp_name keeps
+    the spelling that was typed, as for form posts; the confirmation shows the matched entry so
+    a wrong fuzzy match can be caught. Unknown names become new directory entries when the
+    interaction is logged.
+    """
+    hcp_name = extracted_data.get("hcp_name")
+    if not hcp_name or extracted_data.get("hcp_id"):
+        return
+    entry = hcp_index.resolve(hcp_name)
+    if entry is not None:
+        extracted_data["hcp_id"] = entry.id
 
 
 async def process_chat_with_langgraph_concept(user_message: str, chat_history: List[Dict[str, str]], current_extraction_data: Dict) -> ChatResponse:
@@ -228,98 +491,97 @@ async def process_chat_with_langgraph_concept(user_message: str, chat_history: L
     Conceptual function simulating a LangGraph agent for chat interactions.
     LangGraph would define a graph of nodes (LLM calls, tool calls, conditional logic).
     """
-    print(f"--- Conceptual LangGraph Processing ---")
-    print(f"User Message: {user_message}")
-    print(f"Chat History: {json.dumps(chat_history, indent=2)}")
-    print(f"Current Extracted Data: {json.dumps(current_extraction_data, indent=2)}")
-    print(f"------------------------------------")
-
-    # 1. Combine current message with history for context (simplified)
-    full_context_prompt = user_message
-    # A real system would format this properly for the LLM.
-
-    # 2. Call LLM (Groq gemma2-9b-it mocked) for NLU and response generation
-    # LangGraph node: "understand_user_intent_and_extract"
-    ai_raw_response = await call_groq_llm(full_context_prompt, model="gemma2-9b-it", chat_history=chat_history)
+    turn_started = time.perf_counter()
+    timings_ms: Dict[str, float] = {}
 
-    # 3. Update extracted data based on LLM understanding (or direct extraction)
+    # 1. Update extracted data by direct extraction first; it is cheap and decides the route
     # LangGraph node: "update_extracted_knowledge"
     # For this mock, we'll use our rudimentary extractor on the latest user message
     # and merge with existing data. An LLM could do this more intelligently.
+    stage_started = time.perf_counter()
     newly_extracted = extract_interaction_details_from_text(user_message, current_extraction_data)
-    
     updated_extracted_data = {**current_extraction_data, **newly_extracted} # simple merge, LLM could be smarter
+    resolve_extracted_hcp(updated_extracted_data)
+    timings_ms["extract"] = (time.perf_counter() - stage_started) * 1000
 
-    # 4. Determine if interaction is complete and ready for logging
+    # 2. Route: decide whether the turn needs a model call at all, and which model
     # LangGraph node: "check_completeness_or_decide_next_step"
+    stage_started = time.perf_counter()
+    decision = route_chat_turn(user_message, current_extraction_data, updated_extracted_data)
+    timings_ms["route"] = (time.perf_counter() - stage_started) * 1000
+
     is_complete_for_logging = False
     interaction_id_on_log = None
 
-    required_fields = ["hcp_name", "interaction_date"] # Minimal for logging attempt
-    all_fields_present = all(updated_extracted_data.get(field) for field in required_fields)
-
-    if ("log it" in user_message.lower() or "yes" in user_message.lower() or "correct" in user_message.lower()) and all_fields_present:
-        is_complete_for_logging = True
-        ai_response_message = f"Okay, attempting to log the interaction with {updated_extracted_data.get('hcp_name', 'the HCP')}. One moment..."
-        
-        # Attempt to save to DB
-        conn = get_db_connection()
-        if not conn:
-            return ChatResponse(ai_message="Error: Could not connect to the database to log interaction.", extracted_data=updated_extracted_data)
-        
-        cursor = conn.cursor()
-        try:
-            # Construct full chat log for storage
-            full_chat_log_entries = chat_history + [{"role": "user", "content": user_message}, {"role": "assistant", "content": ai_response_message}]
-            raw_chat_log_str = json.dumps(full_chat_log_entries)
-
-            sql = """
-                INSERT INTO hcp_interactions 
-                (hcp_name, interaction_date, products_discussed, key_discussion_points, sentiment, follow_up_actions, interaction_method, raw_chat_log) 
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-            """
-            values = (
-                updated_extracted_data.get("hcp_name"),
-                updated_extracted_data.get("interaction_date"),
-                updated_extracted_data.get("products_discussed"),
-                updated_extracted_data.get("key_discussion_points"),
-                updated_extracted_data.get("sentiment") if updated_extracted_data.get("sentiment") in ['Positive', 'Neutral', 'Negative'] else None,
-                updated_extracted_data.get("follow_up_actions"),
-                "chat",
-                raw_chat_log_str
-            )
-            cursor.execute(sql, values)
-            conn.commit()
-            interaction_id_on_log = cursor.lastrowid
-            ai_response_message = f"Successfully logged interaction (ID: {interaction_id_on_log}) with {updated_extracted_data.get('hcp_name', 'the HCP')}."
-            # Reset extracted data after successful logging for a new interaction potentially
-            updated_extracted_data = {} 
-        except mysql.connector.Error as err:
-            conn.rollback()
-            print(f"DB Error logging chat interaction: {err}")
-            ai_response_message = f"Error logging interaction to database: {err}"
-            is_complete_for_logging = False # Keep it false so user might retry or clarify
-        finally:
-            cursor.close()
-            conn.close()
-    elif all_fields_present and not ("log it" in user_message.lower() or "yes" in user_message.lower()):
-        # If we have key fields, confirm with user
-        confirmation_details = []
-        for key, val in updated_extracted_data.items():
-            if val: confirmation_details.append(f"{key.replace('_', ' ').title()}: {val}")
-        
-        ai_response_message = f"Okay, I have the following details: {'; '.join(confirmation_details)}. Is this correct and shall I log it?"
-    else:
-        # Use the LLM's general response if not explicitly logging
-        ai_response_message = ai_raw_response
+    try:
+        if decision.route == ROUTE_LOG:
+            is_complete_for_logging = True
+            ai_response_message = f"Okay, attempting to log the interaction with {updated_extracted_data.get('hcp_name', 'the HCP')}. One moment..."
 
+            # Attempt to save to DB
+            stage_started = time.perf_counter()
+            try:
+                # Construct full chat log for storage
+                full_chat_log_entries = chat_history + [{"role": "user", "content": user_message}, {"role": "assistant", "content": ai_response_message}]
+                raw_chat_log_str = json.dumps(full_chat_log_entries)
 
-    # 5. (Conceptual) LangGraph could use tools here, e.g., a calendar tool, or call another LLM (llama-3.3-70b-versatile) for complex summarization if needed.
-    # For example: if 'gemma2-9b-it' response is vague, LangGraph could trigger a call to 'llama-3.3-70b-versatile' for deeper context analysis.
-    # This is commented out as it's a conceptual step:
-    # if "needs_deeper_analysis" in ai_raw_response_flags: # Fictional flag
-    #     deeper_analysis_prompt = f"Original query: {user_message}. Context: {json.dumps(updated_extracted_data)}. Please provide a detailed understanding or summary."
-    #     ai_response_message = await call_groq_llm(deeper_analysis_prompt, model="llama-3.3-70b-versatile") # Conceptual call
+                values = (
+                    updated_extracted_data.get("hcp_name"),
+                    updated_extracted_data.get("interaction_date"),
+                    updated_extracted_data.get("products_discussed"),
+                    updated_extracted_data.get("key_discussion_points"),
+                    updated_extracted_data.get("sentiment") if updated_extracted_data.get("sentiment") in ['Positive', 'Neutral', 'Negative'] else None,
+                    updated_extracted_data.get("follow_up_actions"),
+                    "chat",
+                    raw_chat_log_str,
+                    updated_extracted_data.get("hcp_id")
+                )
+                interaction_id_on_log = await write_interaction(values)
+                ai_response_message = f"Successfully logged interaction (ID: {interaction_id_on_log}) with {updated_extracted_data.get('hcp_name', 'the HCP')}."
+                # Reset extracted data after successful logging for a new interaction potentially
+                updated_extracted_data = {} 
+            except DatabaseUnavailableError as err:
+                logger.warning("DB unavailable while logging chat interaction: %s", err)
+                return ChatResponse(ai_message="Error: Could not connect to the database to log interaction.", extracted_data=updated_extracted_data)
+            except mysql.connector.Error as err:
+                logger.error("DB Error logging chat interaction: %s", err)
+                ai_response_message = f"Error logging interaction to database: {err}"
+                is_complete_for_logging = False # Keep it false so user might retry or clarify
+            finally:
+                timings_ms["db"] = (time.perf_counter() - stage_started) * 1000
+        elif decision.route == ROUTE_CONFIRM:
+            # If we have key fields, confirm with user
+            confirmation_details = []
+            for key, val in updated_extracted_data.items():
+                if val and key != "hcp_id": confirmation_details.append(f"{key.replace('_', ' ').title()}: {val}")
+            directory_entry = hcp_index.get(updated_extracted_data.get("hcp_id"))
+            if directory_entry is not None and directory_entry.name != updated_extracted_data.get("hcp_name"):
+                confirmation_details.append(f"Directory Match: {directory_entry.name}")
+
+            ai_response_message = f"Okay, I have the following details: {'; '.join(confirmation_details)}. Is this correct and shall I log it?"
+        else:
+            # 3. Call LLM (Groq gemma2-9b-it, or llama-3.3-70b-versatile for messages the extractor
+            # could not parse) for NLU and response generation
+            # LangGraph node: "understand_user_intent_and_extract"
+            # A real system would format the prompt with history properly for the LLM.
+            stage_started = time.perf_counter()
+            ai_response_message = await call_groq_llm(
+                user_message, model=decision.model, chat_history=chat_history, temperature=LLM_CONFIG["chat_temperature"]
+            )
+            timings_ms["llm"] = (time.perf_counter() - stage_started) * 1000
+    finally:
+        timings_ms["total"] = (time.perf_counter() - turn_started) * 1000
+        chat_route_stats.record(decision.route, timings_ms)
+        for stage in ("extract", "route", "llm"):
+            if stage in timings_ms:
+                STAGE_SECONDS.observe(timings_ms[stage] / 1000, stage=stage)
+        CHAT_TURN_SECONDS.observe(timings_ms["total"] / 1000, route=decision.route)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Chat turn", extra={
+                "route": decision.route, "reason": decision.reason, "user_message": user_message,
+                "history_messages": len(chat_history), "extracted": updated_extracted_data,
+                "timings_ms": {stage: round(ms, 3) for stage, ms in timings_ms.items()}
+            })
 
     return ChatResponse(
         ai_message=ai_response_message,
@@ -331,6 +593,9 @@ async def process_chat_with_langgraph_concept(user_message: str, chat_history: L
 # --- FastAPI App Instance ---
 app = FastAPI(title="AI-First CRM HCP Interaction Logger")
 
+# --- Request Metrics Middleware ---
+app.add_middleware(RequestMetricsMiddleware, histogram=HTTP_REQUEST_SECONDS)
+
 # --- CORS Middleware ---
 app.add_middleware(
     CORSMiddleware,
@@ -344,76 +609,467 @@ app.add_middleware(
 @app.on_event("startup")
 async def startup_event():
     """Initializes the database when the application starts."""
-    print("Application startup: Initializing database...")
-    initialize_database()
-    print("Database initialization complete.")
+    logger.info("Application startup: Initializing database...")
+    await asyncio.get_running_loop().run_in_executor(None, initialize_database)
+    logger.info("Database initialization complete.")
+    if WRITE_BEHIND_CONFIG["enabled"]:
+        write_queue.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Flushes queued writes, then drains and closes the MySQL connection pool and the LLM client session."""
+    await write_queue.close()
+    profiler.stop()
+    await llm_client.close()
+    await asyncio.get_running_loop().run_in_executor(None, db_pool.close)
 
 @app.post("/api/log_interaction_form", response_model=HCPInteractionOutput)
 async def log_interaction_form_endpoint(interaction: HCPInteractionFormInput, request: Request):
     """Logs an interaction submitted via the structured form."""
-    conn = get_db_connection()
-    if not conn:
-        raise HTTPException(status_code=503, detail="Database connection unavailable.")
-    cursor = conn.cursor()
     try:
         # Optional: Process with AI for summarization/tagging if desired
         # For example, pass interaction.key_discussion_points to an AI summarizer
         # ai_summary = await process_text_with_ai(interaction.key_discussion_points, "summarize")
 
-        sql = """
-            INSERT INTO hcp_interactions 
-            (hcp_name, interaction_date, products_discussed, key_discussion_points, sentiment, follow_up_actions, interaction_method) 
-            VALUES (%s, %s, %s, %s, %s, %s, %s)
-        """
-        values = (
-            interaction.hcp_name,
-            interaction.interaction_date,
-            interaction.products_discussed,
-            interaction.key_discussion_points,
-            interaction.sentiment if interaction.sentiment in ['Positive', 'Neutral', 'Negative'] else None,
-            interaction.follow_up_actions,
-            "form"
-        )
-        cursor.execute(sql, values)
-        conn.commit()
-        interaction_id = cursor.lastrowid
-        
-        # Fetch the created record to return it (optional, but good practice)
-        cursor.execute("SELECT * FROM hcp_interactions WHERE id = %s", (interaction_id,))
-        new_interaction_record = cursor.fetchone()
-        if not new_interaction_record:
+        values = form_interaction_values(interaction)
+        if WRITE_BEHIND_CONFIG["enabled"]:
+            interaction_id = await write_queue.submit(values)
+            created_interaction_dict = await db_pool.run(fetch_interaction, interaction_id)
+        else:
+            # Insert and fetch the created record back on one pooled connection, off the event loop
+            created_interaction_dict = await db_pool.run(insert_and_fetch_interaction, values)
+        if not created_interaction_dict:
              raise HTTPException(status_code=500, detail="Failed to retrieve interaction after saving.")
 
-        # Map tuple to dict
-        columns = [col[0] for col in cursor.description]
-        created_interaction_dict = dict(zip(columns, new_interaction_record))
-        
         return HCPInteractionOutput(**created_interaction_dict)
 
+    except HTTPException:
+        raise
+    except DatabaseUnavailableError as err:
+        logger.warning("Database unavailable on form log: %s", err)
+        raise HTTPException(status_code=503, detail="Database connection unavailable.")
     except mysql.connector.Error as err:
-        conn.rollback()
-        print(f"Database error on form log: {err}")
+        logger.error("Database error on form log: %s", err)
         raise HTTPException(status_code=500, detail=f"Database error: {err}")
     except Exception as e:
-        print(f"Unexpected error on form log: {e}")
+        logger.exception("Unexpected error on form log: %s", e)
         raise HTTPException(status_code=500, detail=f"An unexpected error occurred: {str(e)}")
-    finally:
-        cursor.close()
-        conn.close()
+
+def _format_validation_error(err: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(str(loc) for loc in e['loc'])}: {e['msg']}" for e in err.errors())
+
+@app.post("/api/log_interactions_bulk", response_model=BulkIngestResponse)
+async def log_interactions_bulk_endpoint(request: Request):
+    """
+    Logs many form-style interactions in one request. Accepts either a JSON array or an
+    NDJSON stream (Content-Type: application/x-ndjson) of HCPInteractionFormInput records.
+    Records are validated as they stream in and inserted in chunked transactions; invalid
+    records are reported per index without failing the rest of the batch.
+    """
+    content_type = request.headers.get("content-type", "")
+    if "ndjson" in content_type or "jsonl" in content_type:
+        records = iter_ndjson_records(request.stream())
+    else:
+        records = iter_json_array_records(request.stream())
+
+    results: List[BulkRecordResult] = []
+    received = 0
+    inserted = 0
+    chunk_indexes: List[int] = []
+    chunk_values: List[tuple] = []
+    pending_insert = None # At most one chunk is written while the next one is parsed
+
+    async def flush(insert_task, indexes, values_list):
+        nonlocal inserted
+        try:
+            ids = await insert_task
+        except DatabaseUnavailableError as err:
+            logger.warning("Database unavailable during bulk insert: %s", err)
+            raise HTTPException(status_code=503, detail="Database connection unavailable.")
+        except mysql.connector.Error as err:
+            # One bad row rolls back the whole chunk; retry each record on its own so the others
+            # still commit and only the offending records report the error.
+            logger.warning("Bulk insert chunk of %d rows failed, retrying per record: %s", len(values_list), err)
+            for index, values in zip(indexes, values_list):
+                try:
+                    new_id = await write_interaction(values)
+                except DatabaseUnavailableError as row_err:
+                    logger.warning("Database unavailable during bulk insert: %s", row_err)
+                    raise HTTPException(status_code=503, detail="Database connection unavailable.")
+                except mysql.connector.Error as row_err:
+                    logger.error("Database error on bulk insert record %d: %s", index, row_err)
+                    results.append(BulkRecordResult(index=index, error=f"Database error: {row_err}"))
+                    continue
+                inserted += 1
+                results.append(BulkRecordResult(index=index, id=new_id))
+            return
+        inserted += len(ids)
+        results.extend(BulkRecordResult(index=i, id=new_id) for i, new_id in zip(indexes, ids))
+
+    try:
+        async for index, payload, parse_error in records:
+            received += 1
+            if parse_error:
+                results.append(BulkRecordResult(index=index, error=parse_error))
+                continue
+            try:
+                if not isinstance(payload, dict):
+                    raise TypeError("Record must be a JSON object.")
+                interaction = HCPInteractionFormInput(**payload)
+            except ValidationError as err:
+                results.append(BulkRecordResult(index=index, error=_format_validation_error(err)))
+                continue
+            except TypeError as err:
+                results.append(BulkRecordResult(index=index, error=str(err)))
+                continue
+
+            chunk_indexes.append(index)
+            chunk_values.append(form_interaction_values(interaction))
+            if len(chunk_values) >= BULK_INSERT_CHUNK_SIZE:
+                if pending_insert:
+                    await flush(*pending_insert)
+                pending_insert = (asyncio.ensure_future(write_interactions(chunk_values)), chunk_indexes, chunk_values)
+                chunk_indexes, chunk_values = [], []
+    except BulkPayloadError as err:
+        if pending_insert:
+            await flush(*pending_insert)
+        # Records parsed since the last chunk are not written; everything committed so far is
+        # listed with its id, so the client can resubmit the rest without creating duplicates.
+        results.extend(BulkRecordResult(index=i, error="Not inserted: the request body was rejected before this record was written.") for i in chunk_indexes)
+        results.sort(key=lambda r: r.index)
+        body = BulkIngestResponse(received=received, inserted=inserted, failed=received - inserted, results=results, error=str(err))
+        return JSONResponse(status_code=400, content=body.model_dump())
+
+    if pending_insert:
+        await flush(*pending_insert)
+    if chunk_values:
+        await flush(asyncio.ensure_future(write_interactions(chunk_values)), chunk_indexes, chunk_values)
+
+    results.sort(key=lambda r: r.index)
+    return BulkIngestResponse(received=received, inserted=inserted, failed=received - inserted, results=results)
+
+@app.get("/api/interactions", response_model=InteractionPage)
+async def list_interactions_endpoint(
+    hcp_name: Optional[str] = None,
+    hcp_id: Optional[int] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    sentiment: Optional[str] = Query(None, pattern="^(Positive|Neutral|Negative)$"),
+    product: Optional[str] = None,
+    method: Optional[str] = Query(None, pattern="^(form|chat)$"),
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None
+):
+    """
+    Lists interactions newest first, filtered by HCP (exact spelling or directory id), date
+    range, sentiment, product and method. Uses keyset pagination: pass the returned
+    `next_cursor` to get the following page.
+    """
+    filters = InteractionFilters(
+        hcp_name=hcp_name, hcp_id=hcp_id, date_from=date_from, date_to=date_to,
+        sentiment=sentiment, product=product, interaction_method=method
+    )
+    try:
+        items, next_cursor = await db_pool.run(list_interactions, filters, cursor, limit)
+    except InvalidCursorError as err:
+        raise HTTPException(status_code=400, detail=str(err))
+    except DatabaseUnavailableError as err:
+        logger.warning("Database unavailable on interaction list: %s", err)
+        raise HTTPException(status_code=503, detail="Database connection unavailable.")
+    except mysql.connector.Error as err:
+        logger.error("Database error on interaction list: %s", err)
+        raise HTTPException(status_code=500, detail=f"Database error: {err}")
+    return InteractionPage(items=[HCPInteractionOutput(**item) for item in items], next_cursor=next_cursor)
+
+# Running exports. Taken before an export's worker starts and released when the worker is done
+# (finished, failed or cancelled), since that is when its pool connection is returned.
+export_slots = asyncio.Semaphore(EXPORT_CONFIG["max_concurrent_exports"])
+
+def record_export(export: InteractionExport, outcome: str):
+    export_slots.release()
+    EXPORTS.inc(format=export.export_format, outcome=outcome)
+    EXPORT_ROWS.inc(export.rows, format=export.export_format)
+
+@app.get("/api/export")
+async def export_interactions_endpoint(
+    format: str = Query("ndjson", pattern="^(ndjson|csv|parquet)$"),
+    gzip: bool = False,
+    include_chat_log: bool = False,
+    hcp_name: Optional[str] = None,
+    hcp_id: Optional[int] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    sentiment: Optional[str] = Query(None, pattern="^(Positive|Neutral|Negative)$"),
+    product: Optional[str] = None,
+    method: Optional[str] = Query(None, pattern="^(form|chat)$")
+):
+    """
+    Streams every interaction matching the filters (same as /api/interactions) in id order as
+    NDJSON, CSV or Parquet, optionally gzip-compressed (not for Parquet, which compresses its
+    column chunks itself). `include_chat_log=true` adds each decompressed chat transcript.
+    Memory use does not grow with the size of the export. At most
+    EXPORT_CONFIG["max_concurrent_exports"] run at once; further requests get 429.
+    """
+    if gzip and format == "parquet":
+        raise HTTPException(status_code=400, detail="Parquet output is already compressed; gzip applies to ndjson and csv.")
+    filters = InteractionFilters(
+        hcp_name=hcp_name, hcp_id=hcp_id, date_from=date_from, date_to=date_to,
+        sentiment=sentiment, product=product, interaction_method=method
+    )
+    try:
+        export = InteractionExport(
+            format, filters, include_chat_log, gzip,
+            batch_rows=EXPORT_CONFIG["batch_rows"],
+            max_pending_chunks=EXPORT_CONFIG["max_pending_chunks"],
+            net_write_timeout=EXPORT_CONFIG["net_write_timeout"],
+            parquet_row_group_rows=EXPORT_CONFIG["parquet_row_group_rows"],
+            parquet_row_group_bytes=EXPORT_CONFIG["parquet_row_group_bytes"],
+            parquet_compression=EXPORT_CONFIG["parquet_compression"],
+            on_finish=record_export
+        )
+    except ExportFormatUnavailableError as err:
+        raise HTTPException(status_code=501, detail=str(err))
+
+    if export_slots.locked():
+        EXPORTS.inc(format=format, outcome="rejected")
+        raise HTTPException(
+            status_code=429, detail="Too many exports running; try again later.",
+            headers={"Retry-After": str(EXPORT_CONFIG["retry_after_seconds"])}
+        )
+    await export_slots.acquire()  # A slot is free, so this does not wait; record_export releases it
+
+    # Wait for the first chunk before committing to a 200, so an unavailable database still
+    # gets a proper error status. Later failures can only cut the stream short.
+    chunks = export.stream(db_pool)
+    try:
+        first_chunk = await chunks.__anext__()
+    except StopAsyncIteration:
+        first_chunk = b""
+    except DatabaseUnavailableError as err:
+        logger.warning("Database unavailable on export: %s", err)
+        raise HTTPException(status_code=503, detail="Database connection unavailable.")
+    except mysql.connector.Error as err:
+        logger.error("Database error on export: %s", err)
+        raise HTTPException(status_code=500, detail=f"Database error: {err}")
+
+    async def body():
+        try:
+            if first_chunk:
+                yield first_chunk
+            async for chunk in chunks:
+                yield chunk
+        finally:
+            await chunks.aclose()
+
+    return StreamingResponse(
+        body(), media_type=export.media_type,
+        headers={"Content-Disposition": f'attachment; filename="{export.filename}"'}
+    )
+
+@app.get("/api/search", response_model=List[SearchResult])
+async def search_endpoint(
+    q: str = Query(..., min_length=2),
+    mode: str = Query("natural", pattern="^(natural|boolean)$"),
+    hcp_name: Optional[str] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    limit: int = Query(20, ge=1, le=100)
+):
+    """
+    Ranked full-text search over key discussion points, follow-up actions and individual chat
+    turns. `mode=boolean` enables MySQL boolean syntax (e.g. +trial -placebo, "adverse event").
+    """
+    filters = InteractionFilters(hcp_name=hcp_name, date_from=date_from, date_to=date_to)
+    try:
+        return await db_pool.run(search_interactions, q, mode, filters, limit)
+    except SearchQueryError as err:
+        raise HTTPException(status_code=400, detail=str(err))
+    except DatabaseUnavailableError as err:
+        logger.warning("Database unavailable on search: %s", err)
+        raise HTTPException(status_code=503, detail="Database connection unavailable.")
+    except mysql.connector.Error as err:
+        logger.error("Database error on search: %s", err)
+        raise HTTPException(status_code=500, detail=f"Database error: {err}")
+
+@app.get("/api/analytics")
+async def analytics_endpoint(
+    dimension: str = Query("hcp", pattern="^(hcp|product|week)$"),
+    hcp_name: Optional[str] = None,
+    product: Optional[str] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    limit: int = Query(50, ge=1, le=500)
+):
+    """
+    Sentiment counts (Positive/Neutral/Negative/Unknown) per HCP, per product or per week,
+    served from incrementally maintained rollup tables. `hcp_name` narrows the HCP view,
+    `product` the product view and `date_from`/`date_to` the weekly view.
+    """
+    try:
+        rows = await db_pool.run(query_rollups, dimension, hcp_name, product, date_from, date_to, limit)
+    except DatabaseUnavailableError as err:
+        logger.warning("Database unavailable on analytics: %s", err)
+        raise HTTPException(status_code=503, detail="Database connection unavailable.")
+    except mysql.connector.Error as err:
+        logger.error("Database error on analytics: %s", err)
+        raise HTTPException(status_code=500, detail=f"Database error: {err}")
+    return {"dimension": dimension, "rows": rows}
+
+@app.get("/api/hcps/suggest", response_model=List[HCPSuggestion])
+async def suggest_hcps_endpoint(
+    q: str = Query(..., min_length=1, max_length=255),
+    limit: int = Query(10, ge=1, le=20)
+):
+    """
+    HCP name autocomplete from the in-memory directory index: names with a word starting with
+    `q` (most interactions first), topped up with fuzzy trigram matches for typos.
+    """
+    return hcp_index.suggest(q, limit)
+
+@app.get("/api/hcps/stats")
+async def hcp_index_stats_endpoint():
+    """Directory index size (HCPs, prefix tokens, trigrams) and suggest/resolve counters."""
+    return hcp_index.stats()
+
+@app.get("/api/interactions/{interaction_id}", response_model=HCPInteractionOutput)
+async def get_interaction_endpoint(interaction_id: int, include_chat_log: bool = False):
+    """Returns a single interaction; pass include_chat_log=true to also get its raw chat log."""
+    try:
+        record = await db_pool.run(fetch_interaction, interaction_id, include_chat_log)
+    except DatabaseUnavailableError as err:
+        logger.warning("Database unavailable on interaction fetch: %s", err)
+        raise HTTPException(status_code=503, detail="Database connection unavailable.")
+    except mysql.connector.Error as err:
+        logger.error("Database error on interaction fetch: %s", err)
+        raise HTTPException(status_code=500, detail=f"Database error: {err}")
+    if not record:
+        raise HTTPException(status_code=404, detail="Interaction not found.")
+    return HCPInteractionOutput(**record)
+
+@app.get("/api/interactions/{interaction_id}/chat_log")
+async def get_interaction_chat_log_endpoint(interaction_id: int):
+    """Returns the stored chat transcript of an interaction as a list of {role, content} turns."""
+    try:
+        turns = await db_pool.run(load_chat_turns, interaction_id)
+    except DatabaseUnavailableError as err:
+        logger.warning("Database unavailable on chat log fetch: %s", err)
+        raise HTTPException(status_code=503, detail="Database connection unavailable.")
+    except mysql.connector.Error as err:
+        logger.error("Database error on chat log fetch: %s", err)
+        raise HTTPException(status_code=500, detail=f"Database error: {err}")
+    if turns is None:
+        raise HTTPException(status_code=404, detail="No chat log stored for this interaction.")
+    return {"interaction_id": interaction_id, "turns": turns}
 
 @app.post("/api/log_interaction_chat", response_model=ChatResponse)
 async def log_interaction_chat_endpoint(chat_input: HCPInteractionChatInput, request: Request):
-    """Handles a message from the chat interface and uses conceptual AI to process it."""
-    
+    """
+    Handles a message from the chat interface and uses conceptual AI to process it.
+    History and extraction state live in the session store, so clients send the new message,
+    the session_id returned by the previous turn and their current extraction state. If the
+    session is gone (expired, evicted, restarted or held by another worker), a new one is seeded
+    from that state under a fresh id and the response sets `session_restarted`.
+    """
+    session = await session_store.load(chat_input.session_id) if chat_input.session_id else None
+    restarted = False
+    if session is None:
+        restarted = chat_input.session_id is not None
+        if restarted:
+            logger.info("Chat session not found, starting a new one", extra={"session_id": chat_input.session_id})
+        # Never reuse a stale client id: the old session may still be live on another worker
+        session = ChatSession(
+            session_id=new_session_id(),
+            history=list(chat_input.history),
+            extraction_data=dict(chat_input.current_extraction_data or {})
+        )
+        session.recompute_size()
+
     # This is where the conceptual LangGraph flow is invoked.
     # It will try to understand the message, extract data, and decide on the next step.
     response = await process_chat_with_langgraph_concept(
         user_message=chat_input.message,
-        chat_history=chat_input.history,
-        current_extraction_data=chat_input.current_extraction_data or {}
+        chat_history=session.history,
+        current_extraction_data=session.extraction_data
     )
+
+    session.append("user", chat_input.message)
+    session.append("assistant", response.ai_message)
+    session.extraction_data = response.extracted_data or {}
+    await session_store.save(session)
+
+    response.session_id = session.session_id
+    response.session_restarted = restarted
     return response
 
+@app.delete("/api/chat/sessions/{session_id}")
+async def delete_chat_session_endpoint(session_id: str):
+    """Discards a chat session, e.g. when the user clears the chat."""
+    await session_store.delete(session_id)
+    return {"deleted": session_id}
+
+@app.get("/api/chat/sessions/stats")
+async def chat_session_stats_endpoint():
+    """Session store occupancy and eviction counters."""
+    return session_store.stats()
+
+@app.get("/api/chat/route_stats")
+async def chat_route_stats_endpoint():
+    """Per-route chat turn counts with avg/max latency per stage (extract, route, llm, db, total)."""
+    return chat_route_stats.snapshot()
+
+@app.get("/api/llm/stats")
+async def llm_stats_endpoint():
+    """LLM client counters (upstream calls, coalescing, retries, per-model concurrency) and cache hit/miss counters."""
+    return {"backend": LLM_CONFIG["backend"], "client": llm_client.stats(), "cache": llm_cache.stats()}
+
+@app.get("/api/db/pool_stats")
+async def db_pool_stats_endpoint():
+    """Connection pool saturation: in-use/idle connections, waiters, timeouts and health check failures."""
+    return db_pool.stats()
+
+@app.get("/api/db/write_queue_stats")
+async def write_queue_stats_endpoint():
+    """Write-behind queue depth and group commit sizes (all zero unless WRITE_BEHIND_CONFIG is enabled)."""
+    return {"enabled": WRITE_BEHIND_CONFIG["enabled"], **write_queue.stats()}
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics_endpoint():
+    """Prometheus scrape endpoint: stage/turn/request latency histograms, LLM call counters and component gauges."""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+def _require_profiler_endpoints():
+    if not OBSERVABILITY_CONFIG["profiler_endpoints"]:
+        raise HTTPException(status_code=404, detail="Profiler endpoints are disabled.")
+
+@app.post("/api/debug/profiler")
+async def profiler_control_endpoint(
+    action: str = Query(..., pattern="^(start|stop)$"),
+    interval_ms: float = Query(OBSERVABILITY_CONFIG["profiler_interval_ms"], ge=1.0, le=1000.0)
+):
+    """Starts (discarding the previous profile) or stops the in-process sampling profiler."""
+    _require_profiler_endpoints()
+    if action == "start":
+        profiler.start(interval_ms / 1000)
+        logger.info("Sampling profiler started", extra={"interval_ms": interval_ms})
+    else:
+        profiler.stop()
+        logger.info("Sampling profiler stopped")
+    return profiler.snapshot(top=0)
+
+@app.get("/api/debug/profiler")
+async def profiler_report_endpoint(
+    format: str = Query("json", pattern="^(json|collapsed)$"),
+    top: int = Query(25, ge=1, le=500)
+):
+    """
+    Profile collected so far: the hottest stacks as JSON, or `format=collapsed` for
+    flamegraph.pl / speedscope input.
+    """
+    _require_profiler_endpoints()
+    if format == "collapsed":
+        return PlainTextResponse(profiler.collapsed())
+    return profiler.snapshot(top=top)
+
 @app.get("/")
 async def root():
     return {"message": "AI CRM Backend is running. Use /docs for API documentation."}
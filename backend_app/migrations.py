@@ -0,0 +1,202 @@
+# backend_app/migrations.py
+
+import logging
+from typing import Callable, List, Optional, Tuple, Union
+
+import mysql.connector
+
+from analytics import ANALYTICS_DDL, rebuild_rollups
+from chat_log_storage import CHAT_LOGS_DDL, convert_raw_chat_logs
+from hcp_directory import HCP_DIRECTORY_DDL, backfill_hcp_directory
+from search import SEARCH_DOCS_DDL, backfill_search_docs
+
+logger = logging.getLogger("crm.migrations")
+
+# Named MySQL lock held while migrations run, so workers starting together apply each one once
+MIGRATION_LOCK = "crm_schema_migrations"
+MIGRATION_LOCK_TIMEOUT_SECONDS = 600
+
+
+class MigrationLockError(Exception):
+    """Raised when another process held the migration lock for longer than the timeout."""
+
+
+def create_index(table: str, name: str, columns: str) -> Callable:
+    """
+    Migration step that creates an index unless it already exists. MySQL has no
+    CREATE INDEX IF NOT EXISTS, and every DDL statement commits on its own, so a migration cut
+    short after its first index would otherwise fail with "Duplicate key name" on every rerun.
+    """
+    def step(conn):
+        cursor = conn.cursor()
+        try:
+            cursor.execute(
+                "SELECT 1 FROM information_schema.statistics "
+                "WHERE table_schema = DATABASE() AND table_name = %s AND index_name = %s LIMIT 1",
+                (table, name),
+            )
+            if cursor.fetchone() is None:
+                cursor.execute(f"CREATE INDEX {name} ON {table} ({columns})")
+        finally:
+            cursor.close()
+    step.__name__ = f"create_index_{name}"
+    return step
+
+
+def _column_exists(cursor, table: str, column: str) -> bool:
+    cursor.execute(
+        "SELECT 1 FROM information_schema.columns "
+        "WHERE table_schema = DATABASE() AND table_name = %s AND column_name = %s LIMIT 1",
+        (table, column),
+    )
+    return cursor.fetchone() is not None
+
+
+def add_column(table: str, column: str, definition: str) -> Callable:
+    """Migration step that adds a column unless it already exists (see create_index)."""
+    def step(conn):
+        cursor = conn.cursor()
+        try:
+            if not _column_exists(cursor, table, column):
+                cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+        finally:
+            cursor.close()
+    step.__name__ = f"add_column_{table}_{column}"
+    return step
+
+
+def drop_column(table: str, column: str) -> Callable:
+    """Migration step that drops a column if it is still there (see create_index)."""
+    def step(conn):
+        cursor = conn.cursor()
+        try:
+            if _column_exists(cursor, table, column):
+                cursor.execute(f"ALTER TABLE {table} DROP COLUMN {column}")
+        finally:
+            cursor.close()
+    step.__name__ = f"drop_column_{table}_{column}"
+    return step
+
+
+def while_column_exists(table: str, column: str, fn: Callable) -> Callable:
+    """Migration step that runs `fn(conn)` only while the column exists, for backfills reading a column a later step drops."""
+    def step(conn):
+        cursor = conn.cursor()
+        try:
+            exists = _column_exists(cursor, table, column)
+        finally:
+            cursor.close()
+        if exists:
+            fn(conn)
+    step.__name__ = f"{fn.__name__}_while_{table}_{column}_exists"
+    return step
+
+
+# Ordered, append-only list of (version, description, steps). A step is either a SQL string or a
+# callable taking the connection, for data backfills that need Python. schema_migrations records
+# finished migrations only: DDL commits as it runs, so a migration interrupted partway is rerun
+# from its first step and every step must tolerate that (IF NOT EXISTS, create_index(), or a
+# backfill that skips rows already done). Never change what a shipped migration does; add a new
+# one instead.
+MigrationStep = Union[str, Callable]
+MIGRATIONS: List[Tuple[int, str, List[MigrationStep]]] = [
+    (1, "create hcp_interactions", [
+        """
+        CREATE TABLE IF NOT EXISTS hcp_interactions (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            hcp_name VARCHAR(255) NOT NULL,
+            interaction_date DATE NOT NULL,
+            products_discussed TEXT,
+            key_discussion_points TEXT,
+            sentiment ENUM('Positive', 'Neutral', 'Negative'),
+            follow_up_actions TEXT,
+            interaction_method ENUM('form', 'chat') NOT NULL,
+            raw_chat_log TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+    ]),
+    (2, "composite indexes for filtered, keyset-paginated interaction listing", [
+        # Every list query orders by (interaction_date DESC, id DESC); each index ends with those
+        # columns so a filter on its leading column is a single range scan in page order.
+        create_index("hcp_interactions", "idx_interactions_date", "interaction_date, id"),
+        create_index("hcp_interactions", "idx_interactions_hcp_date", "hcp_name, interaction_date, id"),
+        create_index("hcp_interactions", "idx_interactions_sentiment_date", "sentiment, interaction_date, id"),
+        create_index("hcp_interactions", "idx_interactions_method_date", "interaction_method, interaction_date, id"),
+    ]),
+    (3, "full-text search documents (form text fields and per-turn chat log)", [
+        SEARCH_DOCS_DDL,
+        backfill_search_docs,
+    ]),
+    (4, "normalized product rows and sentiment rollups per HCP, product and week", [
+        *ANALYTICS_DDL,
+        rebuild_rollups,
+    ]),
+    (5, "move raw_chat_log into compressed interaction_chat_logs", [
+        CHAT_LOGS_DDL,
+        # Both steps key off the column, so a run cut short after the drop finishes as a no-op
+        while_column_exists("hcp_interactions", "raw_chat_log", convert_raw_chat_logs),
+        drop_column("hcp_interactions", "raw_chat_log"),
+    ]),
+    (6, "hcps directory and hcp_interactions.hcp_id", [
+        HCP_DIRECTORY_DDL,
+        add_column("hcp_interactions", "hcp_id", "INT NULL"),
+        create_index("hcp_interactions", "idx_interactions_hcp_id_date", "hcp_id, interaction_date, id"),
+        backfill_hcp_directory,  # Commits per batch and skips linked rows, so a cut-short run resumes
+    ]),
+]
+
+
+def apply_migrations(conn, target_version: Optional[int] = None, lock_timeout: int = MIGRATION_LOCK_TIMEOUT_SECONDS) -> List[int]:
+    """
+    Applies pending migrations in order, up to and including `target_version` when given, and
+    returns the versions that were applied. Runs under the MIGRATION_LOCK named lock: a worker
+    that starts while another is migrating waits for it, then reads schema_migrations and finds
+    nothing left to do. Raises MigrationLockError if the wait exceeds `lock_timeout` seconds.
+    """
+    cursor = conn.cursor()
+    applied_now = []
+    locked = False
+    try:
+        cursor.execute("SELECT GET_LOCK(%s, %s)", (MIGRATION_LOCK, lock_timeout))
+        if cursor.fetchall()[0][0] != 1:
+            raise MigrationLockError(f"Timed out after {lock_timeout}s waiting for the {MIGRATION_LOCK} lock")
+        locked = True
+        # Read only once the lock is held, so migrations another worker just finished are seen
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                version INT PRIMARY KEY,
+                description VARCHAR(255) NOT NULL,
+                applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        cursor.execute("SELECT version FROM schema_migrations")
+        applied = {row[0] for row in cursor.fetchall()}
+
+        for version, description, steps in MIGRATIONS:
+            if version in applied:
+                continue
+            if target_version is not None and version > target_version:
+                break
+            logger.info("Applying migration %s: %s", version, description)
+            for step in steps:
+                if callable(step):
+                    step(conn)
+                else:
+                    cursor.execute(step)
+            cursor.execute(
+                "INSERT INTO schema_migrations (version, description) VALUES (%s, %s)",
+                (version, description),
+            )
+            conn.commit()
+            applied_now.append(version)
+    finally:
+        if locked:
+            try:
+                cursor.execute("SELECT RELEASE_LOCK(%s)", (MIGRATION_LOCK,))
+                cursor.fetchall()
+            except mysql.connector.Error as err:
+                # The lock belongs to the session, so MySQL frees it when the connection goes away
+                logger.warning("Could not release the migration lock: %s", err)
+        cursor.close()
+    return applied_now
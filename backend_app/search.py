@@ -0,0 +1,198 @@
+# backend_app/search.py
+
+import html
+import json
+import re
+from typing import Any, Dict, List, Optional, Sequence
+
+import mysql.connector
+from mysql.connector import errorcode
+
+from interaction_queries import InteractionFilters, build_filter_clauses
+
+# Every searchable piece of text is one row in interaction_search_docs: the two free-text form
+# fields, plus one row per chat turn so matches point at the turn that said it rather than at
+# an opaque JSON blob. The SQLite stand-in cannot run MATCH ... AGAINST, so the queries here are
+# only exercised against MySQL, by benchmarks/bench_search.py.
+FIELD_DISCUSSION_POINTS = "key_discussion_points"
+FIELD_FOLLOW_UP = "follow_up_actions"
+FIELD_CHAT_TURN = "chat_turn"
+
+SEARCH_DOCS_DDL = """
+    CREATE TABLE IF NOT EXISTS interaction_search_docs (
+        id BIGINT AUTO_INCREMENT PRIMARY KEY,
+        interaction_id INT NOT NULL,
+        field ENUM('key_discussion_points', 'follow_up_actions', 'chat_turn') NOT NULL,
+        turn_index INT NULL,
+        role VARCHAR(16) NULL,
+        content TEXT NOT NULL,
+        FULLTEXT KEY ft_search_docs_content (content),
+        KEY idx_search_docs_interaction (interaction_id)
+    )
+"""
+
+SEARCH_DOC_INSERT_SQL = """
+    INSERT INTO interaction_search_docs (interaction_id, field, turn_index, role, content)
+    VALUES (%s, %s, %s, %s, %s)
+"""
+
+SNIPPET_RADIUS = 80
+_BOOLEAN_OPERATORS = re.compile(r'[+\-<>()~*"@]')
+_TERM = re.compile(r"\w{2,}", re.UNICODE)
+
+
+class SearchQueryError(Exception):
+    """Raised when a boolean-mode query is not valid MySQL full-text syntax."""
+
+
+def build_search_docs(interaction_id: int, key_discussion_points: Optional[str], follow_up_actions: Optional[str], raw_chat_log: Optional[str]) -> List[tuple]:
+    """Search document rows for one interaction, in SEARCH_DOC_INSERT_SQL column order."""
+    docs = []
+    if key_discussion_points:
+        docs.append((interaction_id, FIELD_DISCUSSION_POINTS, None, None, key_discussion_points))
+    if follow_up_actions:
+        docs.append((interaction_id, FIELD_FOLLOW_UP, None, None, follow_up_actions))
+    if raw_chat_log:
+        try:
+            turns = json.loads(raw_chat_log)
+        except json.JSONDecodeError:
+            turns = []
+        for turn_index, turn in enumerate(turns if isinstance(turns, list) else []):
+            content = turn.get("content") if isinstance(turn, dict) else None
+            if content:
+                docs.append((interaction_id, FIELD_CHAT_TURN, turn_index, turn.get("role"), content))
+    return docs
+
+
+def index_documents(cursor, docs: Sequence[tuple]):
+    """Writes search documents inside the caller's transaction, so an interaction and its index rows commit together."""
+    if docs:
+        cursor.executemany(SEARCH_DOC_INSERT_SQL, list(docs))
+
+
+def backfill_search_docs(conn, batch_size: int = 1000):
+    """
+    Indexes every existing interaction, committing per batch. Starts from an empty table so a
+    run interrupted part-way can simply be repeated. Used by the migration that adds the table.
+    """
+    cursor = conn.cursor()
+    try:
+        cursor.execute("DELETE FROM interaction_search_docs")
+        last_id = 0
+        while True:
+            cursor.execute(
+                "SELECT id, key_discussion_points, follow_up_actions, raw_chat_log FROM hcp_interactions WHERE id > %s ORDER BY id LIMIT %s",
+                (last_id, batch_size),
+            )
+            rows = cursor.fetchall()
+            if not rows:
+                break
+            docs = []
+            for row in rows:
+                docs.extend(build_search_docs(*row))
+            index_documents(cursor, docs)
+            conn.commit()
+            last_id = rows[-1][0]
+    finally:
+        cursor.close()
+
+
+def _match_expression(mode: str) -> str:
+    modifier = "IN BOOLEAN MODE" if mode == "boolean" else "IN NATURAL LANGUAGE MODE"
+    return f"MATCH(content) AGAINST (%s {modifier})"
+
+
+def search_terms(query: str) -> List[str]:
+    """Words to highlight: the query minus boolean-mode operators."""
+    return [term.lower() for term in _TERM.findall(_BOOLEAN_OPERATORS.sub(" ", query))]
+
+
+def highlight(content: str, terms: Sequence[str], radius: int = SNIPPET_RADIUS) -> str:
+    """HTML-escaped snippet around the first match with every term occurrence wrapped in <mark>."""
+    if not terms:
+        return html.escape(content[: 2 * radius])
+    pattern = re.compile(r"\b(" + "|".join(re.escape(t) for t in sorted(set(terms), key=len, reverse=True)) + r")\w*", re.IGNORECASE)
+    first = pattern.search(content)
+    start = max(0, first.start() - radius) if first else 0
+    end = min(len(content), (first.end() if first else 0) + radius)
+    window = content[start:end]
+    marked = []
+    last = 0
+    for match in pattern.finditer(window):
+        marked.append(html.escape(window[last:match.start()]))
+        marked.append(f"<mark>{html.escape(match.group(0))}</mark>")
+        last = match.end()
+    marked.append(html.escape(window[last:]))
+    return ("…" if start > 0 else "") + "".join(marked) + ("…" if end < len(content) else "")
+
+
+def search_interactions(conn, query: str, mode: str, filters: InteractionFilters, limit: int, hits_per_interaction: int = 3) -> List[Dict[str, Any]]:
+    """
+    Ranked full-text search. Matching documents are scored by MySQL's FULLTEXT relevance;
+    an interaction's score is the sum of its best `hits_per_interaction` document scores.
+    Runs on a pool worker thread.
+    """
+    match_sql = _match_expression(mode)
+    clauses, filter_params = build_filter_clauses(filters)
+    sql = f"""
+        SELECT d.interaction_id, d.field, d.turn_index, d.role, d.content, {match_sql} AS score
+        FROM interaction_search_docs d
+    """
+    params: List[Any] = [query]
+    if clauses:
+        sql += " JOIN hcp_interactions i ON i.id = d.interaction_id"
+    sql += f" WHERE {match_sql}"
+    params.append(query)
+    if clauses:
+        sql += " AND " + " AND ".join(clauses)
+        params.extend(filter_params)
+    sql += " ORDER BY score DESC LIMIT %s"
+    params.append(limit * hits_per_interaction * 4)  # Enough documents to fill `limit` interactions
+
+    cursor = conn.cursor()
+    try:
+        try:
+            cursor.execute(sql, params)
+        except mysql.connector.Error as err:
+            # The query is a bound parameter, so a parse error in boolean mode comes from its operators
+            if mode == "boolean" and err.errno == errorcode.ER_PARSE_ERROR:
+                raise SearchQueryError(f"Invalid boolean search syntax: {err.msg}") from err
+            raise
+        doc_rows = cursor.fetchall()
+
+        terms = search_terms(query)
+        grouped: Dict[int, Dict[str, Any]] = {}
+        for interaction_id, field, turn_index, role, content, score in doc_rows:
+            entry = grouped.setdefault(interaction_id, {"interaction_id": interaction_id, "score": 0.0, "hits": []})
+            if len(entry["hits"]) < hits_per_interaction:
+                entry["score"] += float(score)
+                entry["hits"].append({
+                    "field": field,
+                    "turn_index": turn_index,
+                    "role": role,
+                    "snippet": highlight(content, terms),
+                    "score": round(float(score), 4),
+                })
+        ranked = sorted(grouped.values(), key=lambda e: e["score"], reverse=True)[:limit]
+        if not ranked:
+            return []
+
+        summaries = _fetch_summaries(cursor, [entry["interaction_id"] for entry in ranked])
+    finally:
+        cursor.close()
+
+    results = []
+    for entry in ranked:
+        summary = summaries.get(entry["interaction_id"])
+        if summary is None:
+            continue  # Deleted between the two queries
+        results.append({**entry, "score": round(entry["score"], 4), "interaction": summary})
+    return results
+
+
+def _fetch_summaries(cursor, interaction_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+    columns = ("id", "hcp_name", "interaction_date", "products_discussed", "sentiment", "interaction_method")
+    placeholders = ", ".join(["%s"] * len(interaction_ids))
+    cursor.execute(f"SELECT {', '.join(columns)} FROM hcp_interactions WHERE id IN ({placeholders})", interaction_ids)
+    return {row[0]: dict(zip(columns, row)) for row in cursor.fetchall()}
+
@@ -0,0 +1,297 @@
+# backend_app/session_store.py
+
+import asyncio
+import copy
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+# Rough per-message overhead (dict + two small strings) added to the content length when
+# estimating how much memory a session holds.
+_MESSAGE_OVERHEAD_BYTES = 200
+
+
+def new_session_id() -> str:
+    return uuid.uuid4().hex
+
+
+@dataclass
+class ChatSession:
+    """Server-side state of one chat conversation."""
+    session_id: str
+    history: List[Dict[str, str]] = field(default_factory=list)
+    extraction_data: Dict[str, Any] = field(default_factory=dict)
+    size_bytes: int = 0
+
+    def append(self, role: str, content: str):
+        self.history.append({"role": role, "content": content})
+        self.size_bytes += len(content) + _MESSAGE_OVERHEAD_BYTES
+
+    def recompute_size(self):
+        self.size_bytes = sum(len(m.get("content", "")) + _MESSAGE_OVERHEAD_BYTES for m in self.history)
+        self.size_bytes += len(json.dumps(self.extraction_data, default=str))
+
+    def copy(self) -> "ChatSession":
+        # Messages are never edited once appended, so sharing the dicts is safe; the list is not
+        return ChatSession(self.session_id, list(self.history), copy.deepcopy(self.extraction_data), self.size_bytes)
+
+
+class SessionStore(ABC):
+    """Storage backend for chat sessions. Implementations enforce TTL and size limits themselves."""
+
+    @abstractmethod
+    async def load(self, session_id: str) -> Optional[ChatSession]:
+        """Returns the session, or None if it never existed or has expired."""
+
+    @abstractmethod
+    async def save(self, session: ChatSession):
+        """Stores the session, evicting older sessions if a limit is exceeded."""
+
+    @abstractmethod
+    async def delete(self, session_id: str):
+        """Removes the session if present."""
+
+    @abstractmethod
+    def stats(self) -> Dict[str, Any]:
+        """Occupancy and eviction counters."""
+
+
+class InMemorySessionStore(SessionStore):
+    """
+    Per-process LRU store with TTL expiry, a session count limit and an approximate memory cap.
+    Sessions are held as objects, so a turn never re-serializes the conversation. Load and save
+    hand out and keep copies: two concurrent turns on one session each work on their own copy
+    and the last save wins, instead of both appending to the same history list.
+    """
+
+    def __init__(self, max_sessions: int = 10000, ttl_seconds: float = 3600.0, max_bytes: int = 64 * 1024 * 1024, max_history_messages: int = 200):
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.max_history_messages = max_history_messages
+        self._sessions: "OrderedDict[str, tuple]" = OrderedDict()  # session_id -> (ChatSession, last_access, charged_bytes)
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self._evictions = 0
+        self._expirations = 0
+
+    async def load(self, session_id: str) -> Optional[ChatSession]:
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is None:
+                return None
+            session, last_access, charged_bytes = entry
+            now = time.monotonic()
+            if now - last_access > self.ttl_seconds:
+                self._remove(session_id)
+                self._expirations += 1
+                return None
+            self._sessions[session_id] = (session, now, charged_bytes)
+            self._sessions.move_to_end(session_id)
+            return session.copy()
+
+    async def save(self, session: ChatSession):
+        _trim_history(session, self.max_history_messages)
+        stored = session.copy()
+        with self._lock:
+            self._remove(session.session_id)
+            self._sessions[session.session_id] = (stored, time.monotonic(), stored.size_bytes)
+            self._total_bytes += session.size_bytes
+            while self._sessions and (len(self._sessions) > self.max_sessions or self._total_bytes > self.max_bytes):
+                oldest_id = next(iter(self._sessions))
+                if oldest_id == session.session_id:
+                    break  # Never evict the session being written
+                self._remove(oldest_id)
+                self._evictions += 1
+
+    async def delete(self, session_id: str):
+        with self._lock:
+            self._remove(session_id)
+
+    def _remove(self, session_id: str):
+        entry = self._sessions.pop(session_id, None)
+        if entry is not None:
+            self._total_bytes -= entry[2]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": "memory",
+            "sessions": len(self._sessions),
+            "approx_bytes": self._total_bytes,
+            "max_sessions": self.max_sessions,
+            "max_bytes": self.max_bytes,
+            "evictions": self._evictions,
+            "expirations": self._expirations,
+        }
+
+
+class SQLiteSessionStore(SessionStore):
+    """
+    Local stand-in for a shared session store: every uvicorn worker on the host opens the same
+    SQLite file, so a conversation can hop between workers. Same LRU/TTL/size semantics as the
+    in-memory store; I/O runs in a worker thread to keep the event loop free. Session count and
+    total size are kept in a one-row totals table by triggers, so enforcing the limits never
+    scans chat_sessions, and stats() reports the totals seen by this worker's last store call.
+    """
+
+    def __init__(self, path: str = "chat_sessions.db", max_sessions: int = 10000, ttl_seconds: float = 3600.0, max_bytes: int = 64 * 1024 * 1024, max_history_messages: int = 200):
+        self.path = path
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.max_history_messages = max_history_messages
+        self._local = threading.local()
+        self._evictions = 0
+        self._expirations = 0
+        self._totals = (0, 0)  # (sessions, size_bytes) as of the last store call in this process
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        # Workers open the file concurrently; take the write lock so only one seeds the totals
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS chat_sessions (
+                session_id TEXT PRIMARY KEY,
+                payload TEXT NOT NULL,
+                size_bytes INTEGER NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_chat_sessions_last_access ON chat_sessions (last_access)")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS chat_session_totals (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                sessions INTEGER NOT NULL,
+                size_bytes INTEGER NOT NULL
+            )
+        """)
+        # Seeded once, in the same transaction that creates the triggers below
+        conn.execute(
+            "INSERT OR IGNORE INTO chat_session_totals (id, sessions, size_bytes) "
+            "SELECT 1, COUNT(*), COALESCE(SUM(size_bytes), 0) FROM chat_sessions"
+        )
+        conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS chat_sessions_totals_insert AFTER INSERT ON chat_sessions BEGIN
+                UPDATE chat_session_totals SET sessions = sessions + 1, size_bytes = size_bytes + NEW.size_bytes WHERE id = 1;
+            END
+        """)
+        conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS chat_sessions_totals_update AFTER UPDATE OF size_bytes ON chat_sessions BEGIN
+                UPDATE chat_session_totals SET size_bytes = size_bytes - OLD.size_bytes + NEW.size_bytes WHERE id = 1;
+            END
+        """)
+        conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS chat_sessions_totals_delete AFTER DELETE ON chat_sessions BEGIN
+                UPDATE chat_session_totals SET sessions = sessions - 1, size_bytes = size_bytes - OLD.size_bytes WHERE id = 1;
+            END
+        """)
+        self._totals = self._read_totals(conn)
+        conn.commit()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0)
+            self._local.conn = conn
+        return conn
+
+    def _read_totals(self, conn: sqlite3.Connection) -> tuple:
+        return conn.execute("SELECT sessions, size_bytes FROM chat_session_totals WHERE id = 1").fetchone()
+
+    def _load_sync(self, session_id: str) -> Optional[ChatSession]:
+        conn = self._conn()
+        row = conn.execute("SELECT payload, last_access FROM chat_sessions WHERE session_id = ?", (session_id,)).fetchone()
+        if row is None:
+            return None
+        now = time.time()
+        if now - row[1] > self.ttl_seconds:
+            conn.execute("DELETE FROM chat_sessions WHERE session_id = ?", (session_id,))
+            self._totals = self._read_totals(conn)
+            conn.commit()
+            self._expirations += 1
+            return None
+        conn.execute("UPDATE chat_sessions SET last_access = ? WHERE session_id = ?", (now, session_id))
+        conn.commit()
+        payload = json.loads(row[0])
+        session = ChatSession(session_id=session_id, history=payload["history"], extraction_data=payload["extraction_data"])
+        session.recompute_size()
+        return session
+
+    def _save_sync(self, session: ChatSession):
+        _trim_history(session, self.max_history_messages)
+        payload = json.dumps({"history": session.history, "extraction_data": session.extraction_data}, default=str)
+        conn = self._conn()
+        now = time.time()
+        # An upsert rather than INSERT OR REPLACE: REPLACE deletes without firing the delete trigger
+        conn.execute(
+            "INSERT INTO chat_sessions (session_id, payload, size_bytes, last_access) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (session_id) DO UPDATE SET payload = excluded.payload, size_bytes = excluded.size_bytes, "
+            "last_access = excluded.last_access",
+            (session.session_id, payload, len(payload), now),
+        )
+        conn.execute("DELETE FROM chat_sessions WHERE last_access < ?", (now - self.ttl_seconds,))
+        count, total_bytes = self._read_totals(conn)
+        if count > self.max_sessions or total_bytes > self.max_bytes:
+            # Walk the LRU end until both limits hold again
+            for victim_id, victim_size in conn.execute(
+                "SELECT session_id, size_bytes FROM chat_sessions WHERE session_id != ? ORDER BY last_access", (session.session_id,)
+            ).fetchall():
+                if count <= self.max_sessions and total_bytes <= self.max_bytes:
+                    break
+                conn.execute("DELETE FROM chat_sessions WHERE session_id = ?", (victim_id,))
+                count -= 1
+                total_bytes -= victim_size
+                self._evictions += 1
+        self._totals = (count, total_bytes)
+        conn.commit()
+
+    def _delete_sync(self, session_id: str):
+        conn = self._conn()
+        conn.execute("DELETE FROM chat_sessions WHERE session_id = ?", (session_id,))
+        self._totals = self._read_totals(conn)
+        conn.commit()
+
+    async def load(self, session_id: str) -> Optional[ChatSession]:
+        return await asyncio.to_thread(self._load_sync, session_id)
+
+    async def save(self, session: ChatSession):
+        await asyncio.to_thread(self._save_sync, session)
+
+    async def delete(self, session_id: str):
+        await asyncio.to_thread(self._delete_sync, session_id)
+
+    def stats(self) -> Dict[str, Any]:
+        # No query here: this runs on the event loop (and on every metrics scrape)
+        count, total_bytes = self._totals
+        return {
+            "backend": "sqlite",
+            "path": self.path,
+            "sessions": count,
+            "approx_bytes": total_bytes,
+            "max_sessions": self.max_sessions,
+            "max_bytes": self.max_bytes,
+            "evictions": self._evictions,
+            "expirations": self._expirations,
+        }
+
+
+def _trim_history(session: ChatSession, max_messages: int):
+    """Keeps only the most recent messages so a single runaway chat cannot dominate the cap."""
+    if max_messages and len(session.history) > max_messages:
+        del session.history[:-max_messages]
+        session.recompute_size()
+
+
+def create_session_store(backend: str = "memory", **options) -> SessionStore:
+    """Builds the configured session store backend ("memory" or "sqlite")."""
+    if backend == "memory":
+        options.pop("path", None)
+        return InMemorySessionStore(**options)
+    if backend == "sqlite":
+        return SQLiteSessionStore(**options)
+    raise ValueError(f"Unknown session store backend: {backend}")
@@ -0,0 +1,187 @@
+# backend_app/write_behind.py
+
+import asyncio
+import logging
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from db import DatabaseUnavailableError, MySQLConnectionPool
+
+logger = logging.getLogger("crm.write_behind")
+
+
+class WriteQueueFullError(DatabaseUnavailableError):
+    """Raised when the write queue stays full for longer than the enqueue timeout."""
+
+
+class WriteQueueClosedError(DatabaseUnavailableError):
+    """Raised when writing to a queue that is shutting down."""
+
+
+_STOP = object()
+
+
+class WriteBehindQueue:
+    """
+    Group commit for interaction inserts. Callers enqueue rows and await their ids; a single
+    background writer collects whatever is queued, up to `max_batch_rows` rows or `max_delay`
+    seconds after the first row arrived, and writes the group with one `write_batch(conn, rows)`
+    call, i.e. one transaction and one commit (one fsync) for many requests.
+
+    Callers only get their ids once the group has committed, so an acknowledged interaction is
+    always durable and ids are the real auto-increment values. The queue holds at most
+    `max_pending` submissions; beyond that submitters wait up to `enqueue_timeout` and then get
+    WriteQueueFullError, so a stalled database pushes back on clients instead of growing memory.
+    """
+
+    def __init__(
+        self,
+        pool: MySQLConnectionPool,
+        write_batch: Callable[[Any, List[tuple]], List[int]],
+        max_batch_rows: int = 200,
+        max_delay: float = 0.005,
+        max_pending: int = 5000,
+        enqueue_timeout: float = 2.0,
+    ):
+        self.pool = pool
+        self.write_batch = write_batch
+        self.max_batch_rows = max_batch_rows
+        self.max_delay = max_delay
+        self.max_pending = max_pending
+        self.enqueue_timeout = enqueue_timeout
+        self._queue: Optional[asyncio.Queue] = None
+        self._writer: Optional[asyncio.Task] = None
+        self._closed = False
+
+        self._groups_total = 0
+        self._rows_total = 0
+        self._failed_rows_total = 0
+        self._rejected_total = 0
+        self._split_groups_total = 0
+        self._flush_time_total = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._writer is not None and not self._writer.done()
+
+    def start(self):
+        """Starts the background writer on the running event loop."""
+        if self.running:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_pending)
+        self._closed = False
+        self._writer = asyncio.get_running_loop().create_task(self._run(), name="write-behind-writer")
+
+    async def submit(self, values: tuple) -> int:
+        """Queues one row and returns its id once the group holding it has committed."""
+        (interaction_id,) = await self.submit_many([values])
+        return interaction_id
+
+    async def submit_many(self, values_list: List[tuple]) -> List[int]:
+        """Queues rows that must commit together (e.g. one bulk chunk); returns their ids in order."""
+        if self._closed or not self.running:
+            raise WriteQueueClosedError("Write queue is not accepting writes.")
+        future = asyncio.get_running_loop().create_future()
+        try:
+            await asyncio.wait_for(self._queue.put((values_list, future)), timeout=self.enqueue_timeout)
+        except asyncio.TimeoutError:
+            self._rejected_total += 1
+            raise WriteQueueFullError(f"Write queue full ({self.max_pending} pending) for {self.enqueue_timeout}s.")
+        return await future
+
+    async def close(self):
+        """Stops accepting writes, flushes everything already queued and stops the writer."""
+        if not self.running:
+            return
+        self._closed = True
+        await self._queue.put(_STOP)
+        await self._writer
+        # A submitter blocked on a full queue can land its rows after the writer's last look
+        while not self._queue.empty():
+            item = self._queue.get_nowait()
+            if item is not _STOP:
+                self._fail([item], WriteQueueClosedError("Write queue closed before the write was flushed."))
+
+    # --- Writer ---
+    async def _run(self):
+        stopping = False
+        while True:
+            if stopping:
+                if self._queue.empty():
+                    return
+                first = self._queue.get_nowait()
+            else:
+                first = await self._queue.get()
+            if first is _STOP:
+                stopping = True
+                continue
+
+            group = [first]
+            rows = len(first[0])
+            deadline = time.monotonic() + self.max_delay
+            while rows < self.max_batch_rows:
+                try:
+                    item = self._queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    remaining = deadline - time.monotonic()
+                    if stopping or remaining <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(self._queue.get(), timeout=remaining)
+                    except asyncio.TimeoutError:
+                        break
+                if item is _STOP:
+                    stopping = True  # Flush this group, then drain what is left without waiting
+                    continue
+                group.append(item)
+                rows += len(item[0])
+            await self._flush(group)
+
+    async def _flush(self, group: List[Tuple[List[tuple], asyncio.Future]]):
+        rows = [values for values_list, _ in group for values in values_list]
+        started = time.monotonic()
+        try:
+            ids = await self.pool.run(self.write_batch, rows)
+        except DatabaseUnavailableError as err:
+            self._fail(group, err)
+            return
+        except Exception as err:
+            if len(group) == 1:
+                self._fail(group, err)
+                return
+            # One bad row rolls back the whole group; retry each submission on its own so the
+            # others still commit and only the offending request sees the error.
+            self._split_groups_total += 1
+            logger.warning("Group commit of %d rows failed, retrying per submission: %s", len(rows), err)
+            for item in group:
+                await self._flush([item])
+            return
+
+        self._flush_time_total += time.monotonic() - started
+        self._groups_total += 1
+        self._rows_total += len(rows)
+        offset = 0
+        for values_list, future in group:
+            if not future.done():  # The submitter may have been cancelled; its rows are written regardless
+                future.set_result(ids[offset:offset + len(values_list)])
+            offset += len(values_list)
+
+    def _fail(self, group: List[Tuple[List[tuple], asyncio.Future]], err: Exception):
+        for values_list, future in group:
+            self._failed_rows_total += len(values_list)
+            if not future.done():
+                future.set_exception(err)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "pending": self._queue.qsize() if self._queue is not None else 0,
+            "max_pending": self.max_pending,
+            "groups_total": self._groups_total,
+            "rows_total": self._rows_total,
+            "avg_group_rows": round(self._rows_total / self._groups_total, 2) if self._groups_total else 0.0,
+            "avg_flush_ms": round(1000 * self._flush_time_total / self._groups_total, 3) if self._groups_total else 0.0,
+            "failed_rows_total": self._failed_rows_total,
+            "rejected_total": self._rejected_total,
+            "split_groups_total": self._split_groups_total,
+        }
@@ -6,6 +6,7 @@ import axios from 'axios';
 
 // --- Configuration ---
 const API_BASE_URL = 'http://localhost:8000/api'; // Backend API URL
+const HCP_SUGGEST_DELAY_MS = 150; // Debounce for the HCP name autocomplete
 
 // --- Redux Slice for Interactions ---
 const initialState = {
@@ -16,6 +17,7 @@ const initialState = {
   currentChatAIMessage: '',
   isChatComplete: false,
   currentExtractedData: {}, // Store data extracted by AI during chat
+  chatSessionId: null, // Server-side chat session; history and extracted data live on the backend
 };
 
 const interactionSlice = createSlice({
@@ -33,8 +35,13 @@ const interactionSlice = createSlice({
     },
     logChatChunk: (state, action) => {
         state.loading = false;
-        const { ai_message, is_complete, extracted_data, interaction_id } = action.payload;
+        const { ai_message, is_complete, extracted_data, interaction_id, session_id, session_restarted } = action.payload;
         
+        if (session_restarted) {
+            // The backend lost the session (expiry, restart, another worker) and seeded a new one
+            // from currentExtractedData; earlier turns are no longer part of its context.
+            state.chatHistory.push({ role: 'assistant', content: '(Chat session was restarted; fields captured so far were kept.)' });
+        }
         // Add AI message to chat history
         if (ai_message) {
             state.chatHistory.push({ role: 'assistant', content: ai_message });
@@ -45,6 +52,9 @@ const interactionSlice = createSlice({
         if (extracted_data) {
             state.currentExtractedData = extracted_data;
         }
+        if (session_id) {
+            state.chatSessionId = session_id;
+        }
         if (is_complete && interaction_id) {
             // If chat interaction was logged, potentially add to a list of logged interactions
             // For now, we just mark as complete and reset extracted data for next chat.
@@ -65,6 +75,7 @@ const interactionSlice = createSlice({
         state.currentChatAIMessage = '';
         state.isChatComplete = false;
         state.currentExtractedData = {};
+        state.chatSessionId = null;
     },
     resetError: (state) => {
         state.error = null;
@@ -103,14 +114,14 @@ export const submitInteractionForm = (formData) => async (dispatch) => {
   }
 };
 
-export const sendChatMessage = (message, history, currentExtractedData) => async (dispatch) => {
+export const sendChatMessage = (message, sessionId, currentExtractedData) => async (dispatch) => {
   dispatch(logRequest());
   dispatch(addUserMessageToChat(message)); // Add user message to history immediately
   try {
     const payload = { 
         message, 
-        history: history, // Send previous history for context
-        current_extraction_data: currentExtractedData
+        session_id: sessionId, // Backend keeps history and extracted data for this session
+        current_extraction_data: currentExtractedData // Re-seeds a new session if the backend lost this one
     };
     const response = await axios.post(`${API_BASE_URL}/log_interaction_chat`, payload);
     dispatch(logChatChunk(response.data)); // AI response, completion status, extracted data
@@ -148,9 +159,12 @@ const InteractionForm = () => {
     key_discussion_points: '',
     sentiment: '', // 'Positive', 'Neutral', 'Negative'
     follow_up_actions: '',
+    hcp_id: null, // Set when a directory suggestion is picked; typing a name clears it
   });
   const [formError, setFormError] = useState('');
   const [formSuccess, setFormSuccess] = useState('');
+  const [hcpSuggestions, setHcpSuggestions] = useState([]);
+  const latestSuggestRequest = useRef(0);
 
   const { loading, error: reduxError } = useSelector((state) => state.interactions);
    useEffect(() => {
@@ -165,10 +179,40 @@ const InteractionForm = () => {
   }, [reduxError, dispatch]);
 
 
+  // HCP name autocomplete from the backend directory index, debounced; stale responses are dropped
+  useEffect(() => {
+    const query = formData.hcp_name.trim();
+    if (!query || formData.hcp_id) {
+      setHcpSuggestions([]);
+      return;
+    }
+    const timer = setTimeout(async () => {
+      const requestId = ++latestSuggestRequest.current;
+      try {
+        const response = await axios.get(`${API_BASE_URL}/hcps/suggest`, { params: { q: query, limit: 8 } });
+        if (requestId === latestSuggestRequest.current) {
+          setHcpSuggestions(response.data);
+        }
+      } catch (error) {
+        setHcpSuggestions([]); // Autocomplete is best effort; the name can still be typed in full
+      }
+    }, HCP_SUGGEST_DELAY_MS);
+    return () => clearTimeout(timer);
+  }, [formData.hcp_name, formData.hcp_id]);
+
   const handleChange = (e) => {
+    if (e.target.name === 'hcp_name') {
+      setFormData({ ...formData, hcp_name: e.target.value, hcp_id: null });
+      return;
+    }
     setFormData({ ...formData, [e.target.name]: e.target.value });
   };
 
+  const handlePickHcp = (suggestion) => {
+    setFormData({ ...formData, hcp_name: suggestion.name, hcp_id: suggestion.id });
+    setHcpSuggestions([]);
+  };
+
   const handleSubmit = async (e) => {
     e.preventDefault();
     setFormError('');
@@ -187,6 +231,7 @@ const InteractionForm = () => {
         key_discussion_points: '',
         sentiment: '',
         follow_up_actions: '',
+        hcp_id: null,
       });
       setTimeout(() => setFormSuccess(''), 3000);
     } catch (err) {
@@ -204,9 +249,23 @@ const InteractionForm = () => {
       {formError && <Notification message={formError} type="error" onClose={() => setFormError('')} />}
       {formSuccess && <Notification message={formSuccess} type="success" onClose={() => setFormSuccess('')} />}
       
-      <div>
+      <div className="relative">
         <label htmlFor="hcp_name" className={labelClass}>HCP Name <span className="text-red-500">*</span></label>
-        <input type="text" name="hcp_name" id="hcp_name" value={formData.hcp_name} onChange={handleChange} className={inputClass} required />
+        <input type="text" name="hcp_name" id="hcp_name" value={formData.hcp_name} onChange={handleChange} onBlur={() => setTimeout(() => setHcpSuggestions([]), 150)} className={inputClass} autoComplete="off" required />
+        {hcpSuggestions.length > 0 && (
+          <ul className="absolute z-10 mt-1 w-full bg-white border border-gray-200 rounded-md shadow-lg max-h-60 overflow-y-auto text-sm">
+            {hcpSuggestions.map((suggestion) => (
+              <li
+                key={suggestion.id}
+                onMouseDown={() => handlePickHcp(suggestion)}
+                className="px-3 py-2 cursor-pointer hover:bg-gray-100 flex justify-between"
+              >
+                <span>{suggestion.name}{suggestion.match === 'fuzzy' && <span className="ml-1 text-xs text-gray-400">(similar)</span>}</span>
+                <span className="text-xs text-gray-500">{suggestion.interaction_count} interactions</span>
+              </li>
+            ))}
+          </ul>
+        )}
       </div>
       <div>
         <label htmlFor="interaction_date" className={labelClass}>Date of Interaction <span className="text-red-500">*</span></label>
@@ -246,7 +305,7 @@ const InteractionForm = () => {
 const InteractionChat = () => {
   const dispatch = useDispatch();
   const [message, setMessage] = useState('');
-  const { chatHistory, loading, currentExtractedData, error: reduxError } = useSelector((state) => state.interactions);
+  const { chatHistory, loading, currentExtractedData, chatSessionId, error: reduxError } = useSelector((state) => state.interactions);
   const chatMessagesRef = useRef(null);
   const [chatError, setChatError] = useState('');
 
@@ -273,10 +332,9 @@ const InteractionChat = () => {
     if (!message.trim()) return;
     setChatError('');
 
-    // Pass current chatHistory (before adding new user message) and currentExtractedData
-    const historyForAPI = [...chatHistory]; 
+    // Only the new message and the session id go over the wire; the backend holds the rest
     try {
-      await dispatch(sendChatMessage(message, historyForAPI, currentExtractedData));
+      await dispatch(sendChatMessage(message, chatSessionId, currentExtractedData));
       setMessage(''); // Clear input after sending
     } catch (err) {
       // Error is handled by reduxError effect
@@ -286,6 +344,9 @@ const InteractionChat = () => {
   };
   
   const handleClearChat = () => {
+    if (chatSessionId) {
+      axios.delete(`${API_BASE_URL}/chat/sessions/${chatSessionId}`).catch(() => {}); // Best effort
+    }
     dispatch(clearChat());
   }
 
@@ -338,7 +399,7 @@ const InteractionChat = () => {
           <p className="font-semibold mb-1">AI has extracted so far:</p>
           <ul className="list-disc list-inside pl-2">
             {Object.entries(currentExtractedData).map(([key, value]) => 
-              value ? <li key={key}><span className="font-medium">{key.replace(/_/g, ' ').replace(/\b\w/g, l => l.toUpperCase())}:</span> {String(value)}</li> : null
+              value && key !== 'hcp_id' ? <li key={key}><span className="font-medium">{key.replace(/_/g, ' ').replace(/\b\w/g, l => l.toUpperCase())}:</span> {String(value)}</li> : null
             )}
           </ul>
         </div>